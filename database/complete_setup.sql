@@ -169,7 +169,8 @@ CREATE TABLE IF NOT EXISTS sales_orders (
     INDEX idx_order_code (order_code),
     INDEX idx_status (status),
     INDEX idx_order_date (order_date),
-    INDEX idx_distributor (distributor_id)
+    INDEX idx_distributor (distributor_id),
+    INDEX idx_updated_at (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='销售订单表';
 
 -- 9. 活动日志表
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+销售日汇总回填
+
+从 sales_orders 全量重建 sales_daily_rollup。首次部署、或怀疑汇总表与订单不一致时运行。
+
+用法：
+    python scripts/backfill_sales_rollup.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "Backend"))
+
+from app.core.database import Base, SessionLocal, engine
+from app.crud.sales_rollup import sales_rollup
+import app.models  # noqa: F401  确保所有模型已注册
+
+
+def main() -> int:
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        rows = sales_rollup.rebuild(db)
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"✓ 已重建销售日汇总，共 {rows} 行")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
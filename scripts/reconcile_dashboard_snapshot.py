@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+仪表板快照对账
+
+从业务表全量重建 dashboard_snapshots / dashboard_order_snapshots，
+并打印重建前快照与实际数据之间的偏差。
+
+用法：
+    python scripts/reconcile_dashboard_snapshot.py            # 重建并报告偏差
+    python scripts/reconcile_dashboard_snapshot.py --dry-run  # 只报告偏差，不写入
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "Backend"))
+
+from app.core.database import Base, SessionLocal, engine
+from app.crud.dashboard_snapshot import dashboard_snapshot
+import app.models  # noqa: F401  确保所有模型已注册
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="重建仪表板快照并报告偏差")
+    parser.add_argument("--dry-run", action="store_true", help="只报告偏差，不写入数据库")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        initialized = dashboard_snapshot.is_initialized(db)
+        drift = dashboard_snapshot.rebuild(db)
+        if args.dry_run:
+            db.rollback()
+        else:
+            db.commit()
+    finally:
+        db.close()
+
+    if not initialized:
+        print("快照尚未初始化，已完成首次构建。" if not args.dry_run else "快照尚未初始化。")
+        return 0
+
+    if not drift:
+        print("✓ 快照与业务数据一致，无偏差")
+        return 0
+
+    print(f"✗ 发现 {len(drift)} 处偏差{'（未写入）' if args.dry_run else '，已按业务数据修正'}:")
+    for item in drift:
+        print(f"  [{item['scope']}] {item['field']}: 快照={item['snapshot']} 实际={item['actual']}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,7 @@ from app.core.dependencies import (  # noqa: F401
     oauth2_scheme,
     get_current_user,
     get_current_active_user,
+    get_current_active_db_user,
     get_current_active_superuser,
     require_admin,
     require_manager_or_above,
@@ -19,6 +20,7 @@ __all__ = [
     "oauth2_scheme",
     "get_current_user",
     "get_current_active_user",
+    "get_current_active_db_user",
     "get_current_active_superuser",
     "require_admin",
     "require_manager_or_above",
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1 import auth, users, products, inventory, sales, ai, dashboard, warehouse_config, search, alerts, notifications, websocket
+from app.api.v1 import auth, users, products, inventory, sales, ai, dashboard, warehouse_config, search, alerts, notifications, websocket, analytics, internal
 
 api_router = APIRouter()
 
@@ -11,8 +11,10 @@ api_router.include_router(inventory.router, prefix="/inventory", tags=["inventor
 api_router.include_router(sales.router, prefix="/sales", tags=["sales"])
 api_router.include_router(ai.router, prefix="/ai", tags=["ai"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
 api_router.include_router(warehouse_config.router, prefix="/warehouse", tags=["warehouse"])
 api_router.include_router(search.router, prefix="/search", tags=["search"])
 api_router.include_router(alerts.router, prefix="/alerts", tags=["alerts"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
 api_router.include_router(websocket.router, tags=["websocket"])
+api_router.include_router(internal.router, prefix="/internal", tags=["internal"])
@@ -0,0 +1,86 @@
+"""
+Analytics API 路由
+
+该模块提供基于销售分析列式缓存的即席多维报表端点。
+需要安装 numpy；未安装时端点返回 503。
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.dependencies import get_current_active_user, require_admin
+from app.core.principal_cache import Principal
+from app.services.sales_analytics import DIMENSIONS, METRICS, is_available, sales_column_store
+
+router = APIRouter()
+
+
+def _require_column_store(db: Session) -> None:
+    """确认 numpy 可用，并在缓存过旧时做一次增量刷新"""
+    if not is_available():
+        raise HTTPException(status_code=503, detail="销售分析需要安装 numpy")
+    sales_column_store.refresh_if_stale(db, settings.ANALYTICS_REFRESH_SECONDS)
+
+
+@router.get("/sales", response_model=List[Dict[str, Any]])
+def get_sales_report(
+    dimension: str = Query("region", regex=f"^({'|'.join(DIMENSIONS)})$", description="分组维度"),
+    metric: str = Query("revenue", regex=f"^({'|'.join(METRICS)})$", description="排序度量"),
+    top_k: Optional[int] = Query(None, ge=1, le=1000, description="只返回前 K 组"),
+    start_date: Optional[date] = Query(None, description="下单日期下限（含）"),
+    end_date: Optional[date] = Query(None, description="下单日期上限（含）"),
+    status: Optional[List[str]] = Query(None, description="只统计这些订单状态，默认排除已取消"),
+    distributor_id: Optional[int] = Query(None, description="经销商ID"),
+    product_id: Optional[int] = Query(None, description="产品ID"),
+    region: Optional[str] = Query(None, description="地区"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+):
+    """
+    销售多维报表
+
+    按地区、经销商、产品、仓库、状态或月份分组，返回销售额、数量与订单数。
+    """
+    _require_column_store(db)
+    return sales_column_store.group_by(
+        dimension,
+        metric=metric,
+        top_k=top_k,
+        start_date=start_date,
+        end_date=end_date,
+        statuses=status,
+        distributor_id=distributor_id,
+        product_id=product_id,
+        region=region,
+    )
+
+
+@router.get("/sales/status", response_model=Dict[str, Any])
+def get_sales_store_status(
+    current_user: Principal = Depends(get_current_active_user),
+):
+    """
+    获取销售分析缓存状态
+
+    返回当前 worker 进程中缓存的订单数与刷新水位线。
+    """
+    return sales_column_store.get_status()
+
+
+@router.post("/sales/refresh", response_model=Dict[str, Any])
+def refresh_sales_store(
+    full: bool = Query(False, description="是否全量重载（订单被删除后使用）"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_admin),
+):
+    """
+    手动刷新销售分析缓存（仅管理员）
+    """
+    if not is_available():
+        raise HTTPException(status_code=503, detail="销售分析需要安装 numpy")
+    fetched = sales_column_store.refresh(db, full=full)
+    return {"fetched": fetched, **sales_column_store.get_status()}
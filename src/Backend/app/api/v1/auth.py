@@ -3,17 +3,20 @@
 
 该模块定义了用户认证相关的 API 路由。
 主要功能：
-1. 用户登录（JWT 令牌生成）
+1. 用户登录（JWT 令牌生成，带登录限流）
 2. 用户注册
 """
 
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import cast
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.core.config import settings
-from app.core.database import get_db
-from app.core.security import create_access_token
+from app.core.database import get_async_db, get_db
+from app.core.login_throttle import login_throttle
+from app.core.security import create_access_token, verify_password_async
 from app.crud import user as user_crud
 from app.schemas.user import Token, UserCreate, UserInDB
 
@@ -21,29 +24,39 @@ from app.schemas.user import Token, UserCreate, UserInDB
 router = APIRouter()
 
 @router.post("/login", response_model=Token)
-def login(
-    db: Session = Depends(get_db),
+async def login(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """
     用户登录接口
     
     通过用户名和密码进行身份验证，成功后返回 JWT 访问令牌。
+    计算密码哈希前先按用户名与客户端 IP 限流；bcrypt 校验在专用的有界线程池中执行。
     
     Args:
-        db: 数据库会话依赖
+        request: 当前请求（用于获取客户端 IP）
+        db: 异步数据库会话依赖
         form_data: OAuth2 表单数据（包含用户名和密码）
         
     Returns:
         Token: 包含访问令牌和令牌类型的响应
         
     Raises:
-        HTTPException: 认证失败时抛出 401 错误
+        HTTPException: 认证失败时抛出 401 错误，尝试过于频繁时抛出 429 错误，
+            哈希线程池排队已满时抛出 503 错误
     """
-    user = user_crud.authenticate(
-        db, username=form_data.username, password=form_data.password
-    )
+    client_ip = request.client.host if request.client else None
+    login_throttle.check(form_data.username, client_ip)
+
+    user = await db.run_sync(lambda session: user_crud.get_by_username(session, username=form_data.username))
+    if user is not None and not await verify_password_async(
+        form_data.password, cast(str, user.hashed_password)
+    ):
+        user = None
     if not user:
+        login_throttle.record_failure(form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -54,6 +67,7 @@ def login(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
+    login_throttle.record_success(form_data.username)
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -4,14 +4,26 @@ Dashboard API 路由
 该模块提供仪表板相关的 API 端点。
 """
 
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-
-from app.core.database import get_db
-from app.core.dependencies import get_current_active_user
-from app.models.user import User
-from app.services.dashboard_service import DashboardService
+from typing import List, Dict, Any, Awaitable, Callable, Optional, TypeVar
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_read_db
+from app.core.dependencies import authenticate_token_async, get_current_active_user
+from app.core.cache import track_stale
+from app.core.etag import conditional_etag, discard_etag
+from app.crud.change_counter import (
+    TAG_ACTIVITY,
+    TAG_CATEGORIES,
+    TAG_INVENTORY,
+    TAG_ORDERS,
+    TAG_PRODUCTS,
+    TAG_WAREHOUSES,
+)
+from app.core.principal_cache import Principal
+from app.services.dashboard_service import SECTION_TAGS, DashboardService, dashboard_cache
+from app.services.dashboard_stream import dashboard_event_stream
 from app.schemas.dashboard import (
     DashboardResponse,
     DashboardStats,
@@ -25,27 +37,82 @@ from app.schemas.dashboard import (
 
 router = APIRouter()
 
+# 完整仪表板依赖的全部数据标签（含最近活动）
+ALL_DASHBOARD_TAGS = (TAG_INVENTORY, TAG_PRODUCTS, TAG_WAREHOUSES, TAG_ORDERS, TAG_ACTIVITY)
+
+T = TypeVar("T")
+
+
+async def _serve_cached(response: Response, compute: Callable[[], Awaitable[T]]) -> T:
+    """
+    读取缓存分区；返回了旧值（过期后重新验证期间）时不下发 ETag
+
+    ETag 按当前数据版本生成，旧值与之不对应，若下发会让客户端长期缓存旧内容。
+    """
+    with track_stale() as stale_sections:
+        result = await compute()
+    if stale_sections:
+        discard_etag(response)
+    return result
+
 
 @router.get("/", response_model=DashboardResponse)
-def get_dashboard_data(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def get_dashboard_data(
+    response: Response,
+    parallel: Optional[bool] = Query(None, description="是否并行计算各分区，默认使用服务端配置"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_active_user),
+    _etag: str = Depends(conditional_etag(*ALL_DASHBOARD_TAGS, daily=True)),
 ):
     """
     获取完整的仪表板数据
 
     返回仪表板所需的所有数据，包括统计、库存状态、活动记录等。
+    并行模式下超时的分区以空值返回，并列在 degraded_sections 中。
     """
     try:
-        return DashboardService.get_full_dashboard(db)
+        result = await _serve_cached(
+            response, lambda: DashboardService.get_full_dashboard_async(db, parallel=parallel)
+        )
+        if result.degraded_sections:
+            discard_etag(response)
+        return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取仪表板数据失败: {str(e)}")
 
 
+@router.get("/stream")
+async def stream_dashboard(
+    request: Request,
+    token: Optional[str] = Query(None, description="访问令牌（EventSource 无法设置请求头时使用）"),
+):
+    """
+    仪表板实时推送（Server-Sent Events）
+
+    连接后先发送一次完整的仪表板数据（event: dashboard），
+    之后在库存、订单、产品等写操作后只发送发生变化的分区（event: delta），
+    每个连接每秒最多一次增量。
+    """
+    if token is None:
+        scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+        token = credentials if scheme.lower() == "bearer" else None
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    await authenticate_token_async(token)
+
+    return StreamingResponse(
+        dashboard_event_stream(request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/stats", response_model=DashboardStats)
-def get_dashboard_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def get_dashboard_stats(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_active_user),
+    _etag: str = Depends(conditional_etag(*SECTION_TAGS["stats"])),
 ):
     """
     获取仪表板统计数据
@@ -53,15 +120,19 @@ def get_dashboard_stats(
     返回核心统计指标，如产品总数、库存总量、待处理订单等。
     """
     try:
-        return DashboardService.get_dashboard_stats(db)
+        return await _serve_cached(
+            response, lambda: DashboardService.get_cached_section_async(db, "stats")
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取统计数据失败: {str(e)}")
 
 
 @router.get("/stock-status", response_model=List[StockStatus])
-def get_stock_status(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def get_stock_status(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_active_user),
+    _etag: str = Depends(conditional_etag(*SECTION_TAGS["stock_status"])),
 ):
     """
     获取库存状态分布
@@ -69,16 +140,20 @@ def get_stock_status(
     返回正常、低库存、缺货商品的数量和百分比。
     """
     try:
-        return DashboardService.get_stock_status(db)
+        return await _serve_cached(
+            response, lambda: DashboardService.get_cached_section_async(db, "stock_status")
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取库存状态失败: {str(e)}")
 
 
 @router.get("/activities", response_model=List[ActivityLogResponse])
-def get_recent_activities(
+async def get_recent_activities(
+    response: Response,
     limit: int = 10,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_active_user),
+    _etag: str = Depends(conditional_etag(TAG_ACTIVITY)),
 ):
     """
     获取最近活动记录
@@ -89,16 +164,18 @@ def get_recent_activities(
         limit: 返回记录数量限制（默认10）
     """
     try:
-        return DashboardService.get_recent_activities(db, limit)
+        return await db.run_sync(DashboardService.get_recent_activities, limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取活动记录失败: {str(e)}")
 
 
 @router.get("/alerts", response_model=List[InventoryAlert])
-def get_inventory_alerts(
+async def get_inventory_alerts(
+    response: Response,
     limit: int = 20,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_active_user),
+    _etag: str = Depends(conditional_etag(*SECTION_TAGS["inventory_alerts"])),
 ):
     """
     获取库存警报
@@ -109,17 +186,21 @@ def get_inventory_alerts(
         limit: 返回记录数量限制（默认20）
     """
     try:
-        return DashboardService.get_inventory_alerts(db, limit)
+        return await _serve_cached(
+            response, lambda: DashboardService.get_cached_section_async(db, "inventory_alerts", limit)
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取库存警报失败: {str(e)}")
 
 
 @router.get("/top-products", response_model=List[TopProduct])
-def get_top_products(
+async def get_top_products(
+    response: Response,
     limit: int = 5,
     days: int = 30,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_active_user),
+    _etag: str = Depends(conditional_etag(*SECTION_TAGS["top_products"], daily=True)),
 ):
     """
     获取热门产品
@@ -131,15 +212,19 @@ def get_top_products(
         days: 统计天数（默认30天）
     """
     try:
-        return DashboardService.get_top_products(db, limit, days)
+        return await _serve_cached(
+            response, lambda: DashboardService.get_cached_section_async(db, "top_products", limit, days)
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取热门产品失败: {str(e)}")
 
 
 @router.get("/warehouse-utilization", response_model=List[WarehouseUtilization])
-def get_warehouse_utilization(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def get_warehouse_utilization(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_active_user),
+    _etag: str = Depends(conditional_etag(*SECTION_TAGS["warehouse_utilization"])),
 ):
     """
     获取仓库利用率
@@ -147,15 +232,19 @@ def get_warehouse_utilization(
     返回所有仓库的容量使用情况。
     """
     try:
-        return DashboardService.get_warehouse_utilization(db)
+        return await _serve_cached(
+            response, lambda: DashboardService.get_cached_section_async(db, "warehouse_utilization")
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取仓库利用率失败: {str(e)}")
 
 
 @router.get("/order-status-distribution", response_model=List[OrderStatusDistribution])
-def get_order_status_distribution(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def get_order_status_distribution(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_active_user),
+    _etag: str = Depends(conditional_etag(*SECTION_TAGS["order_status_distribution"])),
 ):
     """
     获取订单状态分布
@@ -163,17 +252,20 @@ def get_order_status_distribution(
     返回各种状态的订单数量和总价值。
     """
     try:
-        return DashboardService.get_order_status_distribution(db)
+        return await _serve_cached(
+            response, lambda: DashboardService.get_cached_section_async(db, "order_status_distribution")
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取订单状态分布失败: {str(e)}")
 
 
 @router.get("/inventory-sales-trend", response_model=Dict[str, Any])
-def get_inventory_sales_trend(
+async def get_inventory_sales_trend(
     period: str = Query("weekly", regex="^(daily|weekly|monthly)$"),
     days: int = Query(30, ge=7, le=365),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_active_user),
+    _etag: str = Depends(conditional_etag(TAG_INVENTORY, TAG_ORDERS, daily=True)),
 ):
     """
     获取库存和销售趋势数据
@@ -185,17 +277,18 @@ def get_inventory_sales_trend(
         days: 统计天数 (默认30天)
     """
     try:
-        return DashboardService.get_inventory_sales_trend(db, period, days)
+        return await db.run_sync(DashboardService.get_inventory_sales_trend, period, days)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取趋势数据失败: {str(e)}")
 
 
 @router.get("/product-movement", response_model=Dict[str, Any])
-def get_product_movement(
+async def get_product_movement(
     period: str = Query("weekly", regex="^(daily|weekly|monthly)$"),
     days: int = Query(30, ge=7, le=365),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_active_user),
+    _etag: str = Depends(conditional_etag(TAG_INVENTORY, daily=True)),
 ):
     """
     获取产品动向数据
@@ -207,15 +300,16 @@ def get_product_movement(
         days: 统计天数 (默认30天)
     """
     try:
-        return DashboardService.get_product_movement(db, period, days)
+        return await db.run_sync(DashboardService.get_product_movement, period, days)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取产品动向失败: {str(e)}")
 
 
 @router.get("/category-distribution", response_model=Dict[str, Any])
-def get_category_distribution(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def get_category_distribution(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_active_user),
+    _etag: str = Depends(conditional_etag(TAG_PRODUCTS, TAG_CATEGORIES)),
 ):
     """
     获取产品分类分布
@@ -223,6 +317,19 @@ def get_category_distribution(
     返回各个分类的产品数量分布。
     """
     try:
-        return DashboardService.get_category_distribution(db)
+        return await db.run_sync(DashboardService.get_category_distribution)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取分类分布失败: {str(e)}")
+
+
+@router.get("/cache-stats", response_model=Dict[str, Any])
+def get_cache_stats(
+    current_user: Principal = Depends(get_current_active_user),
+):
+    """
+    获取仪表板缓存统计
+
+    返回当前 worker 进程的缓存命中、未命中、失效与过期次数。
+    多 worker 部署时每个进程各自统计，可通过返回的 pid 区分。
+    """
+    return dashboard_cache.get_stats()
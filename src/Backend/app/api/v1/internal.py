@@ -0,0 +1,61 @@
+"""
+内部运维 API 路由
+
+该模块提供仅管理员可访问的运行时诊断端点。
+主要功能：
+1. 查看当前 worker 进程的数据库连接池统计
+2. 查看定时任务的执行统计
+3. 查看 WebSocket 推送队列统计
+"""
+
+from typing import Any, Dict
+from fastapi import APIRouter, Depends
+
+from app.api.deps import require_admin
+from app.core.db_metrics import get_pool_stats
+from app.core.scheduler import get_job_status
+from app.core.websocket import manager
+from app.core.principal_cache import Principal
+
+router = APIRouter()
+
+
+@router.get("/db-pool", response_model=Dict[str, Any])
+def get_db_pool_stats(
+    current_user: Principal = Depends(require_admin),
+):
+    """
+    获取数据库连接池统计
+
+    返回当前 worker 进程中各引擎（主库、副本及其异步引擎）的实时连接池状态
+    （已签出、空闲、溢出）、签出等待时间直方图、重连/回收次数与慢语句次数。
+    多 worker 部署时每个进程各自统计，可通过返回的 pid 区分。
+    """
+    return get_pool_stats()
+
+
+@router.get("/scheduler-jobs", response_model=Dict[str, Any])
+def get_scheduler_jobs(
+    current_user: Principal = Depends(require_admin),
+):
+    """
+    获取定时任务执行统计
+
+    返回当前 worker 进程是否为调度主节点，以及各任务的下次执行时间、执行/失败/跳过次数、
+    最近一次耗时与处理行数、最近成功时间与最近错误。只有主节点执行任务，
+    其它 worker 返回的统计为空。
+    """
+    return get_job_status()
+
+
+@router.get("/websocket", response_model=Dict[str, Any])
+def get_websocket_stats(
+    current_user: Principal = Depends(require_admin),
+):
+    """
+    获取 WebSocket 推送统计
+
+    返回当前 worker 进程的连接数、每个连接发送队列的容量、排队消息总数与最大队列深度、
+    已发送与丢弃的消息数，以及因发送队列溢出被断开的慢客户端数。
+    """
+    return manager.get_stats()
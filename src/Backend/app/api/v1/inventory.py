@@ -1,8 +1,11 @@
 from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from app.core.database import get_db
+from sqlalchemy import or_, select
+from app.core.database import get_async_read_db, get_db, get_read_db
+from app.core.etag import conditional_etag
+from app.crud.change_counter import TAG_WAREHOUSES
 from app.crud.inventory import inventory as inventory_repo, warehouse as warehouse_repo
 from app.schemas.inventory import (
     WarehouseCreate, WarehouseUpdate, WarehouseInDB,
@@ -15,9 +18,10 @@ router = APIRouter()
 # 仓库相关API
 @router.get("/warehouses", response_model=List[WarehouseInDB])
 def read_warehouses(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    _etag: str = Depends(conditional_etag(TAG_WAREHOUSES)),
 ) -> Any:
     """获取仓库列表"""
     warehouses = warehouse_repo.get_multi(db, skip=skip, limit=limit)
@@ -35,8 +39,8 @@ def create_warehouse(
 
 # 库存相关API
 @router.get("/items", response_model=List[InventoryInDB])
-def read_inventory_items(
-    db: Session = Depends(get_db),
+async def read_inventory_items(
+    db: AsyncSession = Depends(get_async_read_db),
     skip: int = 0,
     limit: int = 100,
     search: Optional[str] = Query(None, description="搜索产品名称、SKU或零件号")
@@ -47,12 +51,12 @@ def read_inventory_items(
     支持通过产品名称、SKU或零件号进行模糊搜索
     例如：搜索 "6BT 5.9" 可以匹配 "Cummins 6BT5.9 发动机总成"
     """
-    query = db.query(Inventory).join(Product)
+    query = select(Inventory).join(Product)
 
     if search:
         # 移除空格以支持灵活搜索 (如 "6BT 5.9" 可以匹配 "6BT5.9")
         search_pattern = f"%{search.replace(' ', '%')}%"
-        query = query.filter(
+        query = query.where(
             or_(
                 Product.name.like(search_pattern),
                 Product.sku.like(search_pattern),
@@ -60,7 +64,7 @@ def read_inventory_items(
             )
         )
 
-    items = query.offset(skip).limit(limit).all()
+    items = (await db.scalars(query.offset(skip).limit(limit))).all()
     return items
 
 @router.get("/items/{id}", response_model=InventoryInDB)
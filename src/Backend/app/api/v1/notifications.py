@@ -12,23 +12,24 @@
 
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.crud.notification import notification as notification_crud
 from app.schemas.notification import (
     NotificationResponse,
     UnreadCountResponse,
 )
 from app.api.deps import get_current_active_user
-from app.models.user import User
+from app.core.principal_cache import Principal
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[NotificationResponse])
-def get_notifications(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def get_notifications(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, le=100),
     unread_only: bool = Query(False)
@@ -44,9 +45,9 @@ def get_notifications(
     Returns:
         List[NotificationResponse]: 通知列表
     """
-    notifications = notification_crud.get_by_user(
-        db,
-        user_id=int(current_user.id),  # type: ignore[arg-type]
+    notifications = await db.run_sync(
+        notification_crud.get_by_user,
+        user_id=current_user.id,
         skip=skip,
         limit=limit,
         unread_only=unread_only
@@ -55,9 +56,9 @@ def get_notifications(
 
 
 @router.get("/unread-count", response_model=UnreadCountResponse)
-def get_unread_count(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+async def get_unread_count(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     获取当前用户未读通知数量
@@ -65,9 +66,9 @@ def get_unread_count(
     Returns:
         UnreadCountResponse: 包含未读通知数量
     """
-    count = notification_crud.get_unread_count(
-        db,
-        user_id=int(current_user.id)  # type: ignore[arg-type]
+    count = await db.run_sync(
+        notification_crud.get_unread_count,
+        user_id=current_user.id
     )
     return UnreadCountResponse(unread_count=count)
 
@@ -76,7 +77,7 @@ def get_unread_count(
 def mark_notification_as_read(
     notification_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     将指定通知标记为已读
@@ -90,7 +91,7 @@ def mark_notification_as_read(
     notification = notification_crud.mark_as_read(
         db,
         notification_id=notification_id,
-        user_id=int(current_user.id)  # type: ignore[arg-type]
+        user_id=current_user.id
     )
 
     if not notification:
@@ -105,7 +106,7 @@ def mark_notification_as_read(
 @router.put("/read-all", response_model=dict)
 def mark_all_as_read(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     将当前用户所有未读通知标记为已读
@@ -115,7 +116,7 @@ def mark_all_as_read(
     """
     count = notification_crud.mark_all_as_read(
         db,
-        user_id=int(current_user.id)  # type: ignore[arg-type]
+        user_id=current_user.id
     )
 
     return {"message": "所有通知已标记为已读", "count": count}
@@ -125,7 +126,7 @@ def mark_all_as_read(
 def delete_notification(
     notification_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     删除指定通知
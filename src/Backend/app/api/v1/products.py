@@ -1,7 +1,7 @@
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.crud.product import product as product_repo, category as category_repo
 from app.schemas.product import (
     ProductCreate,
@@ -12,6 +12,9 @@ from app.schemas.product import (
 )
 from app.schemas.inventory import InventoryCreate
 from app.crud.inventory import inventory as inventory_repo, warehouse as warehouse_repo
+from app.core.etag import conditional_etag
+from app.crud.change_counter import TAG_CATEGORIES, TAG_PRODUCTS, change_counter
+from app.crud.dashboard_snapshot import ProductState, dashboard_snapshot
 from app.utils.activity import log_activity
 from app.utils.notification import send_notification_to_managers
 from app.api.deps import (
@@ -19,7 +22,7 @@ from app.api.deps import (
     require_manager_or_above,
     require_admin,
 )
-from app.models.user import User
+from app.core.principal_cache import Principal
 from app.models.product import Product
 
 router = APIRouter()
@@ -39,7 +42,7 @@ def create_product(
     *,
     db: Session = Depends(get_db),
     product_in: ProductCreateRequest,
-    current_user: User = Depends(require_manager_or_above)
+    current_user: Principal = Depends(require_manager_or_above)
 ) -> Any:
     """
     创建新产品
@@ -121,7 +124,7 @@ def create_product(
         activity_type="product",
         action="创建产品",
         item_name=str(product.name),  # type: ignore[arg-type]
-        user_id=int(current_user.id),  # type: ignore[arg-type]
+        user_id=current_user.id,
         reference_id=int(product.id),  # type: ignore[arg-type]
         reference_type="product"
     )
@@ -133,7 +136,7 @@ def create_product(
             activity_type="inventory",
             action="入库",
             item_name=f"{product.name} (初始库存)",  # type: ignore[arg-type]
-            user_id=int(current_user.id),  # type: ignore[arg-type]
+            user_id=current_user.id,
             reference_id=int(product.id),  # type: ignore[arg-type]
             reference_type="product"
         )
@@ -154,9 +157,10 @@ def create_product(
 
 @router.get("/categories", response_model=List[ProductCategoryInDB])
 def read_categories(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
+    _etag: str = Depends(conditional_etag(TAG_CATEGORIES)),
 ) -> Any:
     """获取产品分类列表"""
     return category_repo.get_multi(db, skip=skip, limit=limit)
@@ -182,7 +186,7 @@ def update_product(
     db: Session = Depends(get_db),
     id: int,
     product_in: ProductUpdate,
-    current_user: User = Depends(require_manager_or_above)
+    current_user: Principal = Depends(require_manager_or_above)
 ) -> Any:
     """
     更新产品信息
@@ -233,7 +237,7 @@ def delete_product(
     *,
     db: Session = Depends(get_db),
     id: int,
-    current_user: User = Depends(require_admin)
+    current_user: Principal = Depends(require_admin)
 ) -> Any:
     """
     删除产品（软删除）
@@ -248,9 +252,12 @@ def delete_product(
             detail="产品不存在"
         )
 
-    # 软删除：设置 is_active = False
+    # 软删除：设置 is_active = False，并在同一事务内更新仪表板快照
+    previous = ProductState.of(product)
     product.is_active = False  # type: ignore[assignment]
     db.add(product)
+    dashboard_snapshot.apply_product_change(db, product=product, previous=previous)
+    change_counter.bump(db, TAG_PRODUCTS)
     db.commit()
     db.refresh(product)
 
@@ -18,7 +18,7 @@ from app.schemas.sales import (
 from app.models.sales import Distributor, SalesOrder
 from app.models.product import Product
 from app.api.deps import require_manager_or_above
-from app.models.user import User
+from app.core.principal_cache import Principal
 from app.utils.activity import log_activity
 from app.utils.notification import send_notification_to_managers, send_notification
 
@@ -85,7 +85,7 @@ def list_sales_orders(
 def create_sales_order(
     order_in: SalesOrderCreateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_manager_or_above)
+    current_user: Principal = Depends(require_manager_or_above)
 ) -> SalesOrderInDB:
     """
     创建新订单
@@ -133,7 +133,7 @@ def create_sales_order(
         order_date=datetime.now(),
         warehouse_id=order_in.warehouse_id,
         delivery_date=order_in.delivery_date,
-        user_id=int(current_user.id),  # type: ignore[arg-type]
+        user_id=current_user.id,
         notes=order_in.notes
     )
 
@@ -145,7 +145,7 @@ def create_sales_order(
         activity_type="order",
         action="创建订单",
         item_name=f"订单 {order.order_code}",  # type: ignore[arg-type]
-        user_id=int(current_user.id),  # type: ignore[arg-type]
+        user_id=current_user.id,
         reference_id=int(order.id),  # type: ignore[arg-type]
         reference_type="order"
     )
@@ -170,7 +170,7 @@ def update_sales_order(
     order_id: int,
     order_in: SalesOrderUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_manager_or_above)
+    current_user: Principal = Depends(require_manager_or_above)
 ) -> SalesOrderInDB:
     db_obj = sales_crud.sales_order.get(db, order_id)
     if not db_obj:
@@ -203,7 +203,7 @@ def update_sales_order(
         activity_type="order",
         action=action,
         item_name=f"订单 {order.order_code}",  # type: ignore[arg-type]
-        user_id=int(current_user.id),  # type: ignore[arg-type]
+        user_id=current_user.id,
         reference_id=int(order.id),  # type: ignore[arg-type]
         reference_type="order"
     )
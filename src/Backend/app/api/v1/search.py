@@ -2,9 +2,9 @@
 
 from typing import Any, List, Dict
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
+from app.core.database import get_async_read_db
 from app.models.product import Product
 from app.models.sales import SalesOrder, Distributor
 from app.models.inventory import Inventory, Warehouse
@@ -24,8 +24,8 @@ router = APIRouter()
 
 
 @router.get("/", response_model=List[SearchResult])
-def global_search(
-    db: Session = Depends(get_db),
+async def global_search(
+    db: AsyncSession = Depends(get_async_read_db),
     q: str = Query(..., min_length=1, description="搜索关键词"),
     limit: int = Query(20, le=50, description="返回结果数量限制")
 ) -> Any:
@@ -44,13 +44,15 @@ def global_search(
     search_pattern = f"%{q.replace(' ', '%')}%"
 
     # 搜索产品
-    products = db.query(Product).filter(
-        or_(
-            Product.name.like(search_pattern),
-            Product.sku.like(search_pattern),
-            Product.part_number.like(search_pattern)
-        )
-    ).limit(limit // 4).all()
+    products = (await db.scalars(
+        select(Product).where(
+            or_(
+                Product.name.like(search_pattern),
+                Product.sku.like(search_pattern),
+                Product.part_number.like(search_pattern)
+            )
+        ).limit(limit // 4)
+    )).all()
 
     for product in products:
         results.append(SearchResult(
@@ -62,12 +64,14 @@ def global_search(
         ))
 
     # 搜索订单
-    orders = db.query(SalesOrder).filter(
-        or_(
-            SalesOrder.order_code.like(search_pattern),
-            SalesOrder.product_name.like(search_pattern)
-        )
-    ).limit(limit // 4).all()
+    orders = (await db.scalars(
+        select(SalesOrder).where(
+            or_(
+                SalesOrder.order_code.like(search_pattern),
+                SalesOrder.product_name.like(search_pattern)
+            )
+        ).limit(limit // 4)
+    )).all()
 
     for order in orders:
         results.append(SearchResult(
@@ -79,13 +83,15 @@ def global_search(
         ))
 
     # 搜索经销商
-    distributors = db.query(Distributor).filter(
-        or_(
-            Distributor.name.like(search_pattern),
-            Distributor.code.like(search_pattern),
-            Distributor.region.like(search_pattern)
-        )
-    ).limit(limit // 4).all()
+    distributors = (await db.scalars(
+        select(Distributor).where(
+            or_(
+                Distributor.name.like(search_pattern),
+                Distributor.code.like(search_pattern),
+                Distributor.region.like(search_pattern)
+            )
+        ).limit(limit // 4)
+    )).all()
 
     for dist in distributors:
         results.append(SearchResult(
@@ -97,12 +103,14 @@ def global_search(
         ))
 
     # 搜索仓库
-    warehouses = db.query(Warehouse).filter(
-        or_(
-            Warehouse.name.like(search_pattern),
-            Warehouse.code.like(search_pattern)
-        )
-    ).limit(limit // 4).all()
+    warehouses = (await db.scalars(
+        select(Warehouse).where(
+            or_(
+                Warehouse.name.like(search_pattern),
+                Warehouse.code.like(search_pattern)
+            )
+        ).limit(limit // 4)
+    )).all()
 
     for wh in warehouses:
         results.append(SearchResult(
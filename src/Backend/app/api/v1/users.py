@@ -30,7 +30,8 @@ from app.schemas.user import (
 )
 from app.core.security import verify_password, get_password_hash
 # 依赖项导入
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_db_user, get_current_active_user
+from app.core.principal_cache import Principal, principal_cache
 from app.models.user import User
 
 user_crud: CRUDUser = _user_crud
@@ -61,7 +62,7 @@ def read_users(
 @router.get("/me", response_model=UserInDB)
 def read_user_me(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_db_user)
 ) -> Any:
     """
     获取当前用户信息
@@ -80,7 +81,7 @@ def update_user_profile(
     *,
     db: Session = Depends(get_db),
     profile_data: UserProfileUpdate,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_db_user)
 ) -> Any:
     """
     更新当前用户个人资料
@@ -125,6 +126,7 @@ def update_user_profile(
     db.add(current_user)
     db.commit()
     db.refresh(current_user)
+    principal_cache.invalidate_user(int(current_user.id))  # type: ignore[arg-type]
 
     return current_user
 
@@ -133,7 +135,7 @@ async def upload_avatar(
     *,
     db: Session = Depends(get_db),
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_db_user)
 ) -> Any:
     """
     上传用户头像
@@ -202,7 +204,7 @@ async def upload_avatar(
 def delete_avatar(
     *,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_db_user)
 ) -> Any:
     """
     删除用户头像
@@ -235,7 +237,7 @@ def delete_avatar(
 
 @router.get("/me/avatar/default")
 def get_default_avatar(
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     获取默认头像SVG
@@ -251,7 +253,7 @@ def get_default_avatar(
         "#FF6B6B", "#4ECDC4", "#45B7D1", "#FFA07A", "#98D8C8",
         "#F7DC6F", "#BB8FCE", "#85C1E2", "#F8B739", "#52B788"
     ]
-    user_id = int(current_user.id) if current_user.id else 0   #type: ignore[arg-type]
+    user_id = current_user.id
     bg_color = colors[user_id % len(colors)]
 
     # 生成SVG
@@ -276,7 +278,7 @@ def change_password(
     *,
     db: Session = Depends(get_db),
     password_data: UserPasswordUpdate,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_db_user)
 ) -> Any:
     """
     修改当前用户密码
@@ -304,6 +306,7 @@ def change_password(
     current_user.hashed_password = hashed_password  # type: ignore[assignment]
     db.add(current_user)
     db.commit()
+    principal_cache.invalidate_user(int(current_user.id))  # type: ignore[arg-type]
 
     return PasswordChangeResponse(message="密码修改成功")
 
@@ -313,7 +316,7 @@ def update_password(
     *,
     db: Session = Depends(get_db),
     password_data: UserPasswordUpdate,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_db_user)
 ):
     """
     更新用户密码（已废弃，请使用 POST /me/change-password）
@@ -325,4 +328,5 @@ def update_password(
     setattr(current_user, "hashed_password", hashed_password)
     db.add(current_user)
     db.commit()
+    principal_cache.invalidate_user(int(current_user.id))  # type: ignore[arg-type]
     return {"msg": "Password updated successfully"}
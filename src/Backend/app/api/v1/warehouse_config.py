@@ -17,7 +17,7 @@ from app.schemas.warehouse_config import (
     WarehouseConfigUpdate,
 )
 from app.api.deps import get_current_active_user, require_manager_or_above
-from app.models.user import User
+from app.core.principal_cache import Principal
 
 router = APIRouter()
 
@@ -25,7 +25,7 @@ router = APIRouter()
 @router.get("/config", response_model=WarehouseConfigResponse)
 def get_warehouse_config(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Any:
     """
     获取仓库配置
@@ -55,7 +55,7 @@ def update_warehouse_config(
     *,
     db: Session = Depends(get_db),
     config_data: WarehouseConfigUpdate,
-    current_user: User = Depends(require_manager_or_above)
+    current_user: Principal = Depends(require_manager_or_above)
 ) -> Any:
     """
     更新仓库配置
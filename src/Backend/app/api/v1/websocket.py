@@ -4,129 +4,168 @@ WebSocket API 路由
 该模块定义了 WebSocket 相关的 API 路由。
 主要功能：
 1. WebSocket 连接端点（用于实时通知推送）
+2. 连接上的主题订阅（库存、订单状态、活动日志的增量事件）
+3. 断线重连时按通知序号补发缺失的通知
+4. 握手时协商帧编码（JSON 文本帧或 MessagePack 二进制帧）
 """
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.websocket import manager
-from app.core.dependencies import get_current_user
-from app.models.user import User
-from jose import JWTError
+from typing import Optional
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Query
+from app.core.websocket import ClientConnection, manager, negotiate_encoding
+from app.core.dependencies import authenticate_token_async
+from app.core.principal_cache import Principal
 import json
 
 router = APIRouter()
 
 
-async def get_current_user_ws(
-    websocket: WebSocket,
-    token: str = Query(...),
-    db: Session = Depends(get_db)
-) -> User:
+async def get_current_user_ws(websocket: WebSocket, token: str) -> Principal:
     """
     从 WebSocket 连接中获取当前用户
 
+    身份缓存未命中时用短生命周期会话查询用户，查询后立即归还连接，
+    连接建立后的整个生命周期都不占用数据库连接。
+
     Args:
         websocket: WebSocket 连接对象
         token: JWT 访问令牌（从查询参数获取）
-        db: 数据库会话
 
     Returns:
-        User: 当前认证用户对象
+        Principal: 当前认证用户身份
 
     Raises:
-        WebSocketDisconnect: 如果令牌无效或用户不存在
+        WebSocketDisconnect: 如果令牌无效、用户不存在或用户不活跃
     """
     try:
-        # 使用现有的 get_current_user 依赖来验证 token
-        from app.core.dependencies import oauth2_scheme
-        from jose import jwt
-        from app.core.config import settings
-        from app.crud.user import user as user_crud
+        return await authenticate_token_async(token)
+    except HTTPException as exc:
+        await websocket.close(code=1008, reason=str(exc.detail))
+        raise WebSocketDisconnect(code=1008)
 
-        # 解析 JWT token
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-        )
-        username = payload.get("sub")
 
-        if not isinstance(username, str):
-            await websocket.close(code=1008, reason="Invalid credentials")
-            raise WebSocketDisconnect()
+def handle_subscription(connection: ClientConnection, data: str) -> None:
+    """
+    处理客户端的订阅/取消订阅请求
 
-        user = user_crud.get_by_username(db, username=username)
-        if user is None:
-            await websocket.close(code=1008, reason="User not found")
-            raise WebSocketDisconnect()
+    请求格式：{"action": "subscribe" | "unsubscribe", "topics": ["warehouse:1:inventory", ...]}，
+    应答经发送队列返回当前订阅的全部主题及被拒绝的主题。
 
-        return user
+    Args:
+        connection: 连接对象
+        data: 客户端发送的文本消息
+    """
+    try:
+        request = json.loads(data)
+    except ValueError:
+        request = None
+    action = request.get("action") if isinstance(request, dict) else None
+    topics = request.get("topics") if isinstance(request, dict) else None
+    if action not in ("subscribe", "unsubscribe") or not isinstance(topics, list):
+        manager.enqueue(connection, json.dumps({
+            "type": "error",
+            "data": {"message": "无法识别的消息，订阅格式为 {\"action\": \"subscribe\", \"topics\": [...]}"}
+        }))
+        return
 
-    except JWTError:
-        await websocket.close(code=1008, reason="Invalid token")
-        raise WebSocketDisconnect()
+    if action == "subscribe":
+        subscribed, rejected = manager.subscribe(connection, topics)
+    else:
+        subscribed, rejected = manager.unsubscribe(connection, topics), []
+    manager.enqueue(connection, json.dumps({
+        "type": "subscriptions",
+        "data": {"topics": subscribed, "rejected": rejected}
+    }))
 
 
 @router.websocket("/ws/notifications")
 async def websocket_endpoint(
     websocket: WebSocket,
     token: str = Query(...),
-    db: Session = Depends(get_db)
+    since: Optional[int] = Query(None, ge=0, description="重连时携带最后收到的通知序号 seq，只补发此后的通知"),
 ):
     """
     WebSocket 通知推送端点
 
     客户端连接示例：
     ```javascript
+    // 重连时追加 &since=<最后收到的 seq>，服务端只补发缺失的通知，无需重新拉取通知列表
     const ws = new WebSocket('ws://localhost:8000/api/v1/ws/notifications?token=YOUR_JWT_TOKEN');
+    // 或提供子协议 msgpack 请求二进制帧：new WebSocket(url, ['msgpack'])，
+    // 以 ws.protocol 判断协商结果（服务端未安装 msgpack 时为空，仍使用 JSON 文本帧）
 
     ws.onmessage = (event) => {
       const data = JSON.parse(event.data);
-      if (data.type === 'notification') {
+      if (data.type === 'ping') {
+        ws.send('pong');  // 回复服务端心跳，否则空闲超时后连接会被关闭
+      } else if (data.type === 'notification') {
+        lastSeq = Math.max(lastSeq, data.seq);  // 补发与实时推送可能重叠，按 seq 去重
         console.log('New notification:', data.data);
+      } else if (data.type === 'replay' && data.data.truncated) {
+        // 缺失的通知过多，改为调用 GET /notifications/ 全量刷新
+      } else if (data.type === 'event') {
+        console.log(data.topic, data.event, data.data);  // 订阅主题的增量事件
+      } else if (data.type === 'events') {
+        data.events.forEach((e) => console.log(e.topic, e.event, e.data));  // 同一主题合并发送的多条事件
       }
     };
+    ws.onopen = () => ws.send(JSON.stringify({
+      action: 'subscribe',
+      topics: ['warehouse:1:inventory', 'orders:status', 'activity'],
+    }));
     ```
 
     Args:
         websocket: WebSocket 连接对象
         token: JWT 访问令牌
-        db: 数据库会话
+        since: 最后收到的通知序号（首次连接不传）
     """
     # 验证用户身份
     try:
-        user = await get_current_user_ws(websocket, token, db)
+        user = await get_current_user_ws(websocket, token)
     except WebSocketDisconnect:
         return
 
-    user_id = int(user.id)  # type: ignore[arg-type]
+    user_id = user.id
 
-    # 建立连接
-    await manager.connect(websocket, user_id)
+    # 建立连接（之后对该连接的所有发送都经过其发送队列，由写任务串行发送）
+    encoding = negotiate_encoding(websocket.scope.get("subprotocols") or [])
+    connection = await manager.connect(websocket, user_id, encoding)
+    if connection is None:
+        # 进程连接数已满或应用正在关闭，连接已被关闭
+        return
 
     # 发送连接成功消息
-    await websocket.send_text(json.dumps({
+    manager.enqueue(connection, json.dumps({
         "type": "connection",
         "data": {
             "status": "connected",
             "user_id": user_id,
+            "encoding": connection.encoding,
             "message": "WebSocket 连接已建立"
         }
     }))
 
+    # 重连补发：缺失的通知之后跟一条 replay 汇总消息
+    if since is not None:
+        await manager.replay(connection, since)
+
     try:
         while True:
-            # 接收客户端消息（保持连接活跃）
+            # 接收客户端消息：任何消息（包括对服务端 ping 的 pong 回复）都刷新空闲计时
             data = await websocket.receive_text()
+            connection.touch()
 
-            # 处理心跳消息
+            # 处理客户端发起的心跳消息
             if data == "ping":
-                await websocket.send_text(json.dumps({
+                manager.enqueue(connection, json.dumps({
                     "type": "pong",
                     "data": {"timestamp": str(websocket)}
                 }))
+            elif data.startswith("{"):
+                handle_subscription(connection, data)
 
     except WebSocketDisconnect:
-        # 断开连接
+        pass
+    finally:
+        # 断开连接（客户端关闭，或服务端因发送队列溢出已主动关闭）
         manager.disconnect(websocket, user_id)
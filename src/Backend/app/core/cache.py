@@ -0,0 +1,346 @@
+"""
+分区缓存模块
+
+该模块提供按分区（section）组织、带 TTL 与数据标签的进程内缓存。
+主要功能：
+1. 缓存条目按 (分区, 参数) 作为键，超过 TTL 后失效；条目数有上限，超出时按 LRU 淘汰
+2. 每个条目记录其依赖标签在写入时的版本号，版本号变化即视为失效
+3. 单飞（single-flight）：同一键的并发计算合并为一次，后到者等待其结果
+4. 过期后重新验证（stale-while-revalidate）：仅 TTL 到期（标签版本未变）的条目在宽限期内
+   直接返回旧值，由后台线程完成唯一一次刷新；被写操作失效的条目总是同步重新计算
+5. 按分区统计命中、未命中、标签失效、过期、旧值返回与合并等待次数
+6. 同时提供同步与异步（async）读取接口，二者共享条目与单飞状态
+
+版本号来自数据库中的变更计数器（见 app.crud.change_counter），
+因此一个 worker 中的写操作也能让其它 worker 的缓存条目失效。
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Iterator, List, Mapping, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# 当前请求中返回了旧值的分区（由 track_stale 开启记录）
+_stale_sections: ContextVar[Optional[List[str]]] = ContextVar("stale_sections", default=None)
+
+
+@contextmanager
+def track_stale() -> Iterator[List[str]]:
+    """
+    记录代码块内返回了旧值的分区
+
+    调用方据此判断响应内容是否与当前数据版本一致（例如决定是否下发 ETag）。
+    在线程池中执行的计算需通过 contextvars.copy_context().run 调用才能被记录。
+
+    Yields:
+        List[str]: 返回了旧值的分区名称列表
+    """
+    sections: List[str] = []
+    token = _stale_sections.set(sections)
+    try:
+        yield sections
+    finally:
+        _stale_sections.reset(token)
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目"""
+
+    value: Any
+    versions: Tuple[int, ...]
+    expires_at: float
+    stale_until: float
+
+
+@dataclass
+class SectionStats:
+    """单个分区的缓存统计"""
+
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    expirations: int = 0
+    evictions: int = 0
+    stale_hits: int = 0
+    coalesced: int = 0
+    refreshes: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "stale_hits": self.stale_hits,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+        }
+
+
+class SectionCache:
+    """按分区组织、标签版本失效的进程内缓存"""
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        stale_seconds: float = 0,
+        refresh_workers: int = 2,
+        max_entries: int = 256,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            ttl_seconds: 条目有效期（秒）
+            stale_seconds: 条目失效后仍可返回旧值的宽限期（秒），0 表示不返回旧值
+            refresh_workers: 后台刷新线程数
+            max_entries: 最大条目数，超出时淘汰最久未使用的条目
+        """
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Hashable], CacheEntry]" = OrderedDict()
+        # 进行中的计算及其对应的标签版本号：版本号不同的调用方不会合并到旧版本的计算上
+        self._inflight: Dict[Tuple[str, Hashable], Tuple[Future, Tuple[int, ...]]] = {}
+        self._stats: Dict[str, SectionStats] = {}
+        self._lock = threading.Lock()
+        self._refresh_executor = ThreadPoolExecutor(
+            max_workers=refresh_workers, thread_name_prefix="cache-refresh"
+        )
+
+    @staticmethod
+    def _versions_of(tags: Iterable[str], versions: Mapping[str, int]) -> Tuple[int, ...]:
+        return tuple(versions.get(tag, 0) for tag in tags)
+
+    def get_or_compute(
+        self,
+        section: str,
+        key: Hashable,
+        tags: Tuple[str, ...],
+        versions: Mapping[str, int],
+        compute: Callable[[], T],
+        refresh: Optional[Callable[[], T]] = None,
+    ) -> T:
+        """
+        读取缓存，未命中时计算并写入
+
+        同一键同时只会有一次计算：并发的未命中请求等待正在进行的计算结果。
+        条目 TTL 到期（标签版本未变）但仍在宽限期内且提供了 refresh 时，立即返回旧值，
+        并在后台线程中用 refresh 刷新（同一键同时最多一个刷新任务）；标签版本变化时同步重新计算。
+
+        Args:
+            section: 分区名称（用于统计）
+            key: 分区内的缓存键（通常为查询参数）
+            tags: 该分区依赖的数据标签
+            versions: 当前各标签的版本号
+            compute: 在调用方线程中执行的计算函数
+            refresh: 在后台线程中执行的刷新函数（不能依赖调用方的数据库会话）
+
+        Returns:
+            缓存值或新计算的值
+        """
+        cache_key = (section, key)
+        current_versions = self._versions_of(tags, versions)
+        found, value, inflight, leader = self._lookup(section, cache_key, current_versions, refresh)
+        if found:
+            return value
+        assert inflight is not None
+        if not leader:
+            return inflight.result()
+        return self._run(cache_key, current_versions, compute, inflight)
+
+    async def get_or_compute_async(
+        self,
+        section: str,
+        key: Hashable,
+        tags: Tuple[str, ...],
+        versions: Mapping[str, int],
+        compute: Callable[[], Awaitable[T]],
+        refresh: Optional[Callable[[], T]] = None,
+    ) -> T:
+        """
+        get_or_compute 的异步版本，供 async 端点使用
+
+        与同步版本共享条目、单飞与统计：等待其它调用方的计算结果时不阻塞事件循环；
+        后台刷新仍在刷新线程中执行同步的 refresh。
+
+        Args:
+            section: 分区名称（用于统计）
+            key: 分区内的缓存键（通常为查询参数）
+            tags: 该分区依赖的数据标签
+            versions: 当前各标签的版本号
+            compute: 在调用方协程中等待的计算函数
+            refresh: 在后台线程中执行的同步刷新函数（不能依赖调用方的数据库会话）
+
+        Returns:
+            缓存值或新计算的值
+        """
+        cache_key = (section, key)
+        current_versions = self._versions_of(tags, versions)
+        found, value, inflight, leader = self._lookup(section, cache_key, current_versions, refresh)
+        if found:
+            return value
+        assert inflight is not None
+        if not leader:
+            # shield：调用方被取消时不能连带取消其它调用方共享的 Future
+            return await asyncio.shield(asyncio.wrap_future(inflight))
+
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            self._fail(cache_key, inflight, RuntimeError(f"缓存分区 {section} 的计算已取消"))
+            raise
+        except BaseException as exc:
+            self._fail(cache_key, inflight, exc)
+            raise
+        self._store(cache_key, current_versions, value, inflight)
+        return value
+
+    def _lookup(
+        self,
+        section: str,
+        cache_key: Tuple[str, Hashable],
+        current_versions: Tuple[int, ...],
+        refresh: Optional[Callable[[], Any]],
+    ) -> Tuple[bool, Any, Optional[Future], bool]:
+        """
+        查找条目并登记统计
+
+        Returns:
+            Tuple: (是否可直接返回, 返回值, 正在进行的计算, 当前调用方是否负责计算)
+        """
+        now = time.monotonic()
+        with self._lock:
+            stats = self._stats.setdefault(section, SectionStats())
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                self._entries.move_to_end(cache_key)
+                if entry.versions == current_versions and entry.expires_at > now:
+                    stats.hits += 1
+                    return True, entry.value, None, False
+
+                if entry.versions != current_versions:
+                    # 写操作使条目失效：不返回旧值，以免写后读看到写入前的数据
+                    stats.invalidations += 1
+                else:
+                    stats.expirations += 1
+
+                if entry.versions == current_versions and refresh is not None and entry.stale_until > now:
+                    stats.stale_hits += 1
+                    stale_sections = _stale_sections.get()
+                    if stale_sections is not None:
+                        stale_sections.append(section)
+                    if cache_key not in self._inflight:
+                        stats.refreshes += 1
+                        future: Future = Future()
+                        self._inflight[cache_key] = (future, current_versions)
+                        self._refresh_executor.submit(
+                            self._refresh, cache_key, current_versions, refresh, future
+                        )
+                    return True, entry.value, None, False
+
+            pending = self._inflight.get(cache_key)
+            if pending is not None and pending[1] == current_versions:
+                stats.coalesced += 1
+                return False, None, pending[0], False
+            stats.misses += 1
+            inflight: Future = Future()
+            self._inflight[cache_key] = (inflight, current_versions)
+            return False, None, inflight, True
+
+    def _run(
+        self,
+        cache_key: Tuple[str, Hashable],
+        versions: Tuple[int, ...],
+        compute: Callable[[], T],
+        future: Future,
+    ) -> T:
+        """执行计算，写入缓存并唤醒等待同一键的调用方"""
+        try:
+            value = compute()
+        except BaseException as exc:
+            self._fail(cache_key, future, exc)
+            raise
+        self._store(cache_key, versions, value, future)
+        return value
+
+    def _store(
+        self,
+        cache_key: Tuple[str, Hashable],
+        versions: Tuple[int, ...],
+        value: Any,
+        future: Future,
+    ) -> None:
+        """写入条目并唤醒等待者"""
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[cache_key] = CacheEntry(
+                value=value,
+                versions=versions,
+                expires_at=expires_at,
+                stale_until=expires_at + self.stale_seconds,
+            )
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                (section, _), _ = self._entries.popitem(last=False)
+                self._stats.setdefault(section, SectionStats()).evictions += 1
+            self._release(cache_key, future)
+        future.set_result(value)
+
+    def _fail(self, cache_key: Tuple[str, Hashable], future: Future, exc: BaseException) -> None:
+        """计算失败：移除进行中的标记并把异常传给等待者"""
+        with self._lock:
+            self._release(cache_key, future)
+        future.set_exception(exc)
+
+    def _release(self, cache_key: Tuple[str, Hashable], future: Future) -> None:
+        """移除进行中的标记（调用方需持有锁）；该键已被更新版本的计算接替时保留新标记"""
+        pending = self._inflight.get(cache_key)
+        if pending is not None and pending[0] is future:
+            del self._inflight[cache_key]
+
+    def _refresh(
+        self,
+        cache_key: Tuple[str, Hashable],
+        versions: Tuple[int, ...],
+        refresh: Callable[[], Any],
+        future: Future,
+    ) -> None:
+        """后台刷新；失败时保留旧条目，下一次请求会再次触发刷新"""
+        try:
+            self._run(cache_key, versions, refresh, future)
+        except Exception as exc:
+            logger.error(f"后台刷新缓存分区 {cache_key[0]} 失败: {exc}")
+
+    def clear(self) -> None:
+        """清空全部条目与统计"""
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        Returns:
+            Dict[str, Any]: 当前进程 ID、条目数与各分区的命中统计
+        """
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "entries": len(self._entries),
+                "sections": {name: stats.to_dict() for name, stats in self._stats.items()},
+            }
@@ -24,6 +24,34 @@ class Settings(BaseSettings):
         default=None,
         description="SQLAlchemy 连接字符串，需在 .env 中配置",
     )
+    REPLICA_DATABASE_URL: Optional[str] = Field(
+        default=None,
+        description="只读副本连接字符串，配置后只读端点读副本；本地可用另一个 SQLite 文件模拟",
+    )
+    READ_YOUR_WRITES_SECONDS: int = Field(
+        default=5,
+        description="写请求成功后同一客户端的读请求继续走主库的时间窗口（秒），应大于副本复制延迟",
+    )
+
+    # 连接池与 SQL 日志配置（每个 worker 进程、每个引擎各有一个连接池）
+    DB_POOL_SIZE: int = Field(
+        default=5,
+        description="每个引擎常驻的连接数；worker 数 × 引擎数 × (DB_POOL_SIZE + DB_MAX_OVERFLOW) 应小于数据库 max_connections",
+    )
+    DB_MAX_OVERFLOW: int = Field(default=10, description="连接耗尽时允许临时超出 DB_POOL_SIZE 的连接数")
+    DB_POOL_TIMEOUT: float = Field(default=30.0, description="连接池耗尽时等待可用连接的最长时间（秒）")
+    DB_POOL_RECYCLE: int = Field(default=300, description="连接使用超过该时间（秒）后回收重连，应小于数据库的 wait_timeout")
+    SQL_ECHO: bool = Field(default=False, description="是否输出全部 SQL 语句（仅用于本地调试）")
+    SQL_LOG_SAMPLE_RATE: float = Field(
+        default=0.0,
+        ge=0.0,
+        le=1.0,
+        description="普通 SQL 语句写入结构化日志（app.sql）的采样比例，0 表示只记录慢语句",
+    )
+    SQL_SLOW_THRESHOLD_MS: float = Field(
+        default=500.0,
+        description="慢语句阈值（毫秒），超过阈值的语句总是以 WARNING 级别记录；0 表示关闭",
+    )
 
     # JWT配置（通过环境变量注入）
     SECRET_KEY: str = Field(
@@ -38,6 +66,28 @@ class Settings(BaseSettings):
         default=1440,
         description="访问令牌有效期（分钟），可通过环境变量覆盖",
     )
+    AUTH_PRINCIPAL_CACHE_SECONDS: int = Field(
+        default=30,
+        ge=0,
+        description="令牌到当前用户身份的进程内缓存时长（秒）；经用户接口修改资料或密码时立即失效，0 表示关闭",
+    )
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = Field(default=10000, description="身份缓存最多保存的令牌数")
+
+    # 密码哈希与登录限流配置
+    PASSWORD_HASH_WORKERS: int = Field(default=2, description="执行 bcrypt 哈希/校验的专用线程数")
+    PASSWORD_HASH_MAX_QUEUE: int = Field(
+        default=16,
+        description="哈希任务允许排队的数量，超过后立即返回 503",
+    )
+    LOGIN_THROTTLE_WINDOW_SECONDS: int = Field(default=300, description="登录限流的统计窗口（秒）")
+    LOGIN_MAX_FAILURES_PER_USERNAME: int = Field(
+        default=5,
+        description="窗口内同一用户名允许的失败次数，超过后返回 429（登录成功会清零）",
+    )
+    LOGIN_MAX_ATTEMPTS_PER_IP: int = Field(
+        default=30,
+        description="窗口内同一客户端 IP 允许的登录尝试次数（成功与失败都计入），超过后返回 429",
+    )
 
     # CORS配置（本地开发默认包含 5173 与 8003）
     BACKEND_CORS_ORIGINS: List[str] = [
@@ -47,6 +97,88 @@ class Settings(BaseSettings):
         "http://127.0.0.1:8003",
     ]
 
+    # 仪表板缓存配置
+    DASHBOARD_CACHE_TTL_SECONDS: int = Field(
+        default=30,
+        description="仪表板分区缓存有效期（秒），写操作会通过变更计数器提前失效",
+    )
+    DASHBOARD_CACHE_STALE_SECONDS: int = Field(
+        default=60,
+        description="分区缓存 TTL 到期后仍可直接返回旧值的宽限期（秒，写操作导致的失效不返回旧值），期间由后台单次刷新；0 表示关闭",
+    )
+    DASHBOARD_CACHE_MAX_ENTRIES: int = Field(
+        default=256,
+        description="分区缓存的最大条目数，超出时淘汰最久未使用的条目（键包含 limit/days 等请求参数）",
+    )
+    DASHBOARD_PARALLEL_SECTIONS: bool = Field(
+        default=False,
+        description="是否在线程池中并行计算仪表板各分区（每个分区使用独立会话）",
+    )
+    DASHBOARD_SECTION_WORKERS: int = Field(default=8, description="并行计算仪表板分区的线程数上限")
+    DASHBOARD_SECTION_TIMEOUT_SECONDS: float = Field(
+        default=5.0,
+        description="并行模式下单个分区的超时时间（秒），超时的分区以空值返回并标记为降级",
+    )
+
+    # 仪表板实时推送（SSE）配置
+    DASHBOARD_STREAM_POLL_SECONDS: float = Field(default=1.0, description="轮询变更计数器的间隔（秒），每个进程只有一个轮询任务")
+    DASHBOARD_STREAM_DEBOUNCE_SECONDS: float = Field(default=1.0, description="同一订阅者两次增量推送之间的最短间隔（秒）")
+    DASHBOARD_STREAM_KEEPALIVE_SECONDS: float = Field(default=15.0, description="无变化时发送保活注释的间隔（秒）")
+
+    # WebSocket 推送配置
+    WS_BUS_BACKEND: str = Field(
+        default="local",
+        description="跨 worker 推送的消息总线：local（单进程，直接推送）或 database（发件箱表，多 worker 部署使用）",
+    )
+    WS_BUS_POLL_SECONDS: float = Field(default=0.5, description="数据库消息总线轮询发件箱的间隔（秒）")
+    WS_BUS_RETENTION_SECONDS: int = Field(default=600, description="发件箱消息保留时长（秒），由定时任务清理")
+    WS_SEND_QUEUE_SIZE: int = Field(
+        default=100,
+        description="每个 WebSocket 连接的发送队列容量，溢出时以关闭码 1013 断开该慢客户端",
+    )
+    WS_HEARTBEAT_SECONDS: float = Field(default=20.0, description="服务端向每个连接发送 ping 的间隔（秒），0 表示关闭心跳")
+    WS_IDLE_TIMEOUT_SECONDS: float = Field(
+        default=60.0,
+        description="超过该时长（秒）未收到客户端任何消息的连接视为半开连接并关闭，应大于心跳间隔；0 表示不限",
+    )
+    WS_MAX_CONNECTIONS_PER_USER: int = Field(
+        default=5,
+        description="每个用户在单个进程内的最大连接数，超出时关闭该用户最旧的连接；0 表示不限",
+    )
+    WS_MAX_CONNECTIONS: int = Field(
+        default=10000,
+        description="单个进程的最大 WebSocket 连接数（受文件描述符上限约束），超出时以 1013 拒绝新连接；0 表示不限",
+    )
+    WS_MAX_TOPICS_PER_CONNECTION: int = Field(default=50, description="每个 WebSocket 连接最多订阅的主题数；0 表示不限")
+    WS_REPLAY_BUFFER_SIZE: int = Field(
+        default=50,
+        description="重连补发的内存环形缓冲中每个用户保存的最近通知数，缺口更早时回退到数据库查询；0 表示总是查询数据库",
+    )
+    WS_REPLAY_MAX_USERS: int = Field(default=2000, description="重连补发缓冲最多保存的用户数，超出时淘汰最久未收到推送的用户")
+    WS_REPLAY_MAX_MESSAGES: int = Field(
+        default=50,
+        description="一次重连最多补发的通知数（另受发送队列容量限制），超出时提示客户端改为全量刷新通知列表",
+    )
+    WS_TOPIC_BATCH_SECONDS: float = Field(
+        default=0.1,
+        description="同一订阅主题的事件合并为一帧发送的时间窗口（秒），写入突发时减少帧数；0 表示逐条发送",
+    )
+    WS_TOPIC_BATCH_MAX_EVENTS: int = Field(default=200, description="单帧合并的最大事件数，达到后立即发送")
+    WS_DRAIN_TIMEOUT_SECONDS: float = Field(default=5.0, description="应用关闭时等待各连接发送完队列中消息的最长时间（秒）")
+
+    # 后台任务调度器配置
+    SCHEDULER_LEASE_SECONDS: int = Field(
+        default=30,
+        description="调度主节点租约时长（秒）；主节点失联后其它 worker 最迟约 4/3 个租约时长内接管",
+    )
+    SCHEDULER_JOB_WORKERS: int = Field(default=2, description="执行定时任务的线程数（与事件循环分离）")
+
+    # 销售分析缓存配置（需要安装 numpy）
+    ANALYTICS_REFRESH_SECONDS: int = Field(
+        default=10,
+        description="销售分析列式缓存的最短刷新间隔（秒），查询时超过该间隔才做增量刷新",
+    )
+
     # AI服务配置
     OPENAI_API_KEY: Optional[str] = None
     RAG_ENABLED: bool = False
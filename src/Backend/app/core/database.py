@@ -3,34 +3,182 @@
 
 该模块负责初始化和管理数据库连接。
 主要功能：
-1. 创建 SQLAlchemy 数据库引擎
+1. 创建 SQLAlchemy 数据库引擎（主库，可选只读副本）
 2. 创建会话工厂
-3. 提供数据库会话依赖项
+3. 提供数据库会话依赖项（读写走主库，只读端点可走副本）
+4. 读己之写（read-your-writes）：写请求成功后的短时间内，同一客户端的读请求仍走主库
+5. 异步引擎与 AsyncSession 依赖项（aiomysql / aiosqlite / asyncpg），供 async 端点使用，
+   并发查询数受连接池而非线程池限制；异步引擎在第一次使用时创建，缺少异步驱动只影响 async 端点，
+   不影响应用启动
+6. 连接池大小、回收与 SQL 日志由配置控制，每个引擎都注册了连接池统计
+7. 为已存在的表补建后续版本新增的索引（create_all 只创建缺失的表，不会修改已有表）
 """
 
-from sqlalchemy import create_engine
+import logging
+import time
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import Request
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .db_metrics import instrument_engine, pool_options
+
+logger = logging.getLogger(__name__)
+
+# 同步驱动对应的异步驱动
+ASYNC_DRIVERS = {
+    "mysql": "aiomysql",
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def _pool_kwargs(url: Any) -> Dict[str, Any]:
+    return {
+        "pool_pre_ping": True,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        **pool_options(url, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW, settings.DB_POOL_TIMEOUT),
+    }
+
+
+def to_async_url(url: str) -> URL:
+    """
+    将同步连接字符串转换为对应异步驱动的连接字符串
+
+    例如 mysql+pymysql://... 转换为 mysql+aiomysql://...，sqlite:///... 转换为 sqlite+aiosqlite:///...
+
+    Args:
+        url: 同步连接字符串
+
+    Returns:
+        URL: 异步连接 URL
 
-# 创建数据库引擎
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    echo=True  # 打印SQL语句用于调试
+    Raises:
+        ValueError: 数据库类型没有对应的异步驱动
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"数据库类型 {backend} 没有配置异步驱动")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def _create_engine(name: str, url: str) -> Engine:
+    created = create_engine(url, echo=settings.SQL_ECHO, **_pool_kwargs(url))
+    instrument_engine(name, created, settings.SQL_LOG_SAMPLE_RATE, settings.SQL_SLOW_THRESHOLD_MS)
+    return created
+
+
+def _create_async_engine(name: str, url: str) -> AsyncEngine:
+    async_url = to_async_url(url)
+    created = create_async_engine(async_url, echo=settings.SQL_ECHO, **_pool_kwargs(async_url))
+    instrument_engine(name, created.sync_engine, settings.SQL_LOG_SAMPLE_RATE, settings.SQL_SLOW_THRESHOLD_MS)
+    return created
+
+
+def _async_session_factory(bind: AsyncEngine, sync_bind: Engine) -> async_sessionmaker:
+    # sync_bind 供后台线程中的同步代码（如缓存刷新）连接同一个数据库
+    return async_sessionmaker(
+        bind=bind,
+        autoflush=False,
+        expire_on_commit=False,
+        info={"sync_bind": sync_bind},
+    )
+
+
+# 创建数据库引擎（连接池大小与 SQL 日志由配置控制，见 app.core.db_metrics）
+engine = _create_engine("primary", settings.SQLALCHEMY_DATABASE_URL)
+
+# 只读副本引擎（未配置 REPLICA_DATABASE_URL 时为 None，读请求全部走主库）
+replica_engine = (
+    _create_engine("replica", settings.REPLICA_DATABASE_URL) if settings.REPLICA_DATABASE_URL else None
 )
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine or engine)
+
+# 异步引擎：与同步引擎指向同一数据库，各自维护连接池；按需创建（见 async_session_factory）
+_async_engines: Dict[str, AsyncEngine] = {}
+_async_session_factories: Dict[str, async_sessionmaker] = {}
+
+
+def async_session_factory(read: bool = False) -> async_sessionmaker:
+    """
+    获取异步会话工厂，第一次调用时创建对应的异步引擎
+
+    Args:
+        read: 是否获取只读副本的会话工厂（未配置副本时返回主库的会话工厂）
+
+    Returns:
+        async_sessionmaker: 异步会话工厂
+
+    Raises:
+        ValueError: 数据库类型没有对应的异步驱动
+    """
+    name = "replica" if read and replica_engine is not None else "primary"
+    factory = _async_session_factories.get(name)
+    if factory is None:
+        if name == "replica":
+            url, sync_bind = settings.REPLICA_DATABASE_URL, replica_engine
+        else:
+            url, sync_bind = settings.SQLALCHEMY_DATABASE_URL, engine
+        created = _create_async_engine(f"{name}_async", url)  # type: ignore[arg-type]
+        _async_engines[name] = created
+        factory = _async_session_factories[name] = _async_session_factory(created, sync_bind)  # type: ignore[arg-type]
+    return factory
+
+
+async def dispose_async_engines() -> None:
+    """释放已创建的异步引擎的连接池（应用关闭时调用）"""
+    engines = list(_async_engines.values())
+    _async_engines.clear()
+    _async_session_factories.clear()
+    for created in engines:
+        await created.dispose()
 
 # 创建基础类，用于定义模型
 Base = declarative_base()
 
+
+def ensure_indexes(bind: Engine, *names: str) -> None:
+    """
+    为已存在的表补建缺失的索引
+
+    create_all 不会给已有的表添加索引，后续版本在模型上新增的索引需在启动时补建。
+    已有覆盖相同列（顺序一致）的索引时跳过，例如由 database/complete_setup.sql 以其它名称建好的索引。
+
+    Args:
+        bind: 数据库引擎
+        names: 模型元数据中的索引名称
+    """
+    inspector = inspect(bind)
+    for table in Base.metadata.sorted_tables:
+        wanted = [index for index in table.indexes if index.name in names]
+        if not wanted or not inspector.has_table(table.name):
+            continue
+        existing = {tuple(index["column_names"]) for index in inspector.get_indexes(table.name)}
+        for index in wanted:
+            columns = tuple(column.name for column in index.columns)
+            if columns in existing:
+                continue
+            logger.info(f"为表 {table.name} 补建索引 {index.name}")
+            index.create(bind=bind, checkfirst=True)
+
+
+# 记录“最近写过”的 Cookie，值为读请求需要继续走主库的截止时间戳
+READ_PRIMARY_COOKIE = "read_primary_until"
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
 def get_db():
     """
     获取数据库会话依赖项
-    
+
     Yields:
         Session: 数据库会话对象
     """
@@ -39,3 +187,104 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def reads_from_primary(request: Request) -> bool:
+    """
+    判断当前请求的读取是否必须走主库
+
+    未配置副本、非只读请求，或客户端刚写过（Cookie 未到期）时走主库。
+
+    Args:
+        request: 当前请求
+
+    Returns:
+        bool: 是否走主库
+    """
+    if replica_engine is None or request.method in WRITE_METHODS:
+        return True
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def get_read_db(request: Request):
+    """
+    获取只读数据库会话依赖项
+
+    只读端点使用：默认读副本，满足读己之写条件时读主库。
+    该会话不能用于写入（副本通常为只读）。
+
+    Args:
+        request: 当前请求
+
+    Yields:
+        Session: 数据库会话对象
+    """
+    db = SessionLocal() if reads_from_primary(request) else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    获取异步数据库会话依赖项（主库）
+
+    Yields:
+        AsyncSession: 异步数据库会话对象
+    """
+    async with async_session_factory()() as db:
+        yield db
+
+
+async def get_async_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """
+    获取异步只读数据库会话依赖项
+
+    路由规则与 get_read_db 相同：默认读副本，满足读己之写条件时读主库。
+
+    Args:
+        request: 当前请求
+
+    Yields:
+        AsyncSession: 异步数据库会话对象
+    """
+    factory = async_session_factory(read=not reads_from_primary(request))
+    async with factory() as db:
+        yield db
+
+
+class ReadYourWritesMiddleware:
+    """
+    读己之写中间件（纯 ASGI 实现，不缓冲流式响应）
+
+    配置了只读副本时，写请求成功后在响应中设置 READ_PRIMARY_COOKIE，
+    使该客户端在 READ_YOUR_WRITES_SECONDS 内的读请求仍走主库，避开副本复制延迟。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            replica_engine is None
+            or scope["type"] != "http"
+            or scope["method"] not in WRITE_METHODS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                window = settings.READ_YOUR_WRITES_SECONDS
+                cookie = (
+                    f"{READ_PRIMARY_COOKIE}={time.time() + window:.3f}; "
+                    f"Max-Age={window}; Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
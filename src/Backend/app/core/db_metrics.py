@@ -0,0 +1,255 @@
+"""
+数据库连接池与 SQL 监控模块
+
+该模块为 app.core.database 创建的引擎提供连接池遥测与结构化 SQL 日志。
+主要功能：
+1. 按驱动默认连接池类型生成连接池参数（大小、溢出、超时），并统计签出等待时间
+2. 统计签出次数、签出等待时间直方图、重连（回收）与失效次数
+3. 结构化 SQL 日志：按比例采样记录语句，超过慢查询阈值的语句总是记录
+
+统计按进程保存，多 worker 部署时每个进程各自统计，可通过返回的 pid 区分。
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+sql_logger = logging.getLogger("app.sql")
+
+# 签出等待时间直方图的桶上界（毫秒）
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+_WAIT_KEY = "checkout_wait"
+_CONNECTED_KEY = "connected"
+_STARTED_KEY = "statement_started"
+
+
+class _TimedCheckoutMixin:
+    """记录从连接池取得连接所等待的时间（含新建连接），供 checkout 事件读取"""
+
+    def _do_get(self):  # type: ignore[no-untyped-def]
+        started = time.perf_counter()
+        record = super()._do_get()  # type: ignore[misc]
+        record.record_info[_WAIT_KEY] = time.perf_counter() - started
+        return record
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    """统计签出等待时间的 QueuePool"""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    """统计签出等待时间的 AsyncAdaptedQueuePool"""
+
+
+def pool_options(url: Any, pool_size: int, max_overflow: int, pool_timeout: float) -> Dict[str, Any]:
+    """
+    生成 create_engine / create_async_engine 的连接池参数
+
+    只有驱动默认使用队列连接池时才设置大小与超时（SQLite 内存库、aiosqlite 文件库等保持默认）。
+
+    Args:
+        url: 连接字符串或 URL
+        pool_size: 常驻连接数
+        max_overflow: 允许超出 pool_size 的连接数
+        pool_timeout: 连接耗尽时等待的最长时间（秒）
+
+    Returns:
+        Dict[str, Any]: 连接池参数
+    """
+    parsed = make_url(url)
+    default_pool = parsed.get_dialect().get_pool_class(parsed)
+    if not issubclass(default_pool, QueuePool):
+        return {}
+    return {
+        "poolclass": (
+            TimedAsyncAdaptedQueuePool if issubclass(default_pool, AsyncAdaptedQueuePool) else TimedQueuePool
+        ),
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+    }
+
+
+class PoolMetrics:
+    """单个引擎的连接池与 SQL 统计"""
+
+    def __init__(self, engine: Engine):
+        """
+        初始化统计并注册连接池事件
+
+        Args:
+            engine: 同步引擎（异步引擎传入其 sync_engine）
+        """
+        self.engine = engine
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.reconnects = 0
+        self.invalidations = 0
+        self.slow_statements = 0
+        self.wait_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection: Any, record: Any) -> None:
+        with self._lock:
+            self.connects += 1
+            # 同一连接记录再次建立连接：超过 pool_recycle 被回收，或失效后重连
+            if record.record_info.get(_CONNECTED_KEY):
+                self.reconnects += 1
+        record.record_info[_CONNECTED_KEY] = True
+
+    def _on_checkout(self, dbapi_connection: Any, record: Any, proxy: Any) -> None:
+        wait = record.record_info.pop(_WAIT_KEY, None)
+        with self._lock:
+            self.checkouts += 1
+            if wait is None:
+                return
+            wait_ms = wait * 1000
+            index = next(
+                (i for i, bound in enumerate(WAIT_BUCKETS_MS) if wait_ms <= bound),
+                len(WAIT_BUCKETS_MS),
+            )
+            self.wait_counts[index] += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+
+    def _on_invalidate(self, dbapi_connection: Any, record: Any, exception: Optional[BaseException]) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def record_slow_statement(self) -> None:
+        with self._lock:
+            self.slow_statements += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取当前统计与连接池实时状态
+
+        Returns:
+            Dict[str, Any]: 连接池状态、签出次数、等待时间直方图、重连与慢查询次数
+        """
+        pool = self.engine.pool
+        live: Dict[str, Any] = {"pool_class": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            live.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=pool.overflow(),
+            )
+
+        with self._lock:
+            histogram: Dict[str, int] = {
+                f"le_{bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_counts)
+            }
+            histogram[f"gt_{WAIT_BUCKETS_MS[-1]}ms"] = self.wait_counts[-1]
+            waits = sum(self.wait_counts)
+            return {
+                **live,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "reconnects": self.reconnects,
+                "recycled": max(self.reconnects - self.invalidations, 0),
+                "invalidations": self.invalidations,
+                "slow_statements": self.slow_statements,
+                "checkout_wait": {
+                    "count": waits,
+                    "avg_ms": round(self.wait_total_ms / waits, 3) if waits else 0.0,
+                    "max_ms": round(self.wait_max_ms, 3),
+                    "histogram": histogram,
+                },
+            }
+
+
+# 已注册的引擎统计（名称 -> 统计）
+_registry: Dict[str, PoolMetrics] = {}
+
+
+def instrument_engine(
+    name: str,
+    engine: Engine,
+    sample_rate: float = 0.0,
+    slow_threshold_ms: float = 500.0,
+) -> PoolMetrics:
+    """
+    为引擎注册连接池统计与结构化 SQL 日志
+
+    日志写入 app.sql 记录器，每条为一个 JSON 对象（不含参数值，避免泄露敏感数据）：
+    慢语句以 WARNING 级别记录，其余语句按 sample_rate 采样以 INFO 级别记录。
+
+    Args:
+        name: 引擎名称（如 primary、replica、primary_async）
+        engine: 同步引擎（异步引擎传入其 sync_engine）
+        sample_rate: 普通语句的采样比例（0~1）
+        slow_threshold_ms: 慢语句阈值（毫秒），小于等于 0 表示不区分慢语句
+
+    Returns:
+        PoolMetrics: 该引擎的统计对象
+    """
+    metrics = PoolMetrics(engine)
+    _registry[name] = metrics
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # type: ignore[no-untyped-def]
+        conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # type: ignore[no-untyped-def]
+        started: List[float] = conn.info.get(_STARTED_KEY) or []
+        if not started:
+            return
+        elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+        slow = slow_threshold_ms > 0 and elapsed_ms >= slow_threshold_ms
+        if slow:
+            metrics.record_slow_statement()
+        elif not (sample_rate > 0 and random.random() < sample_rate):
+            return
+        sql_logger.log(
+            logging.WARNING if slow else logging.INFO,
+            json.dumps(
+                {
+                    "event": "sql_slow" if slow else "sql_sample",
+                    "engine": name,
+                    "duration_ms": round(elapsed_ms, 3),
+                    "rowcount": getattr(cursor, "rowcount", None),
+                    "executemany": executemany,
+                    "statement": " ".join(statement.split())[:2000],
+                },
+                ensure_ascii=False,
+            ),
+        )
+
+    def handle_error(exception_context):  # type: ignore[no-untyped-def]
+        conn = exception_context.connection
+        if conn is not None and conn.info.get(_STARTED_KEY):
+            conn.info[_STARTED_KEY].pop()
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+    return metrics
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    获取当前进程所有已注册引擎的统计
+
+    Returns:
+        Dict[str, Any]: 进程 ID 与各引擎的连接池统计
+    """
+    return {
+        "pid": os.getpid(),
+        "engines": {name: metrics.snapshot() for name, metrics in _registry.items()},
+    }
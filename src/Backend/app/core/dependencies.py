@@ -6,14 +6,20 @@
 1. 获取当前认证用户
 2. 获取当前活跃用户
 3. 获取当前超级用户
+4. 获取当前用户的数据库记录（需要读写完整资料的端点使用）
+
+认证依赖返回 Principal（id、用户名、角色、状态），由进程内身份缓存提供，
+大多数请求识别调用者时不再查询数据库。
 """
 
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from jose import JWTError, jwt
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import SessionLocal, get_db
+from app.core.principal_cache import Principal, principal_cache
 from app.crud.user import CRUDUser, user as _user_crud
 from app.models.user import User
 
@@ -22,29 +28,33 @@ user_crud: CRUDUser = _user_crud
 # OAuth2 密码流，用于从请求中提取访问令牌
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-async def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-):
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def resolve_principal(db: Session, token: str) -> Principal:
     """
-    获取当前认证用户
-    
+    解析访问令牌对应的用户身份
+
+    先查进程内身份缓存，未命中时校验 JWT 并查询用户表，结果按令牌缓存。
+
     Args:
-        db: 数据库会话依赖项
+        db: 数据库会话（仅缓存未命中时使用）
         token: JWT 访问令牌
-        
+
     Returns:
-        User: 当前认证用户对象
-        
+        Principal: 令牌对应的用户身份
+
     Raises:
         HTTPException: 如果令牌无效或用户不存在
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
     try:
         payload = jwt.decode(
             token,
@@ -52,21 +62,99 @@ async def get_current_user(
             algorithms=[settings.ALGORITHM],
         )
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
 
     username = payload.get("sub")
     if not isinstance(username, str):
-        raise credentials_exception
-    
+        raise _credentials_exception()
+
     user = user_crud.get_by_username(db, username=username)
     if user is None:
-        raise credentials_exception
-    
-    return user
+        raise _credentials_exception()
+
+    principal = Principal.from_user(user)
+    exp = payload.get("exp")
+    principal_cache.put(token, principal, float(exp) if isinstance(exp, (int, float)) else None)
+    return principal
+
+def authenticate_token(db: Session, token: str) -> Principal:
+    """
+    校验访问令牌并返回对应的活跃用户身份
+
+    供无法使用 OAuth2 请求头的端点（如 SSE、WebSocket）复用。
+
+    Args:
+        db: 数据库会话
+        token: JWT 访问令牌
+
+    Returns:
+        Principal: 令牌对应的用户身份
+
+    Raises:
+        HTTPException: 如果令牌无效、用户不存在或用户不活跃
+    """
+    principal = resolve_principal(db, token)
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
+
+def _authenticate_with_own_session(token: str) -> Principal:
+    db = SessionLocal()
+    try:
+        return authenticate_token(db, token)
+    finally:
+        db.close()
+
+async def authenticate_token_async(token: str) -> Principal:
+    """
+    校验访问令牌并返回对应的活跃用户身份（长连接端点使用）
+
+    身份缓存命中时不访问数据库；未命中时在线程池中用短生命周期会话查询，
+    查询结束立即归还连接，SSE、WebSocket 等长连接本身不占用数据库连接。
+
+    Args:
+        token: JWT 访问令牌
+
+    Returns:
+        Principal: 令牌对应的用户身份
+
+    Raises:
+        HTTPException: 如果令牌无效、用户不存在或用户不活跃
+    """
+    principal = principal_cache.get(token)
+    if principal is None:
+        return await run_in_threadpool(_authenticate_with_own_session, token)
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
+
+async def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+) -> Principal:
+    """
+    获取当前认证用户
+
+    身份缓存命中时不访问数据库；未命中时在线程池中查询用户表，不阻塞事件循环。
+
+    Args:
+        db: 数据库会话依赖项
+        token: JWT 访问令牌
+        
+    Returns:
+        Principal: 当前认证用户身份
+        
+    Raises:
+        HTTPException: 如果令牌无效或用户不存在
+    """
+    principal = principal_cache.get(token)
+    if principal is None:
+        principal = await run_in_threadpool(resolve_principal, db, token)
+    return principal
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-):
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """
     获取当前活跃用户
     
@@ -74,18 +162,43 @@ async def get_current_active_user(
         current_user: 当前认证用户依赖项
         
     Returns:
-        User: 当前活跃用户对象
+        Principal: 当前活跃用户身份
         
     Raises:
         HTTPException: 如果用户不活跃
     """
-    if not user_crud.is_active(current_user):
+    if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-async def get_current_active_superuser(
-    current_user: User = Depends(get_current_active_user)
+def get_current_active_db_user(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
 ) -> User:
+    """
+    获取当前活跃用户的数据库记录
+
+    供需要完整资料或修改当前用户的端点使用，记录绑定在本次请求的会话上。
+
+    Args:
+        db: 数据库会话依赖项
+        current_user: 当前活跃用户身份依赖项
+
+    Returns:
+        User: 当前用户对象
+
+    Raises:
+        HTTPException: 如果用户已被删除
+    """
+    user = db.get(User, current_user.id)
+    if user is None:
+        principal_cache.invalidate_user(current_user.id)
+        raise _credentials_exception()
+    return user
+
+async def get_current_active_superuser(
+    current_user: Principal = Depends(get_current_active_user)
+) -> Principal:
     """
     获取当前超级用户
 
@@ -93,12 +206,12 @@ async def get_current_active_superuser(
         current_user: 当前活跃用户依赖项
 
     Returns:
-        User: 当前超级用户对象
+        Principal: 当前超级用户身份
 
     Raises:
         HTTPException: 如果用户不是超级用户
     """
-    if not user_crud.is_superuser(current_user):
+    if not current_user.is_superuser:
         raise HTTPException(
             status_code=400, detail="The user doesn't have enough privileges"
         )
@@ -107,8 +220,8 @@ async def get_current_active_superuser(
 # 基于角色的权限控制依赖
 
 async def require_admin(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: Principal = Depends(get_current_active_user)
+) -> Principal:
     """
     要求管理员权限
 
@@ -116,12 +229,12 @@ async def require_admin(
         current_user: 当前活跃用户依赖项
 
     Returns:
-        User: 当前管理员用户对象
+        Principal: 当前管理员用户身份
 
     Raises:
         HTTPException: 如果用户不是 admin 角色
     """
-    if current_user.role != "admin":  # type: ignore[comparison-overlap]
+    if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="需要管理员权限"
@@ -129,8 +242,8 @@ async def require_admin(
     return current_user
 
 async def require_manager_or_above(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: Principal = Depends(get_current_active_user)
+) -> Principal:
     """
     要求管理员、仓库管理员或测试员权限
 
@@ -138,12 +251,12 @@ async def require_manager_or_above(
         current_user: 当前活跃用户依赖项
 
     Returns:
-        User: 当前用户对象
+        Principal: 当前用户身份
 
     Raises:
         HTTPException: 如果用户不是 admin、manager 或 tester 角色
     """
-    if current_user.role not in ["admin", "manager", "tester"]:  # type: ignore[comparison-overlap]
+    if current_user.role not in ["admin", "manager", "tester"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="需要管理员、仓库管理员或测试员权限"
@@ -151,8 +264,8 @@ async def require_manager_or_above(
     return current_user
 
 async def require_staff_or_above(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: Principal = Depends(get_current_active_user)
+) -> Principal:
     """
     要求员工及以上权限（任何认证用户）
 
@@ -160,12 +273,12 @@ async def require_staff_or_above(
         current_user: 当前活跃用户依赖项
 
     Returns:
-        User: 当前用户对象
+        Principal: 当前用户身份
 
     Raises:
         HTTPException: 如果用户不是 admin、manager、tester 或 staff 角色
     """
-    if current_user.role not in ["admin", "manager", "staff", "tester"]:  # type: ignore[comparison-overlap]
+    if current_user.role not in ["admin", "manager", "staff", "tester"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="需要有效的用户角色"
@@ -0,0 +1,96 @@
+"""
+条件请求（ETag）模块
+
+该模块提供基于变更计数器的 ETag 依赖项。
+主要功能：
+1. 根据请求路径、查询参数与相关数据标签的版本号生成弱 ETag
+2. 请求头 If-None-Match 命中时直接返回 304，不执行查询与序列化
+3. 未命中时在响应头中写入 ETag，供客户端下次重新验证
+
+ETag 只反映数据版本（变更计数器），与当前用户无关，
+因此只应用于对所有用户返回相同内容的端点。
+版本号通过异步只读会话读取（命中 304 时不占用线程池），端点也应读只读会话，
+使 ETag 与响应内容来自同一数据源。
+"""
+
+import hashlib
+from datetime import date
+from typing import Callable, Optional
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_read_db
+from app.crud.change_counter import change_counter
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    按弱比较规则判断 If-None-Match 是否命中
+
+    Args:
+        if_none_match: 请求头 If-None-Match 的值
+        etag: 当前 ETag
+
+    Returns:
+        bool: 是否命中
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return any(opaque(candidate) == opaque(etag) for candidate in if_none_match.split(","))
+
+
+def conditional_etag(*tags: str, daily: bool = False) -> Callable[..., str]:
+    """
+    创建条件请求依赖项
+
+    用法：在端点参数末尾（认证依赖之后）声明
+    ``_etag: str = Depends(conditional_etag(TAG_PRODUCTS))``。
+
+    Args:
+        tags: 响应内容依赖的数据标签
+        daily: 响应内容是否还随日期变化（如“最近 N 天”的统计）
+
+    Returns:
+        Callable: FastAPI 依赖项，返回当前 ETag；命中时抛出 304
+    """
+
+    async def dependency(
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_async_read_db),
+    ) -> str:
+        versions = await db.run_sync(change_counter.get_versions)
+        parts = [request.url.path, request.url.query]
+        parts.extend(f"{tag}={versions.get(tag, 0)}" for tag in sorted(tags))
+        if daily:
+            parts.append(date.today().isoformat())
+        etag = f'W/"{hashlib.sha1("|".join(parts).encode()).hexdigest()[:20]}"'
+
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return etag
+
+    return dependency
+
+
+def discard_etag(response: Response) -> None:
+    """
+    移除已写入的 ETag
+
+    响应内容与当前数据版本不一致（返回了旧值或部分分区降级）时调用，避免客户端缓存该内容。
+
+    Args:
+        response: 依赖项注入的响应对象
+    """
+    if "ETag" in response.headers:
+        del response.headers["ETag"]
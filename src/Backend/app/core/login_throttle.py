@@ -0,0 +1,138 @@
+"""
+登录限流模块
+
+该模块在计算密码哈希之前限制登录尝试的频率，防止撞库请求耗尽 CPU。
+主要功能：
+1. 按用户名统计窗口内的失败次数，登录成功后清零
+2. 按客户端 IP 统计窗口内的全部尝试次数
+3. 超过阈值时返回 429 及 Retry-After
+
+计数按进程保存，多 worker 部署时每个进程各自限流。
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+# 计数表的键数量超过该值时清理已过期的键
+_PRUNE_THRESHOLD = 10000
+
+
+class SlidingWindowCounter:
+    """按键统计滑动窗口内的事件次数"""
+
+    def __init__(self, window_seconds: float):
+        """
+        初始化计数器
+
+        Args:
+            window_seconds: 窗口长度（秒）
+        """
+        self.window_seconds = window_seconds
+        self._events: Dict[str, Deque[float]] = {}
+
+    def _expire(self, key: str, now: float) -> Deque[float]:
+        events = self._events.get(key)
+        if events is None:
+            return deque()
+        while events and events[0] <= now - self.window_seconds:
+            events.popleft()
+        if not events:
+            del self._events[key]
+        return events
+
+    def retry_after(self, key: str, limit: int, now: float) -> Optional[float]:
+        """
+        判断键是否已达上限
+
+        Args:
+            key: 计数键
+            limit: 窗口内允许的次数
+            now: 当前时间戳
+
+        Returns:
+            Optional[float]: 已达上限时返回需要等待的秒数，否则返回 None
+        """
+        events = self._expire(key, now)
+        if len(events) < limit:
+            return None
+        return events[-limit] + self.window_seconds - now
+
+    def add(self, key: str, now: float) -> None:
+        if len(self._events) > _PRUNE_THRESHOLD:
+            for stale in list(self._events):
+                self._expire(stale, now)
+        self._events.setdefault(key, deque()).append(now)
+
+    def reset(self, key: str) -> None:
+        self._events.pop(key, None)
+
+
+class LoginThrottle:
+    """登录尝试限流（线程安全）"""
+
+    def __init__(self, window_seconds: float, max_failures_per_username: int, max_attempts_per_ip: int):
+        """
+        初始化限流器
+
+        Args:
+            window_seconds: 统计窗口（秒）
+            max_failures_per_username: 窗口内同一用户名允许的失败次数
+            max_attempts_per_ip: 窗口内同一 IP 允许的尝试次数
+        """
+        self.max_failures_per_username = max_failures_per_username
+        self.max_attempts_per_ip = max_attempts_per_ip
+        self._lock = threading.Lock()
+        self._failures = SlidingWindowCounter(window_seconds)
+        self._attempts = SlidingWindowCounter(window_seconds)
+
+    def check(self, username: str, client_ip: Optional[str], now: Optional[float] = None) -> None:
+        """
+        登录前检查并记录一次尝试
+
+        Args:
+            username: 登录用户名
+            client_ip: 客户端 IP（未知时只按用户名限流）
+            now: 当前时间戳（测试用）
+
+        Raises:
+            HTTPException: 用户名失败次数或 IP 尝试次数超过上限（429）
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            waits = [self._failures.retry_after(username.lower(), self.max_failures_per_username, now)]
+            if client_ip:
+                waits.append(self._attempts.retry_after(client_ip, self.max_attempts_per_ip, now))
+            wait = max((w for w in waits if w is not None), default=None)
+            if wait is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="登录尝试过于频繁，请稍后再试",
+                    headers={"Retry-After": str(max(int(wait + 0.999), 1))},
+                )
+            if client_ip:
+                self._attempts.add(client_ip, now)
+
+    def record_failure(self, username: str, now: Optional[float] = None) -> None:
+        """记录一次失败的登录"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._failures.add(username.lower(), now)
+
+    def record_success(self, username: str) -> None:
+        """登录成功后清零该用户名的失败次数"""
+        with self._lock:
+            self._failures.reset(username.lower())
+
+
+# 全局登录限流实例
+login_throttle = LoginThrottle(
+    settings.LOGIN_THROTTLE_WINDOW_SECONDS,
+    settings.LOGIN_MAX_FAILURES_PER_USERNAME,
+    settings.LOGIN_MAX_ATTEMPTS_PER_IP,
+)
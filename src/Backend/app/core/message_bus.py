@@ -0,0 +1,238 @@
+"""
+WebSocket 消息总线模块
+
+WebSocket 连接保存在各 worker 进程内存中。该模块提供跨 worker 的发布/订阅通道：
+任一进程发布的推送经总线送达每个 worker，各 worker 只推送给本进程持有的连接。
+主要功能：
+1. MessageBus：总线接口（publish / start / stop），Redis 等外部消息代理可按此接口实现；
+   消息可指定目标用户（通知）、订阅主题（增量事件）或两者皆无（广播）
+2. LocalBus：单进程总线，直接投递到本进程（单 worker 部署使用）
+3. DatabaseBus：基于发件箱表（websocket_outbox）的总线，各 worker 按 ID 顺序轮询新消息
+
+DatabaseBus 按消息 ID 去重：每个 worker 只投递一次同一条消息。并发事务可能使较小的 ID
+晚于较大的 ID 提交，轮询时遇到的 ID 空洞会在 gap_grace_seconds 内持续补查，超时才视为已回滚。
+"""
+
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud.websocket_outbox import websocket_outbox
+
+logger = logging.getLogger(__name__)
+
+# 投递回调：(目标用户ID，None 表示广播；消息文本；订阅主题，None 表示不按主题投递)
+Deliver = Callable[[Optional[int], str, Optional[str]], Awaitable[None]]
+
+
+class MessageBus(ABC):
+    """
+    消息总线接口
+
+    publish 可在任意线程中调用（同步路由、定时任务线程、事件循环）；
+    start 在事件循环中调用，此后总线收到的每条消息都通过 deliver 在该事件循环中投递一次。
+    """
+
+    @abstractmethod
+    def publish(self, user_id: Optional[int], message: str, topic: Optional[str] = None) -> None:
+        """
+        发布一条消息
+
+        Args:
+            user_id: 目标用户ID，None 表示广播
+            message: 已编码的消息文本
+            topic: 订阅主题，给定时只投递给订阅了该主题的连接（忽略 user_id）
+        """
+
+    @abstractmethod
+    async def start(self, deliver: Deliver) -> None:
+        """
+        开始接收消息
+
+        Args:
+            deliver: 投递回调，在事件循环中按发布顺序调用
+        """
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """停止接收消息"""
+
+
+class LocalBus(MessageBus):
+    """单进程消息总线：消息直接投递到本进程的事件循环"""
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._deliver: Optional[Deliver] = None
+
+    def publish(self, user_id: Optional[int], message: str, topic: Optional[str] = None) -> None:
+        loop, deliver = self._loop, self._deliver
+        if loop is None or deliver is None or loop.is_closed():
+            # 尚未启动说明本进程还没有任何连接
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            loop.create_task(deliver(user_id, message, topic))
+        else:
+            asyncio.run_coroutine_threadsafe(deliver(user_id, message, topic), loop)
+
+    async def start(self, deliver: Deliver) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        self._loop = None
+        self._deliver = None
+
+
+class DatabaseBus(MessageBus):
+    """基于发件箱表的消息总线（多 worker 共享同一数据库）"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        poll_seconds: float = 0.5,
+        gap_grace_seconds: float = 5.0,
+        batch_size: int = 500,
+    ):
+        """
+        初始化总线
+
+        Args:
+            session_factory: 会话工厂（必须连接主库，避免副本延迟）
+            poll_seconds: 轮询间隔（秒）
+            gap_grace_seconds: ID 空洞的等待时长（秒），超时后不再补查
+            batch_size: 每次轮询最多读取的消息数
+        """
+        self.session_factory = session_factory
+        self.poll_seconds = poll_seconds
+        self.gap_grace_seconds = gap_grace_seconds
+        self.batch_size = batch_size
+        # floor 及之前的消息均已处理；floor 之后已投递的 ID 记录在 _delivered 中
+        self.floor = 0
+        self._delivered: Set[int] = set()
+        self._gaps: Dict[int, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def publish(self, user_id: Optional[int], message: str, topic: Optional[str] = None) -> None:
+        db = self.session_factory()
+        try:
+            websocket_outbox.append(db, user_id=user_id, message=message, topic=topic)
+        finally:
+            db.close()
+
+    async def start(self, deliver: Deliver) -> None:
+        if self._task is not None:
+            return
+        # 只消费启动之后发布的消息：此前本进程没有连接，不需要补发
+        self.floor = await run_in_threadpool(self._read_max_id)
+        self._task = asyncio.create_task(self._run(deliver))
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def _read_max_id(self) -> int:
+        db = self.session_factory()
+        try:
+            return websocket_outbox.get_max_id(db)
+        finally:
+            db.close()
+
+    def _fetch(self) -> List[Tuple[int, Optional[int], str, Optional[str]]]:
+        db = self.session_factory()
+        try:
+            rows = websocket_outbox.get_after(db, after_id=self.floor, limit=self.batch_size)
+            return [
+                (int(row.id), row.user_id, str(row.message), row.topic)  # type: ignore[arg-type]
+                for row in rows
+            ]
+        finally:
+            db.close()
+
+    def accept(
+        self,
+        rows: Iterable[Tuple[int, Optional[int], str, Optional[str]]],
+        now: Optional[float] = None,
+    ) -> List[Tuple[Optional[int], str, Optional[str]]]:
+        """
+        过滤已投递的消息并推进 floor
+
+        Args:
+            rows: 按 ID 升序的 (ID, 目标用户ID, 消息文本, 订阅主题)
+            now: 当前时间戳（测试用）
+
+        Returns:
+            List[Tuple[Optional[int], str, Optional[str]]]: 需要投递的 (目标用户ID, 消息文本, 订阅主题)
+        """
+        now = time.monotonic() if now is None else now
+        fresh: List[Tuple[Optional[int], str, Optional[str]]] = []
+        for message_id, user_id, message, topic in rows:
+            if message_id > self.floor and message_id not in self._delivered:
+                self._delivered.add(message_id)
+                self._gaps.pop(message_id, None)
+                fresh.append((user_id, message, topic))
+
+        highest = max(self._delivered, default=self.floor)
+        while self.floor < highest:
+            candidate = self.floor + 1
+            if candidate in self._delivered:
+                self._delivered.discard(candidate)
+            elif now - self._gaps.setdefault(candidate, now) < self.gap_grace_seconds:
+                break
+            else:
+                # 空洞等待超时：对应事务已回滚（或 ID 被跳过）
+                del self._gaps[candidate]
+            self.floor = candidate
+        return fresh
+
+    async def _run(self, deliver: Deliver) -> None:
+        while True:
+            try:
+                rows = await run_in_threadpool(self._fetch)
+                for user_id, message, topic in self.accept(rows):
+                    try:
+                        await deliver(user_id, message, topic)
+                    except Exception:
+                        logger.exception("投递 WebSocket 消息失败")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("轮询 WebSocket 发件箱失败")
+            await asyncio.sleep(self.poll_seconds)
+
+
+def create_message_bus(backend: Optional[str] = None) -> MessageBus:
+    """
+    按配置创建消息总线
+
+    Args:
+        backend: 总线类型（local 或 database），默认取 WS_BUS_BACKEND
+
+    Returns:
+        MessageBus: 消息总线实例
+
+    Raises:
+        ValueError: 未知的总线类型
+    """
+    backend = backend or settings.WS_BUS_BACKEND
+    if backend == "local":
+        return LocalBus()
+    if backend == "database":
+        return DatabaseBus(poll_seconds=settings.WS_BUS_POLL_SECONDS)
+    raise ValueError(f"未知的 WebSocket 消息总线类型: {backend}")
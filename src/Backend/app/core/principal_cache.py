@@ -0,0 +1,154 @@
+"""
+认证身份缓存模块
+
+该模块缓存“访问令牌 -> 当前用户身份”的解析结果，避免每个认证请求都查询一次用户表。
+主要功能：
+1. Principal：认证依赖返回的轻量用户身份（id、用户名、角色、状态）
+2. PrincipalCache：按令牌缓存身份，有效期取配置时长与令牌过期时间中较早者
+3. 按用户失效：用户资料、角色或密码变更后立即清除该用户的所有缓存令牌
+
+缓存按进程保存，多 worker 部署时其它进程最迟在 AUTH_PRINCIPAL_CACHE_SECONDS 后读到变更。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """当前认证用户身份（不绑定数据库会话，可跨请求复用）"""
+
+    id: int
+    username: str
+    role: str
+    is_active: bool
+    is_superuser: bool
+
+    @classmethod
+    def from_user(cls, user: Any) -> "Principal":
+        """
+        从用户模型构造身份
+
+        Args:
+            user: 用户模型对象
+
+        Returns:
+            Principal: 用户身份
+        """
+        return cls(
+            id=int(user.id),
+            username=str(user.username),
+            role=str(user.role),
+            is_active=bool(user.is_active),
+            is_superuser=bool(user.is_superuser),
+        )
+
+
+class PrincipalCache:
+    """按访问令牌缓存用户身份（LRU 淘汰，线程安全）"""
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        """
+        初始化缓存
+
+        Args:
+            ttl_seconds: 缓存时长（秒），小于等于 0 表示不缓存
+            max_entries: 最多保存的令牌数
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # 令牌 -> (身份, 过期时间戳)
+        self._entries: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+        # 用户 ID -> 该用户已缓存的令牌
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+
+    def get(self, token: str, now: Optional[float] = None) -> Optional[Principal]:
+        """
+        获取令牌对应的身份
+
+        Args:
+            token: 访问令牌
+            now: 当前时间戳（测试用）
+
+        Returns:
+            Optional[Principal]: 未缓存或已过期时返回 None
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= now:
+                self._remove(token)
+                return None
+            self._entries.move_to_end(token)
+            return principal
+
+    def put(
+        self,
+        token: str,
+        principal: Principal,
+        token_expires_at: Optional[float] = None,
+        now: Optional[float] = None,
+    ) -> None:
+        """
+        缓存令牌对应的身份
+
+        Args:
+            token: 访问令牌
+            principal: 用户身份
+            token_expires_at: 令牌自身的过期时间戳（JWT exp），缓存不会超过该时间
+            now: 当前时间戳（测试用）
+        """
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        now = time.time() if now is None else now
+        expires_at = now + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        if expires_at <= now:
+            return
+        with self._lock:
+            self._remove(token)
+            self._entries[token] = (principal, expires_at)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        清除某个用户的所有缓存令牌
+
+        Args:
+            user_id: 用户 ID
+        """
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry[0].id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry[0].id]
+
+
+# 创建全局身份缓存实例
+principal_cache = PrincipalCache(settings.AUTH_PRINCIPAL_CACHE_SECONDS, settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES)
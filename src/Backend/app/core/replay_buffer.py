@@ -0,0 +1,90 @@
+"""
+WebSocket 重连补发缓冲模块
+
+每条推送给用户的通知带有单调递增的序号 seq（即通知 ID），客户端断线重连时携带
+最后收到的 seq，服务端只补发缺失的部分。该模块按用户保存最近的推送，用于在内存中完成补发。
+主要功能：
+1. 每个用户一个有界环形缓冲，按 seq 升序保存最近 size_per_user 条消息
+2. 用户数超过上限时淘汰最久未收到推送的用户（LRU）
+3. since 判断缺口是否完全落在缓冲内：缓冲最旧一条的 seq 不大于客户端的 seq 时，
+   此后的消息必然都在缓冲中；否则返回 None，由调用方回退到数据库查询
+
+缓冲只在事件循环中访问，不需要加锁。
+"""
+
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional, Tuple
+
+
+class ReplayBuffer:
+    """按用户保存最近推送的环形缓冲"""
+
+    def __init__(self, size_per_user: int, max_users: int):
+        """
+        初始化缓冲
+
+        Args:
+            size_per_user: 每个用户保存的消息数，0 表示关闭（总是回退到数据库）
+            max_users: 最多保存的用户数
+        """
+        self.size_per_user = size_per_user
+        self.max_users = max_users
+        self._buffers: "OrderedDict[int, Deque[Tuple[int, str]]]" = OrderedDict()
+
+    def append(self, user_id: int, seq: int, message: str) -> None:
+        """
+        记录一条推送
+
+        Args:
+            user_id: 用户ID
+            seq: 消息序号
+            message: 已编码的消息文本
+        """
+        if self.size_per_user <= 0:
+            return
+        buffer = self._buffers.get(user_id)
+        if buffer is None:
+            buffer = self._buffers[user_id] = deque(maxlen=self.size_per_user)
+            while len(self._buffers) > self.max_users:
+                self._buffers.popitem(last=False)
+        else:
+            self._buffers.move_to_end(user_id)
+
+        if not buffer or seq > buffer[-1][0]:
+            buffer.append((seq, message))
+            return
+        # 并发事务可能使较小的 seq 晚到：按序插入，重复或早于缓冲窗口的忽略
+        if seq < buffer[0][0] and len(buffer) == buffer.maxlen:
+            return
+        index = len(buffer)
+        while index > 0 and buffer[index - 1][0] > seq:
+            index -= 1
+        if index > 0 and buffer[index - 1][0] == seq:
+            return
+        if len(buffer) == buffer.maxlen:
+            buffer.popleft()
+            index -= 1
+        buffer.insert(index, (seq, message))
+
+    def since(self, user_id: int, seq: int) -> Optional[List[str]]:
+        """
+        获取某个序号之后的消息
+
+        Args:
+            user_id: 用户ID
+            seq: 客户端最后收到的序号
+
+        Returns:
+            Optional[List[str]]: 按 seq 升序的消息；缺口早于缓冲窗口（或没有该用户的缓冲）时返回 None
+        """
+        buffer = self._buffers.get(user_id)
+        if not buffer or seq < buffer[0][0]:
+            return None
+        return [message for message_seq, message in buffer if message_seq > seq]
+
+    def clear(self) -> None:
+        """清空缓冲"""
+        self._buffers.clear()
+
+    def __len__(self) -> int:
+        return len(self._buffers)
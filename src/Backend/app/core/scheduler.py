@@ -5,20 +5,252 @@
 主要功能：
 1. 清理过期通知（每天执行）
 2. 低库存检查（每小时执行）
+3. 每日库存快照（每天执行）
+4. 清理 WebSocket 发件箱中已被各 worker 消费的消息（每 5 分钟执行）
+
+每个 uvicorn worker 都会启动调度器，但定时任务只在持有数据库租约的主节点上执行
+（见 SchedulerLeader），避免多 worker 部署时重复发送警报与通知。
+
+业务任务在独立的线程池（jobs 执行器）中运行，不占用事件循环；同一任务上一次尚未结束时
+跳过本次执行（max_instances=1），错过的多次触发合并为一次（coalesce）。
+每个任务的执行次数、耗时、处理行数与最近成功时间由 JobMonitor 记录。
 """
 
+import functools
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, JobExecutionEvent
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import SessionLocal
 from app.crud.notification import notification as notification_crud
+from app.crud.inventory_history import inventory_history
+from app.crud.scheduler_lease import scheduler_lease
+from app.crud.websocket_outbox import websocket_outbox
 import logging
 
 logger = logging.getLogger(__name__)
 
-# 创建调度器实例
-scheduler = AsyncIOScheduler()
+# 创建调度器实例：租约续约与业务任务使用不同的线程池，长任务不会拖延续约
+scheduler = AsyncIOScheduler(
+    executors={
+        "default": ThreadPoolExecutor(max_workers=1),
+        "jobs": ThreadPoolExecutor(max_workers=settings.SCHEDULER_JOB_WORKERS),
+    },
+    job_defaults={
+        "coalesce": True,
+        "max_instances": 1,
+        "misfire_grace_time": 300,
+    },
+)
+
+
+@dataclass
+class JobStats:
+    """单个定时任务的执行统计"""
+
+    runs: int = 0
+    failures: int = 0
+    skipped_overlap: int = 0
+    running: bool = False
+    total_rows: int = 0
+    last_started_at: Optional[datetime] = None
+    last_duration_ms: Optional[float] = None
+    last_rows: Optional[int] = None
+    last_success_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    last_error_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class JobMonitor:
+    """定时任务执行统计（按进程保存）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, JobStats] = {}
+
+    def _get(self, job_id: str) -> JobStats:
+        return self._stats.setdefault(job_id, JobStats())
+
+    def track(self, job_id: str, func: Callable[[], Optional[int]]) -> Callable[[], Optional[int]]:
+        """
+        包装任务函数，记录执行次数、耗时、处理行数与成功/失败时间
+
+        Args:
+            job_id: 任务ID
+            func: 任务函数，返回处理的行数（可为 None）
+
+        Returns:
+            Callable: 包装后的任务函数（异常会继续抛出，交由调度器记录）
+        """
+
+        @functools.wraps(func)
+        def wrapper() -> Optional[int]:
+            started = time.perf_counter()
+            with self._lock:
+                stats = self._get(job_id)
+                stats.runs += 1
+                stats.running = True
+                stats.last_started_at = datetime.now()
+            try:
+                rows = func()
+            except Exception as e:
+                with self._lock:
+                    stats.failures += 1
+                    stats.last_error = str(e)
+                    stats.last_error_at = datetime.now()
+                raise
+            else:
+                with self._lock:
+                    stats.last_rows = rows
+                    stats.total_rows += rows or 0
+                    stats.last_success_at = datetime.now()
+                return rows
+            finally:
+                with self._lock:
+                    stats.running = False
+                    stats.last_duration_ms = round((time.perf_counter() - started) * 1000, 3)
+
+        return wrapper
+
+    def record_skip(self, job_id: str) -> None:
+        """记录因上一次执行尚未结束而跳过的触发"""
+        with self._lock:
+            self._get(job_id).skipped_overlap += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取全部任务的执行统计
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 任务ID到统计的映射
+        """
+        with self._lock:
+            return {job_id: stats.to_dict() for job_id, stats in self._stats.items()}
+
+
+job_monitor = JobMonitor()
+
+
+def _on_job_max_instances(event: JobExecutionEvent) -> None:
+    logger.warning(f"任务 {event.job_id} 上一次执行尚未结束，跳过本次执行")
+    job_monitor.record_skip(event.job_id)
+
+
+scheduler.add_listener(_on_job_max_instances, EVENT_JOB_MAX_INSTANCES)
+
+
+class SchedulerLeader:
+    """
+    基于数据库租约的调度器选主
+
+    所有 worker 定期尝试抢占或续约同一条租约，只有持有未过期租约的进程执行定时任务。
+    主节点退出时主动释放租约；异常退出时租约最多在 lease_seconds 后过期，
+    其它 worker 在下一次续约检查（lease_seconds / 3）时接管。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        lease_seconds: float,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        """
+        初始化选主器
+
+        Args:
+            name: 租约名称
+            lease_seconds: 租约时长（秒）
+            session_factory: 访问租约表使用的会话工厂
+        """
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.session_factory = session_factory
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+
+    @property
+    def renew_interval(self) -> float:
+        """续约检查间隔（秒）"""
+        return max(self.lease_seconds / 3, 1)
+
+    def renew(self) -> bool:
+        """
+        抢占或续约租约，数据库不可用时视为非主节点
+
+        Returns:
+            bool: 当前进程是否为主节点
+        """
+        db = self.session_factory()
+        try:
+            acquired = scheduler_lease.try_acquire(db, self.name, self.holder, self.lease_seconds)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"续约调度器租约时发生错误: {str(e)}")
+            acquired = False
+        finally:
+            db.close()
+
+        if acquired and not self.is_leader:
+            logger.info(f"当前进程成为调度主节点（{self.holder}）")
+        elif not acquired and self.is_leader:
+            logger.warning(f"当前进程失去调度主节点身份（{self.holder}）")
+        self.is_leader = acquired
+        return acquired
+
+    def release(self) -> None:
+        """主动释放租约，便于其它 worker 立即接管"""
+        if not self.is_leader:
+            return
+        db = self.session_factory()
+        try:
+            scheduler_lease.release(db, self.name, self.holder)
+        except Exception as e:
+            logger.error(f"释放调度器租约时发生错误: {str(e)}")
+        finally:
+            db.close()
+            self.is_leader = False
+
+
+scheduler_leader = SchedulerLeader("scheduler", settings.SCHEDULER_LEASE_SECONDS)
+
+
+def leader_only(func: Callable[..., Any], leader: Optional[SchedulerLeader] = None) -> Callable[..., Any]:
+    """
+    包装定时任务：执行前续约租约，只有主节点才真正执行
+
+    执行前续约（而不是只看本地标记）保证租约刚被其它进程接管时不会重复执行。
+
+    Args:
+        func: 定时任务函数
+        leader: 选主器，默认使用 scheduler_leader
+
+    Returns:
+        Callable: 包装后的任务函数
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not (leader or scheduler_leader).renew():
+            logger.debug(f"当前进程不是调度主节点，跳过任务 {func.__name__}")
+            return None
+        return func(*args, **kwargs)
+
+    return wrapper
 
 
 def cleanup_expired_notifications():
@@ -33,8 +265,10 @@ def cleanup_expired_notifications():
     try:
         deleted_count = notification_crud.delete_expired(db)
         logger.info(f"清理完成，删除了 {deleted_count} 条过期通知")
+        return deleted_count
     except Exception as e:
         logger.error(f"清理过期通知时发生错误: {str(e)}")
+        raise
     finally:
         db.close()
 
@@ -54,8 +288,51 @@ def check_low_stock():
         # 调用低库存检查函数
         result = check_low_stock_and_alert(db=db)
         logger.info(f"低库存检查完成，创建了 {result.get('alerts_created', 0)} 个警报")
+        return result.get("alerts_created", 0)
     except Exception as e:
         logger.error(f"检查低库存时发生错误: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+def snapshot_inventory_levels():
+    """
+    写入每日库存快照（日 × 仓库 × 产品）
+
+    这个任务每天凌晨0点5分执行
+    """
+    logger.info("开始写入每日库存快照...")
+
+    db: Session = SessionLocal()
+    try:
+        rows = inventory_history.take_snapshot(db)
+        db.commit()
+        logger.info(f"每日库存快照完成，写入了 {rows} 行")
+        return rows
+    except Exception as e:
+        db.rollback()
+        logger.error(f"写入每日库存快照时发生错误: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+def purge_websocket_outbox():
+    """
+    清理超过保留时长的 WebSocket 发件箱消息
+
+    这个任务每 5 分钟执行一次
+    """
+    db: Session = SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.WS_BUS_RETENTION_SECONDS)
+        deleted_count = websocket_outbox.purge_before(db, cutoff)
+        logger.info(f"清理完成，删除了 {deleted_count} 条 WebSocket 发件箱消息")
+        return deleted_count
+    except Exception as e:
+        logger.error(f"清理 WebSocket 发件箱时发生错误: {str(e)}")
+        raise
     finally:
         db.close()
 
@@ -63,10 +340,24 @@ def check_low_stock():
 def start_scheduler():
     """
     启动调度器并添加任务
+
+    业务任务均经过 leader_only 包装，只在调度主节点上执行；
+    并经过 job_monitor.track 包装以记录执行统计，在 jobs 执行器中运行。
     """
+    # 定期抢占/续约调度器租约（启动时立即执行一次）
+    scheduler.add_job(
+        scheduler_leader.renew,
+        trigger=IntervalTrigger(seconds=scheduler_leader.renew_interval),
+        id="scheduler_lease",
+        name="续约调度器租约",
+        next_run_time=datetime.now(),
+        replace_existing=True
+    )
+
     # 添加每天凌晨2点执行的清理任务
     scheduler.add_job(
-        cleanup_expired_notifications,
+        leader_only(job_monitor.track("cleanup_notifications", cleanup_expired_notifications)),
+        executor="jobs",
         trigger=CronTrigger(hour=2, minute=0),
         id="cleanup_notifications",
         name="清理过期通知",
@@ -75,13 +366,34 @@ def start_scheduler():
 
     # 添加每小时执行的低库存检查任务
     scheduler.add_job(
-        check_low_stock,
+        leader_only(job_monitor.track("check_low_stock", check_low_stock)),
+        executor="jobs",
         trigger=IntervalTrigger(hours=1),
         id="check_low_stock",
         name="检查低库存",
         replace_existing=True
     )
 
+    # 添加每天凌晨0点5分执行的库存快照任务
+    scheduler.add_job(
+        leader_only(job_monitor.track("snapshot_inventory_levels", snapshot_inventory_levels)),
+        executor="jobs",
+        trigger=CronTrigger(hour=0, minute=5),
+        id="snapshot_inventory_levels",
+        name="每日库存快照",
+        replace_existing=True
+    )
+
+    # 添加每5分钟执行的 WebSocket 发件箱清理任务
+    scheduler.add_job(
+        leader_only(job_monitor.track("purge_websocket_outbox", purge_websocket_outbox)),
+        executor="jobs",
+        trigger=IntervalTrigger(minutes=5),
+        id="purge_websocket_outbox",
+        name="清理 WebSocket 发件箱",
+        replace_existing=True
+    )
+
     # 启动调度器
     scheduler.start()
     logger.info("后台任务调度器已启动")
@@ -94,3 +406,30 @@ def shutdown_scheduler():
     if scheduler.running:
         scheduler.shutdown()
         logger.info("后台任务调度器已关闭")
+    scheduler_leader.release()
+
+
+def get_job_status() -> Dict[str, Any]:
+    """
+    获取当前进程的调度状态与任务执行统计
+
+    只有调度主节点会执行任务，其它 worker 的统计为空。
+
+    Returns:
+        Dict[str, Any]: 进程 ID、是否为主节点、各任务的下次执行时间与执行统计
+    """
+    stats = job_monitor.get_stats()
+    jobs: Dict[str, Any] = {}
+    for job in scheduler.get_jobs():
+        jobs[job.id] = {
+            "name": job.name,
+            "next_run_time": job.next_run_time,
+            **stats.pop(job.id, JobStats().to_dict()),
+        }
+    jobs.update(stats)
+    return {
+        "pid": os.getpid(),
+        "holder": scheduler_leader.holder,
+        "is_leader": scheduler_leader.is_leader,
+        "jobs": jobs,
+    }
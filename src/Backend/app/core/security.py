@@ -6,10 +6,16 @@
 1. 密码哈希和验证
 2. JWT 访问令牌的创建和管理
 3. 使用 Passlib 进行安全的密码处理
+4. 密码哈希在专用的有界线程池中执行，排队过长时直接拒绝（503），
+   避免登录洪峰占满 anyio 共享线程池、拖慢其它同步端点
 """
 
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Callable, Optional
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
@@ -25,6 +31,83 @@ if not hasattr(bcrypt, "__about__"):  # pragma: no cover - safeguard for newer b
 # 密码加密上下文，使用 bcrypt 算法
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+class PasswordHasher:
+    """
+    有界的密码哈希执行器
+
+    bcrypt 计算在独立线程池中进行，同时执行的数量不超过 workers；
+    执行中与排队中的任务总数达到 workers + max_queue 时立即拒绝新任务。
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        """
+        初始化执行器
+
+        Args:
+            workers: 线程数（同时进行的哈希计算数）
+            max_queue: 允许排队等待的任务数
+        """
+        self.workers = max(workers, 1)
+        self.max_queue = max(max_queue, 0)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _submit(self, func: Callable[..., Any], *args: Any) -> "Future[Any]":
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="服务繁忙，请稍后重试",
+                    headers={"Retry-After": "1"},
+                )
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="password-hash")
+            self._pending += 1
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """在执行器中验证密码并等待结果（供同步代码使用）"""
+        return self._submit(pwd_context.verify, plain_password, hashed_password).result()
+
+    def hash(self, password: str) -> str:
+        """在执行器中计算密码哈希并等待结果（供同步代码使用）"""
+        return self._submit(pwd_context.hash, password).result()
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        """在执行器中验证密码，等待期间不占用事件循环与 anyio 线程"""
+        return await asyncio.wrap_future(self._submit(pwd_context.verify, plain_password, hashed_password))
+
+    async def hash_async(self, password: str) -> str:
+        """在执行器中计算密码哈希，等待期间不占用事件循环与 anyio 线程"""
+        return await asyncio.wrap_future(self._submit(pwd_context.hash, password))
+
+    @property
+    def pending(self) -> int:
+        """执行中与排队中的任务数"""
+        return self._pending
+
+    def shutdown(self) -> None:
+        """关闭线程池（应用关闭时调用）"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# 全局密码哈希执行器
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     验证明文密码与哈希密码是否匹配
@@ -35,8 +118,27 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         
     Returns:
         bool: 如果密码匹配返回 True，否则返回 False
+
+    Raises:
+        HTTPException: 哈希执行器排队已满（503）
+    """
+    return password_hasher.verify(plain_password, hashed_password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    验证明文密码与哈希密码是否匹配（async 端点使用）
+
+    Args:
+        plain_password: 明文密码
+        hashed_password: 哈希密码
+
+    Returns:
+        bool: 如果密码匹配返回 True，否则返回 False
+
+    Raises:
+        HTTPException: 哈希执行器排队已满（503）
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return await password_hasher.verify_async(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """
@@ -47,8 +149,11 @@ def get_password_hash(password: str) -> str:
         
     Returns:
         str: 密码的哈希值
+
+    Raises:
+        HTTPException: 哈希执行器排队已满（503）
     """
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -0,0 +1,146 @@
+"""
+时间分桶模块
+
+该模块提供可跨数据库方言编译的时间分桶表达式。
+主要功能：
+1. date_bucket(expr, granularity) 在 SQL 中把日期/时间归入日、ISO 周或月
+2. bucket_key 在 Python 中计算同样格式的桶键，用于生成图表标签
+3. recent_buckets 生成截至某天的最近 N 个桶及其起止日期
+
+桶键格式在所有方言下一致：日为 YYYY-MM-DD，ISO 周为 YYYY-Www，月为 YYYY-MM。
+支持 MySQL（DATE_FORMAT）、SQLite（strftime）与 PostgreSQL（to_char）。
+"""
+
+from datetime import date, timedelta
+from typing import Any, List, NamedTuple
+from sqlalchemy import String
+from sqlalchemy.exc import CompileError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+DAY = "day"
+WEEK = "week"
+MONTH = "month"
+GRANULARITIES = (DAY, WEEK, MONTH)
+
+
+class date_bucket(FunctionElement):
+    """
+    时间分桶 SQL 表达式
+
+    用法：``date_bucket(SalesOrder.order_date, "week")``，结果为字符串桶键，
+    可直接用于 GROUP BY。
+    """
+
+    type = String()
+    name = "date_bucket"
+    inherit_cache = True
+    # 粒度参与语句缓存键，否则不同粒度会复用同一条已编译的 SQL
+    _traverse_internals = FunctionElement._traverse_internals + [
+        ("granularity", InternalTraversal.dp_string),
+    ]
+
+    def __init__(self, expr: Any, granularity: str):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"不支持的时间粒度: {granularity}")
+        self.granularity = granularity
+        super().__init__(expr)
+
+
+_MYSQL_FORMATS = {DAY: "%Y-%m-%d", WEEK: "%x-W%v", MONTH: "%Y-%m"}
+_POSTGRES_FORMATS = {DAY: "YYYY-MM-DD", WEEK: 'IYYY-"W"IW', MONTH: "YYYY-MM"}
+_SQLITE_FORMATS = {DAY: "%Y-%m-%d", MONTH: "%Y-%m"}
+
+
+def _format_literal(compiler: Any, fmt: str) -> str:
+    return compiler.render_literal_value(fmt, String())
+
+
+@compiles(date_bucket)
+def _compile_default(element: date_bucket, compiler: Any, **kw: Any) -> str:
+    raise CompileError(f"date_bucket 不支持数据库方言 {compiler.dialect.name}")
+
+
+@compiles(date_bucket, "mysql")
+def _compile_mysql(element: date_bucket, compiler: Any, **kw: Any) -> str:
+    expr = compiler.process(list(element.clauses)[0], **kw)
+    return f"DATE_FORMAT({expr}, {_format_literal(compiler, _MYSQL_FORMATS[element.granularity])})"
+
+
+@compiles(date_bucket, "postgresql")
+def _compile_postgresql(element: date_bucket, compiler: Any, **kw: Any) -> str:
+    expr = compiler.process(list(element.clauses)[0], **kw)
+    return f"to_char({expr}, {_format_literal(compiler, _POSTGRES_FORMATS[element.granularity])})"
+
+
+@compiles(date_bucket, "sqlite")
+def _compile_sqlite(element: date_bucket, compiler: Any, **kw: Any) -> str:
+    expr = compiler.process(list(element.clauses)[0], **kw)
+    if element.granularity != WEEK:
+        return f"strftime({_format_literal(compiler, _SQLITE_FORMATS[element.granularity])}, {expr})"
+    # 旧版 SQLite 不支持 %G/%V：ISO 周所属的年份与周序号由该周的星期四决定
+    thursday = f"date({expr}, '-3 days', 'weekday 4')"
+    return (
+        f"printf('%s-W%02d', strftime('%Y', {thursday}), "
+        f"(strftime('%j', {thursday}) - 1) / 7 + 1)"
+    )
+
+
+class Bucket(NamedTuple):
+    """一个时间桶"""
+
+    key: str
+    first_day: date
+    last_day: date
+
+
+def bucket_key(day: date, granularity: str) -> str:
+    """
+    计算日期所属桶的键（与 date_bucket 在数据库中的结果一致）
+
+    Args:
+        day: 日期
+        granularity: 时间粒度（day / week / month）
+
+    Returns:
+        str: 桶键
+    """
+    if granularity == DAY:
+        return day.strftime("%Y-%m-%d")
+    if granularity == WEEK:
+        iso_year, iso_week, _ = day.isocalendar()
+        return f"{iso_year}-W{iso_week:02d}"
+    if granularity == MONTH:
+        return day.strftime("%Y-%m")
+    raise ValueError(f"不支持的时间粒度: {granularity}")
+
+
+def _bucket_of(day: date, granularity: str) -> Bucket:
+    if granularity == DAY:
+        first_day = last_day = day
+    elif granularity == WEEK:
+        first_day = day - timedelta(days=day.weekday())
+        last_day = first_day + timedelta(days=6)
+    else:
+        first_day = day.replace(day=1)
+        last_day = (first_day + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return Bucket(bucket_key(day, granularity), first_day, last_day)
+
+
+def recent_buckets(granularity: str, count: int, end: date) -> List[Bucket]:
+    """
+    生成截至 end（含）的最近 count 个桶，按时间升序
+
+    Args:
+        granularity: 时间粒度（day / week / month）
+        count: 桶数量
+        end: 最后一个桶包含的日期
+
+    Returns:
+        List[Bucket]: 桶列表
+    """
+    buckets = [_bucket_of(end, granularity)]
+    while len(buckets) < count:
+        buckets.append(_bucket_of(buckets[-1].first_day - timedelta(days=1), granularity))
+    return list(reversed(buckets))
@@ -0,0 +1,87 @@
+"""
+WebSocket 订阅主题模块
+
+客户端在已建立的 WebSocket 连接上订阅主题，服务端在写路径提交事务后发布紧凑的增量事件，
+只推送给订阅了对应主题的连接。
+主要功能：
+1. 主题命名与校验：warehouse:{id}:inventory（单个仓库的库存变化）、
+   orders:status（订单创建与状态变化）、activity（活动日志）
+2. 事件编码：{"type":"event","topic":...,"event":...,"data":{...}}，只包含变化的字段
+3. publish_event：写路径调用，经消息总线发布到所有 worker；发布失败只记录日志，不影响写入
+"""
+
+import json
+import logging
+import re
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+TOPIC_ORDER_STATUS = "orders:status"
+TOPIC_ACTIVITY = "activity"
+
+_TOPIC_PATTERN = re.compile(r"^(?:warehouse:[1-9][0-9]{0,9}:inventory|orders:status|activity)$")
+
+
+def inventory_topic(warehouse_id: int) -> str:
+    """
+    获取仓库库存主题名
+
+    Args:
+        warehouse_id: 仓库ID
+
+    Returns:
+        str: 主题名，如 warehouse:3:inventory
+    """
+    return f"warehouse:{warehouse_id}:inventory"
+
+
+def is_valid_topic(topic: Any) -> bool:
+    """
+    判断是否为可订阅的主题
+
+    Args:
+        topic: 客户端提交的主题名
+
+    Returns:
+        bool: 是否合法
+    """
+    return isinstance(topic, str) and _TOPIC_PATTERN.match(topic) is not None
+
+
+def encode_event(topic: str, event: str, data: Dict[str, Any]) -> str:
+    """
+    编码增量事件（紧凑 JSON，无多余空白）
+
+    Args:
+        topic: 主题名
+        event: 事件名，如 inventory.updated
+        data: 变化的字段
+
+    Returns:
+        str: 已编码的消息文本
+    """
+    return json.dumps(
+        {"type": "event", "topic": topic, "event": event, "data": data},
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+
+
+def publish_event(topic: str, event: str, data: Dict[str, Any]) -> None:
+    """
+    经消息总线发布增量事件（在写事务提交之后调用，可在任意线程中调用）
+
+    Args:
+        topic: 主题名
+        event: 事件名
+        data: 变化的字段
+    """
+    try:
+        from app.core.websocket import manager
+
+        manager.publish(encode_event(topic, event, data), topic=topic)
+    except Exception:
+        # 实时推送失败不应影响已提交的写入
+        logger.exception("发布 WebSocket 主题事件失败 topic=%s", topic)
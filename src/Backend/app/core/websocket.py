@@ -7,36 +7,441 @@ WebSocket 连接管理器
 2. 支持多设备同时连接
 3. 向指定用户推送通知
 4. 广播通知给所有连接用户
+5. 推送经消息总线（app.core.message_bus）分发到所有 worker，
+   每个 worker 只推送给本进程持有的连接
+6. 每个连接有独立的有界发送队列和写任务：扇出只入队不等待，
+   慢客户端不会拖慢其它用户；队列溢出的连接以 1013 关闭并计入统计
+7. 服务端心跳与空闲超时：每个进程一个后台任务定期向所有连接发送 ping，
+   超过空闲时长未收到客户端任何消息的连接（半开连接）被关闭
+8. 连接数上限：每个用户的连接数超限时关闭该用户最旧的连接（设备断网重连后旧连接已失效），
+   每个进程的连接总数超限时拒绝新连接；应用关闭时先发送完队列中的消息再关闭连接（1012）
+9. 主题订阅：客户端在连接上订阅主题（app.core.topics），每个进程维护 主题 -> 连接集合 的索引，
+   主题事件只扇出给该主题的订阅者，开销与订阅者数成正比而非与连接总数成正比
+10. 重连补发：通知消息带有按用户单调递增的序号 seq（通知 ID），客户端以 ?since=<seq> 重连时
+    只补发缺失的通知；缺口在内存环形缓冲（app.core.replay_buffer）内时直接补发，
+    否则回退到按 (user_id, id) 索引的数据库查询
+11. 编码一次、多处共享：每条推送包装为一个 OutgoingMessage，所有接收连接共享同一对象；
+    客户端在握手时通过子协议 msgpack 协商二进制帧（需安装 msgpack），二进制编码按消息只计算一次
+12. 主题事件批量合并：同一主题在 WS_TOPIC_BATCH_SECONDS 内的事件直接拼接已编码的文本合并为一帧，
+    减少帧数；大批量帧在客户端协商了 permessage-deflate 时（uvicorn 默认开启）压缩效果更好
 """
 
-from typing import Dict, List, Optional
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
 from fastapi import WebSocket
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.message_bus import MessageBus, create_message_bus
+from app.core.replay_buffer import ReplayBuffer
+from app.core.topics import is_valid_topic
+from app.crud.notification import notification as notification_crud
 import json
 
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - 取决于部署环境
+    msgpack = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# 慢客户端（发送队列溢出）或进程连接数已满：1013 Try Again Later
+SLOW_CONSUMER_CLOSE_CODE = 1013
+# 空闲超时：1001 Going Away
+IDLE_TIMEOUT_CLOSE_CODE = 1001
+# 同一用户连接数超限，最旧的连接被新连接取代：1008 Policy Violation
+REPLACED_CLOSE_CODE = 1008
+# 应用关闭（重启）：1012 Service Restart，客户端应稍后重连
+SHUTDOWN_CLOSE_CODE = 1012
+
+PING_MESSAGE = json.dumps({"type": "ping"})
+
+# 帧编码：json 为文本帧；msgpack 为二进制帧，客户端在握手时以子协议 "msgpack" 协商
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+
+
+class OutgoingMessage:
+    """
+    一条待推送的消息
+
+    扇出时所有接收连接共享同一对象：JSON 文本只编码一次，MessagePack 二进制在第一个
+    需要它的连接发送时编码一次并缓存。
+    """
+
+    __slots__ = ("text", "_binary")
+
+    def __init__(self, text: str):
+        """
+        初始化消息
+
+        Args:
+            text: 已编码的 JSON 文本
+        """
+        self.text = text
+        self._binary: Optional[bytes] = None
+
+    @property
+    def binary(self) -> bytes:
+        """MessagePack 编码（按需计算一次）"""
+        if self._binary is None:
+            self._binary = msgpack.packb(json.loads(self.text), use_bin_type=True)
+        return self._binary
+
+
+PING_FRAME = OutgoingMessage(PING_MESSAGE)
+
+
+def as_outgoing(message: Union[str, OutgoingMessage]) -> OutgoingMessage:
+    """把 JSON 文本包装为 OutgoingMessage（已包装的原样返回）"""
+    return message if isinstance(message, OutgoingMessage) else OutgoingMessage(message)
+
+
+def negotiate_encoding(subprotocols: Sequence[str]) -> str:
+    """
+    按客户端提供的子协议选择帧编码
+
+    Args:
+        subprotocols: 客户端在 Sec-WebSocket-Protocol 中提供的子协议
+
+    Returns:
+        str: msgpack（客户端提供且服务端已安装 msgpack）或 json
+    """
+    if ENCODING_MSGPACK in subprotocols and msgpack is not None:
+        return ENCODING_MSGPACK
+    return ENCODING_JSON
+
+
+def encode_notification(
+    notification_id: int,
+    title: str,
+    message: str,
+    notification_type: str,
+    reference_id: Optional[int] = None,
+    reference_type: Optional[str] = None
+) -> str:
+    """
+    编码通知推送消息（实时推送与重连补发共用）
+
+    Args:
+        notification_id: 通知ID，同时作为消息序号 seq
+        title: 通知标题
+        message: 通知消息
+        notification_type: 通知类型
+        reference_id: 关联实体ID
+        reference_type: 关联实体类型
+
+    Returns:
+        str: 消息内容（JSON字符串）
+    """
+    return json.dumps({
+        "type": "notification",
+        "seq": notification_id,
+        "data": {
+            "id": notification_id,
+            "title": title,
+            "message": message,
+            "notification_type": notification_type,
+            "reference_id": reference_id,
+            "reference_type": reference_type
+        }
+    })
+
+
+class ClientConnection:
+    """单个 WebSocket 连接：有界发送队列 + 独立写任务"""
+
+    def __init__(self, websocket: WebSocket, user_id: int, queue_size: int, encoding: str = ENCODING_JSON):
+        """
+        初始化连接
+
+        Args:
+            websocket: WebSocket 连接对象
+            user_id: 用户ID
+            queue_size: 发送队列容量
+            encoding: 帧编码（json 或 msgpack）
+        """
+        self.websocket = websocket
+        self.user_id = user_id
+        self.encoding = encoding
+        self.queue: "asyncio.Queue[OutgoingMessage]" = asyncio.Queue(maxsize=queue_size)
+        self.sent = 0
+        self.closed = False
+        # 本连接订阅的主题（与 ConnectionManager.subscribers 索引保持一致）
+        self.topics: Set[str] = set()
+        self.last_seen = time.monotonic()
+        self._writer: Optional[asyncio.Task] = None
+
+    def touch(self) -> None:
+        """记录收到客户端消息的时间（空闲超时判断依据）"""
+        self.last_seen = time.monotonic()
+
+    def start(self, on_error: Callable[["ClientConnection"], None]) -> None:
+        """
+        启动写任务
+
+        Args:
+            on_error: 发送失败时的回调（参数为本连接）
+        """
+        self._writer = asyncio.create_task(self._write(on_error))
+
+    def offer(self, message: OutgoingMessage) -> bool:
+        """
+        消息入队（不等待）
+
+        Args:
+            message: 消息（与其它接收连接共享）
+
+        Returns:
+            bool: 队列已满或连接已关闭时返回 False
+        """
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def _write(self, on_error: Callable[["ClientConnection"], None]) -> None:
+        while True:
+            message = await self.queue.get()
+            try:
+                if self.encoding == ENCODING_MSGPACK:
+                    await self.websocket.send_bytes(message.binary)
+                else:
+                    await self.websocket.send_text(message.text)
+            except Exception:
+                on_error(self)
+                return
+            finally:
+                self.queue.task_done()
+            self.sent += 1
+
+    async def flush(self, timeout: float) -> None:
+        """
+        等待发送队列中的消息发送完毕
+
+        Args:
+            timeout: 最长等待时间（秒）
+        """
+        if self.closed or self._writer is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def close(self, code: Optional[int] = None, reason: str = "") -> Optional["asyncio.Future[None]"]:
+        """
+        停止写任务，给定关闭码时同时关闭 WebSocket
+
+        Args:
+            code: WebSocket 关闭码，None 表示只停止写任务（连接已由客户端关闭）
+            reason: 关闭原因
+
+        Returns:
+            Optional[asyncio.Future[None]]: 发送关闭帧的任务（未给定关闭码时为 None）
+        """
+        if self.closed:
+            return None
+        self.closed = True
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        if code is None:
+            return None
+        return asyncio.ensure_future(self._close_socket(code, reason))
+
+    async def _close_socket(self, code: int, reason: str) -> None:
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            # 连接可能已被对端关闭
+            pass
+
 
 class ConnectionManager:
     """WebSocket 连接管理器"""
 
-    def __init__(self):
-        """初始化连接管理器"""
-        # 存储用户ID到WebSocket连接的映射（支持多设备）
-        self.active_connections: Dict[int, List[WebSocket]] = {}
+    def __init__(self, bus: Optional[MessageBus] = None):
+        """
+        初始化连接管理器
+
+        Args:
+            bus: 消息总线，默认按 WS_BUS_BACKEND 配置创建
+        """
+        # 存储用户ID到连接的映射（支持多设备）
+        self.active_connections: Dict[int, List[ClientConnection]] = {}
+        self.bus = bus or create_message_bus()
+        self.queue_size = settings.WS_SEND_QUEUE_SIZE
+        self.heartbeat_seconds = settings.WS_HEARTBEAT_SECONDS
+        self.idle_timeout_seconds = settings.WS_IDLE_TIMEOUT_SECONDS
+        self.max_connections_per_user = settings.WS_MAX_CONNECTIONS_PER_USER
+        self.max_connections = settings.WS_MAX_CONNECTIONS
+        self.max_topics_per_connection = settings.WS_MAX_TOPICS_PER_CONNECTION
+        # 主题到订阅连接的索引
+        self.subscribers: Dict[str, Set[ClientConnection]] = {}
+        # 主题事件批量合并：主题 -> 窗口内待发送的事件文本
+        self.topic_batch_seconds = settings.WS_TOPIC_BATCH_SECONDS
+        self.topic_batch_max_events = settings.WS_TOPIC_BATCH_MAX_EVENTS
+        self._pending_events: Dict[str, List[str]] = {}
+        # 重连补发：内存环形缓冲，缺口更早时经 session_factory 查询数据库（主库，避免副本延迟）
+        self.replay_buffer = ReplayBuffer(settings.WS_REPLAY_BUFFER_SIZE, settings.WS_REPLAY_MAX_USERS)
+        self.replay_max_messages = settings.WS_REPLAY_MAX_MESSAGES
+        self.session_factory = SessionLocal
+        self.connection_count = 0
+        self.draining = False
+        self._bus_started = False
+        self._heartbeat: Optional[asyncio.Task] = None
+        # 已关闭连接的累计统计
+        self._sent_closed = 0
+        self.dropped = 0
+        self.evicted = 0
+        self.idle_closed = 0
+        self.replaced = 0
+        self.rejected = 0
+        self.replayed_from_memory = 0
+        self.replayed_from_database = 0
+        self.batched_events = 0
+
+    async def start(self):
+        """开始从消息总线接收推送并启动心跳任务（第一个连接建立时自动调用）"""
+        if self._bus_started:
+            return
+        self._bus_started = True
+        try:
+            await self.bus.start(self._deliver)
+        except BaseException:
+            self._bus_started = False
+            raise
+        if self.heartbeat_seconds > 0:
+            self._heartbeat = asyncio.create_task(self._run_heartbeat())
+
+    async def stop(self, drain_timeout: float = 0.0):
+        """
+        停止接收推送并关闭所有连接（应用关闭时调用）
+
+        Args:
+            drain_timeout: 关闭前等待各连接发送完队列中消息的最长时间（秒）
+        """
+        self.draining = True
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        if self._bus_started:
+            self._bus_started = False
+            await self.bus.stop()
+
+        # 批量合并窗口中尚未发出的主题事件先入队
+        for topic in list(self._pending_events):
+            self._flush_topic(topic)
+        connections = [c for conns in self.active_connections.values() for c in conns]
+        if connections and drain_timeout > 0:
+            await asyncio.wait(
+                [asyncio.ensure_future(c.flush(drain_timeout)) for c in connections],
+                timeout=drain_timeout,
+            )
+        closing = [self._remove(connection, SHUTDOWN_CLOSE_CODE, "server restart") for connection in connections]
+        pending = [future for future in closing if future is not None]
+        if pending:
+            # 等待关闭帧发出
+            await asyncio.wait(pending, timeout=max(drain_timeout, 1.0))
+
+    def sweep(self, now: Optional[float] = None) -> None:
+        """
+        心跳检查：关闭空闲超时的连接，向其余连接发送 ping
+
+        Args:
+            now: 当前单调时钟时间（测试用）
+        """
+        now = time.monotonic() if now is None else now
+        for connections in list(self.active_connections.values()):
+            for connection in list(connections):
+                if self.idle_timeout_seconds > 0 and now - connection.last_seen > self.idle_timeout_seconds:
+                    self.idle_closed += 1
+                    self._remove(connection, IDLE_TIMEOUT_CLOSE_CODE, "idle timeout")
+                else:
+                    self.enqueue(connection, PING_FRAME)
+
+    async def _run_heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("WebSocket 心跳检查失败")
 
-    async def connect(self, websocket: WebSocket, user_id: int):
+    async def connect(
+        self,
+        websocket: WebSocket,
+        user_id: int,
+        encoding: str = ENCODING_JSON,
+    ) -> Optional[ClientConnection]:
         """
         接受新的 WebSocket 连接
 
+        用户连接数已达上限时关闭该用户最旧的连接；进程连接总数已达上限或应用正在关闭时，
+        握手后立即以 1013 / 1012 关闭新连接（客户端可据此退避重连）。
+
         Args:
             websocket: WebSocket 连接对象
             user_id: 用户ID
+            encoding: 协商得到的帧编码（见 negotiate_encoding），非默认编码时在握手应答中回传该子协议
+
+        Returns:
+            Optional[ClientConnection]: 连接对象，向该连接发送消息应通过其发送队列；
+                连接被拒绝时返回 None
         """
-        await websocket.accept()
+        if self.draining:
+            await websocket.accept()
+            await websocket.close(code=SHUTDOWN_CLOSE_CODE, reason="server restart")
+            self.rejected += 1
+            return None
+
+        await self.start()
+        await websocket.accept(subprotocol=encoding if encoding != ENCODING_JSON else None)
+
+        existing = self.active_connections.get(user_id, [])
+        if self.max_connections_per_user > 0:
+            while len(existing) >= self.max_connections_per_user:
+                self.replaced += 1
+                self._remove(existing[0], REPLACED_CLOSE_CODE, "replaced by newer connection")
+
+        if self.max_connections > 0 and self.connection_count >= self.max_connections:
+            self.rejected += 1
+            await websocket.close(code=SLOW_CONSUMER_CLOSE_CODE, reason="server busy")
+            return None
+
+        connection = ClientConnection(websocket, user_id, self.queue_size, encoding)
+        connection.start(self._on_send_error)
 
         # 如果用户已有连接，添加到列表；否则创建新列表
         if user_id not in self.active_connections:
             self.active_connections[user_id] = []
 
-        self.active_connections[user_id].append(websocket)
+        self.active_connections[user_id].append(connection)
+        self.connection_count += 1
+        return connection
+
+    def _remove(
+        self,
+        connection: ClientConnection,
+        code: Optional[int] = None,
+        reason: str = "",
+    ) -> Optional["asyncio.Future[None]"]:
+        connections = self.active_connections.get(connection.user_id)
+        if connections is not None and connection in connections:
+            connections.remove(connection)
+            self.connection_count -= 1
+            self._sent_closed += connection.sent
+            # 如果用户没有活跃连接，删除用户记录
+            if not connections:
+                del self.active_connections[connection.user_id]
+        self._drop_subscriptions(connection, list(connection.topics))
+        return connection.close(code, reason)
 
     def disconnect(self, websocket: WebSocket, user_id: int):
         """
@@ -46,38 +451,243 @@ class ConnectionManager:
             websocket: WebSocket 连接对象
             user_id: 用户ID
         """
-        if user_id in self.active_connections:
-            if websocket in self.active_connections[user_id]:
-                self.active_connections[user_id].remove(websocket)
+        for connection in list(self.active_connections.get(user_id, [])):
+            if connection.websocket is websocket:
+                self._remove(connection)
 
-            # 如果用户没有活跃连接，删除用户记录
-            if not self.active_connections[user_id]:
-                del self.active_connections[user_id]
+    def subscribe(self, connection: ClientConnection, topics: Iterable[Any]) -> Tuple[List[str], List[Any]]:
+        """
+        为连接订阅主题
+
+        Args:
+            connection: 连接对象
+            topics: 客户端提交的主题名
+
+        Returns:
+            Tuple[List[str], List[Any]]: (本连接当前订阅的全部主题, 被拒绝的主题)；
+                主题名不合法或超过单连接订阅上限时被拒绝
+        """
+        rejected: List[Any] = []
+        for topic in topics:
+            if topic in connection.topics:
+                continue
+            if not is_valid_topic(topic) or (
+                self.max_topics_per_connection > 0
+                and len(connection.topics) >= self.max_topics_per_connection
+            ):
+                rejected.append(topic)
+                continue
+            connection.topics.add(topic)
+            self.subscribers.setdefault(topic, set()).add(connection)
+        return sorted(connection.topics), rejected
+
+    def unsubscribe(self, connection: ClientConnection, topics: Iterable[Any]) -> List[str]:
+        """
+        取消连接的主题订阅
+
+        Args:
+            connection: 连接对象
+            topics: 要取消的主题名
+
+        Returns:
+            List[str]: 本连接当前订阅的全部主题
+        """
+        self._drop_subscriptions(connection, [t for t in topics if t in connection.topics])
+        return sorted(connection.topics)
+
+    def _drop_subscriptions(self, connection: ClientConnection, topics: List[str]) -> None:
+        for topic in topics:
+            connection.topics.discard(topic)
+            subscribers = self.subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self.subscribers[topic]
+
+    def _on_send_error(self, connection: ClientConnection):
+        self._remove(connection)
+
+    def enqueue(self, connection: ClientConnection, message: Union[str, OutgoingMessage]) -> bool:
+        """
+        向单个连接的发送队列放入消息（不等待）
+
+        队列已满说明客户端消费过慢：断开该连接（关闭码 1013），客户端重连后重新同步。
+
+        Args:
+            connection: 连接对象
+            message: 消息内容（JSON字符串）；扇出时应传入共享的 OutgoingMessage
+
+        Returns:
+            bool: 是否入队成功
+        """
+        if connection.offer(as_outgoing(message)):
+            return True
+        if not connection.closed:
+            # 本条消息与队列中尚未发送的消息都被丢弃
+            self.dropped += 1 + connection.queue.qsize()
+            self.evicted += 1
+            logger.warning(
+                "WebSocket 发送队列已满，断开慢客户端 user_id=%s queue_size=%s",
+                connection.user_id,
+                self.queue_size,
+            )
+            self._remove(connection, SLOW_CONSUMER_CLOSE_CODE, "slow consumer")
+        return False
 
     async def send_personal_message(self, message: str, user_id: int):
         """
-        向指定用户的所有连接发送消息
+        向本进程中指定用户的所有连接发送消息（只入队，不等待发送完成）
 
         Args:
             message: 消息内容（JSON字符串）
             user_id: 用户ID
         """
-        if user_id in self.active_connections:
-            # 向该用户的所有设备发送消息
-            dead_connections = []
+        frame = as_outgoing(message)
+        for connection in list(self.active_connections.get(user_id, [])):
+            self.enqueue(connection, frame)
 
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_text(message)
-                except Exception:
-                    # 如果发送失败，标记为待删除连接
-                    dead_connections.append(connection)
+    async def send_topic_message(self, message: str, topic: str):
+        """
+        向本进程中订阅了指定主题的连接发送消息（只入队，不等待发送完成）
 
-            # 清理失效的连接
-            for connection in dead_connections:
-                self.disconnect(connection, user_id)
+        开启批量合并时，同一主题在 topic_batch_seconds 内的事件合并为一帧
+        {"type":"events","topic":...,"events":[...]} 后发送（窗口内只有一条事件时原样发送）。
 
-    async def send_notification(
+        Args:
+            message: 消息内容（JSON字符串）
+            topic: 主题名
+        """
+        if topic not in self.subscribers:
+            return
+        if self.topic_batch_seconds <= 0:
+            self._fan_out_topic(topic, OutgoingMessage(message))
+            return
+        pending = self._pending_events.get(topic)
+        if pending is None:
+            self._pending_events[topic] = [message]
+            asyncio.get_running_loop().call_later(self.topic_batch_seconds, self._flush_topic, topic)
+            return
+        pending.append(message)
+        if len(pending) >= self.topic_batch_max_events:
+            self._flush_topic(topic)
+
+    def _flush_topic(self, topic: str) -> None:
+        messages = self._pending_events.pop(topic, None)
+        if not messages:
+            return
+        if len(messages) == 1:
+            frame = OutgoingMessage(messages[0])
+        else:
+            # 各事件已是 JSON 文本，直接拼接，不再解码重编码
+            self.batched_events += len(messages)
+            frame = OutgoingMessage(
+                '{"type":"events","topic":%s,"events":[%s]}' % (json.dumps(topic), ",".join(messages))
+            )
+        self._fan_out_topic(topic, frame)
+
+    def _fan_out_topic(self, topic: str, frame: OutgoingMessage) -> None:
+        for connection in list(self.subscribers.get(topic, ())):
+            self.enqueue(connection, frame)
+
+    async def _deliver(self, user_id: Optional[int], message: str, topic: Optional[str] = None):
+        """消息总线投递回调：推送给本进程持有的连接"""
+        if topic is not None:
+            await self.send_topic_message(message, topic)
+        elif user_id is None:
+            await self.broadcast_local(message)
+        else:
+            # 无论用户是否连接在本进程，都记入补发缓冲（重连可能落在任一 worker）
+            seq = self._sequence_of(message)
+            if seq is not None:
+                self.replay_buffer.append(user_id, seq, message)
+            await self.send_personal_message(message, user_id)
+
+    @staticmethod
+    def _sequence_of(message: str) -> Optional[int]:
+        try:
+            seq = json.loads(message).get("seq")
+        except (ValueError, AttributeError):
+            return None
+        return seq if isinstance(seq, int) else None
+
+    def _load_missed(self, user_id: int, since: int, limit: int) -> List[str]:
+        db = self.session_factory()
+        try:
+            rows = notification_crud.get_after(db, user_id=user_id, after_id=since, limit=limit)
+            return [
+                encode_notification(
+                    int(row.id),  # type: ignore[arg-type]
+                    str(row.title),
+                    str(row.message),
+                    str(row.notification_type),
+                    row.reference_id,  # type: ignore[arg-type]
+                    row.reference_type,  # type: ignore[arg-type]
+                )
+                for row in rows
+            ]
+        finally:
+            db.close()
+
+    async def replay(self, connection: ClientConnection, since: int) -> Dict[str, Any]:
+        """
+        向重连的客户端补发 seq 之后的通知，最后发送一条 replay 汇总消息
+
+        缺口在内存缓冲内时同步入队，补发消息一定排在此后的实时推送之前；回退到数据库查询期间
+        到达的实时推送可能先于补发消息送达，客户端应按 seq 去重。补发条数超过上限时
+        truncated 为 true，客户端应改为调用通知列表接口全量刷新。
+
+        Args:
+            connection: 连接对象
+            since: 客户端最后收到的通知序号
+
+        Returns:
+            Dict[str, Any]: 汇总信息（since、count、last_seq、source、truncated）
+        """
+        # 补发消息一次性入队：条数不超过发送队列容量（留出连接消息与汇总消息的位置），避免被判为慢客户端
+        limit = max(min(self.replay_max_messages, self.queue_size - 2), 0)
+        messages = self.replay_buffer.since(connection.user_id, since)
+        source = "memory"
+        if messages is None:
+            source = "database"
+            try:
+                messages = await run_in_threadpool(self._load_missed, connection.user_id, since, limit + 1)
+            except Exception:
+                logger.exception("查询 WebSocket 补发通知失败 user_id=%s since=%s", connection.user_id, since)
+                messages = None
+        if source == "memory":
+            self.replayed_from_memory += 1
+        else:
+            self.replayed_from_database += 1
+
+        truncated = messages is None or len(messages) > limit
+        messages = (messages or [])[:limit]
+        last_seq = since
+        for message in messages:
+            if not self.enqueue(connection, message):
+                break
+            last_seq = self._sequence_of(message) or last_seq
+        summary = {
+            "since": since,
+            "count": len(messages),
+            "last_seq": last_seq,
+            "source": source,
+            "truncated": truncated,
+        }
+        self.enqueue(connection, json.dumps({"type": "replay", "data": summary}))
+        return summary
+
+    def publish(self, message: str, user_id: Optional[int] = None, topic: Optional[str] = None):
+        """
+        经消息总线发布推送（可在任意线程中调用）
+
+        Args:
+            message: 消息内容（JSON字符串）
+            user_id: 目标用户ID，None 表示广播
+            topic: 订阅主题，给定时只推送给订阅了该主题的连接
+        """
+        self.bus.publish(user_id, message, topic)
+
+    def publish_notification(
         self,
         user_id: int,
         notification_id: int,
@@ -88,7 +698,7 @@ class ConnectionManager:
         reference_type: Optional[str] = None
     ):
         """
-        向指定用户发送通知
+        经消息总线向指定用户发布通知（可在同步代码中调用）
 
         Args:
             user_id: 用户ID
@@ -99,42 +709,64 @@ class ConnectionManager:
             reference_id: 关联实体ID
             reference_type: 关联实体类型
         """
-        notification_data = {
-            "type": "notification",
-            "data": {
-                "id": notification_id,
-                "title": title,
-                "message": message,
-                "notification_type": notification_type,
-                "reference_id": reference_id,
-                "reference_type": reference_type
-            }
-        }
+        self.publish(
+            encode_notification(notification_id, title, message, notification_type, reference_id, reference_type),
+            user_id,
+        )
+
+    async def send_notification(
+        self,
+        user_id: int,
+        notification_id: int,
+        title: str,
+        message: str,
+        notification_type: str,
+        reference_id: Optional[int] = None,
+        reference_type: Optional[str] = None
+    ):
+        """
+        向指定用户发送通知（无论连接在哪个 worker 上）
 
-        await self.send_personal_message(
-            json.dumps(notification_data),
-            user_id
+        Args:
+            user_id: 用户ID
+            notification_id: 通知ID
+            title: 通知标题
+            message: 通知消息
+            notification_type: 通知类型
+            reference_id: 关联实体ID
+            reference_type: 关联实体类型
+        """
+        await run_in_threadpool(
+            self.publish_notification,
+            user_id,
+            notification_id,
+            title,
+            message,
+            notification_type,
+            reference_id,
+            reference_type,
         )
 
     async def broadcast(self, message: str):
         """
-        向所有连接的用户广播消息
+        向所有 worker 上的所有连接广播消息
 
         Args:
             message: 消息内容（JSON字符串）
         """
-        dead_connections = []
+        await run_in_threadpool(self.publish, message)
 
-        for user_id, connections in self.active_connections.items():
-            for connection in connections:
-                try:
-                    await connection.send_text(message)
-                except Exception:
-                    dead_connections.append((user_id, connection))
+    async def broadcast_local(self, message: str):
+        """
+        向本进程的所有连接广播消息（只入队，不等待发送完成）
 
-        # 清理失效的连接
-        for user_id, connection in dead_connections:
-            self.disconnect(connection, user_id)
+        Args:
+            message: 消息内容（JSON字符串）
+        """
+        frame = as_outgoing(message)
+        for connections in list(self.active_connections.values()):
+            for connection in list(connections):
+                self.enqueue(connection, frame)
 
     def get_connected_users(self) -> List[int]:
         """
@@ -157,6 +789,42 @@ class ConnectionManager:
         """
         return len(self.active_connections.get(user_id, []))
 
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取本进程的 WebSocket 推送统计
+
+        Returns:
+            Dict[str, Any]: 连接数、订阅主题数、队列容量、排队消息数、最大队列深度、已发送/丢弃消息数，
+                因慢消费、空闲超时、连接数上限被关闭或拒绝的连接数，重连补发统计，
+                以及 MessagePack 连接数与合并发送的主题事件数
+        """
+        connections = [c for conns in self.active_connections.values() for c in conns]
+        depths = [c.queue.qsize() for c in connections]
+        return {
+            "pid": os.getpid(),
+            "users": len(self.active_connections),
+            "connections": len(connections),
+            "topics": len(self.subscribers),
+            "subscriptions": sum(len(c.topics) for c in connections),
+            "queue_size": self.queue_size,
+            "queued_messages": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "sent": self._sent_closed + sum(c.sent for c in connections),
+            "dropped": self.dropped,
+            "evicted_slow_consumers": self.evicted,
+            "closed_idle": self.idle_closed,
+            "replaced": self.replaced,
+            "rejected": self.rejected,
+            "replay_buffered_users": len(self.replay_buffer),
+            "replayed_from_memory": self.replayed_from_memory,
+            "replayed_from_database": self.replayed_from_database,
+            "msgpack_connections": sum(1 for c in connections if c.encoding == ENCODING_MSGPACK),
+            "batched_events": self.batched_events,
+            "max_connections": self.max_connections,
+            "max_connections_per_user": self.max_connections_per_user,
+            "draining": self.draining,
+        }
+
 
 # 创建全局连接管理器实例
 manager = ConnectionManager()
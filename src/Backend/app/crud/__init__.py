@@ -4,8 +4,14 @@ CRUD操作模块
 该模块整合了所有数据模型的CRUD操作。
 """
 
-from . import base, inventory, product, user, sales
+from . import base, inventory, product, user, sales, dashboard_snapshot, change_counter, sales_rollup, inventory_history, scheduler_lease, websocket_outbox
 from .product import product, category
 from .user import user
 from .inventory import inventory, warehouse
 from .sales import distributor, sales_order
+from .dashboard_snapshot import dashboard_snapshot
+from .change_counter import change_counter
+from .sales_rollup import sales_rollup
+from .inventory_history import inventory_history
+from .scheduler_lease import scheduler_lease
+from .websocket_outbox import websocket_outbox
@@ -1,13 +1,32 @@
 """活动日志 CRUD 操作"""
 
+from sqlalchemy.orm import Session
+from app.core.topics import TOPIC_ACTIVITY, publish_event
 from app.crud.base import CRUDBase
+from app.crud.change_counter import TAG_ACTIVITY
 from app.models.activity_log import ActivityLog
 from app.schemas.activity_log import ActivityLogCreate, ActivityLogBase
 
 
 class CRUDActivityLog(CRUDBase[ActivityLog, ActivityLogCreate, ActivityLogBase]):
     """活动日志 CRUD 操作类"""
-    pass
+
+    change_tags = (TAG_ACTIVITY,)
+
+    def create(self, db: Session, *, obj_in: ActivityLogCreate) -> ActivityLog:
+        """创建活动日志，提交后向 activity 主题发布该条日志"""
+        db_obj = super().create(db, obj_in=obj_in)
+        publish_event(TOPIC_ACTIVITY, "activity.created", {
+            "id": db_obj.id,
+            "activity_type": db_obj.activity_type,
+            "action": db_obj.action,
+            "item_name": db_obj.item_name,
+            "user_id": db_obj.user_id,
+            "reference_id": db_obj.reference_id,
+            "reference_type": db_obj.reference_type,
+            "created_at": db_obj.created_at.isoformat() if db_obj.created_at is not None else None,
+        })
+        return db_obj
 
 
 # 创建活动日志 CRUD 实例
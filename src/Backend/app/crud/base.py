@@ -7,10 +7,11 @@
 2. 支持泛型，可以适用于任何模型和模式
 """
 
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
+from app.crud.change_counter import change_counter
 
 ModelType = TypeVar("ModelType")
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -23,8 +24,11 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     **参数**
     * `model`: SQLAlchemy 模型类
     * `schema`: Pydantic 模型（模式）类
+    * `change_tags`: 默认的创建、更新、删除操作需要递增的变更计数器标签
     """
-    
+
+    change_tags: Tuple[str, ...] = ()
+
     def __init__(self, model: Type[ModelType]):
         """
         初始化 CRUD 对象
@@ -34,6 +38,11 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         self.model: Type[ModelType] = model
 
+    def _bump(self, db: Session) -> None:
+        """在同一事务内递增 change_tags 对应的变更计数器"""
+        if self.change_tags:
+            change_counter.bump(db, *self.change_tags)
+
     def get(self, db: Session, id: Any) -> Optional[ModelType]:
         """
         根据 ID 获取单个对象
@@ -77,6 +86,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)  # type: ignore
         db.add(db_obj)
+        self._bump(db)
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -108,6 +118,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             if field in update_data:
                 setattr(db_obj, field, update_data[field])
         db.add(db_obj)
+        self._bump(db)
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -127,5 +138,6 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if obj is None:
             raise ValueError(f"{self.model.__name__} with id {id} not found")
         db.delete(obj)
+        self._bump(db)
         db.commit()
         return obj
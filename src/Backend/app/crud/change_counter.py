@@ -0,0 +1,105 @@
+"""
+变更计数器 CRUD 操作
+
+写操作通过 bump 递增数据标签的版本号（不提交事务，由调用方统一 commit），
+读取方通过 get_versions 一次取出全部标签的当前版本。
+标签行在应用启动时由 ensure_tags 预先写入；bump 对缺失的行使用方言级
+“插入或忽略”，并发的首次写入不会因主键冲突而使业务事务失败。
+"""
+
+from typing import Dict, Iterable
+from sqlalchemy import insert, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.change_counter import ChangeCounter
+
+# 已知的数据标签
+TAG_INVENTORY = "inventory"
+TAG_PRODUCTS = "products"
+TAG_WAREHOUSES = "warehouses"
+TAG_ORDERS = "orders"
+TAG_CATEGORIES = "categories"
+TAG_ACTIVITY = "activity"
+
+ALL_TAGS = (TAG_INVENTORY, TAG_PRODUCTS, TAG_WAREHOUSES, TAG_ORDERS, TAG_CATEGORIES, TAG_ACTIVITY)
+
+
+class CRUDChangeCounter:
+    """变更计数器 CRUD 操作类"""
+
+    def get_versions(self, db: Session) -> Dict[str, int]:
+        """
+        获取全部标签的当前版本号
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            Dict[str, int]: 标签到版本号的映射，从未写入过的标签不在其中（视为 0）
+        """
+        rows = db.query(ChangeCounter.tag, ChangeCounter.version).all()
+        return {str(tag): int(version) for tag, version in rows}
+
+    def bump(self, db: Session, *tags: str) -> None:
+        """
+        递增指定标签的版本号
+
+        Args:
+            db: 数据库会话
+            tags: 需要递增的数据标签
+        """
+        self._insert_missing(db, tags)
+        db.execute(
+            update(ChangeCounter)
+            .where(ChangeCounter.tag.in_(tags))
+            .values(version=ChangeCounter.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    def ensure_tags(self, db: Session, tags: Iterable[str] = ALL_TAGS) -> None:
+        """
+        预先写入标签行并提交（应用启动时调用）
+
+        Args:
+            db: 数据库会话
+            tags: 需要写入的数据标签，默认全部已知标签
+        """
+        self._insert_missing(db, tuple(tags))
+        db.commit()
+
+    @staticmethod
+    def _insert_missing(db: Session, tags: Iterable[str]) -> None:
+        """
+        插入尚不存在的标签行，已存在（包括并发事务刚插入）的行忽略
+
+        Args:
+            db: 数据库会话
+            tags: 数据标签
+        """
+        rows = [{"tag": tag, "version": 0} for tag in sorted(set(tags))]
+        if not rows:
+            return
+        dialect = db.get_bind().dialect.name
+        if dialect == "mysql":
+            stmt = mysql.insert(ChangeCounter).values(rows)
+            stmt = stmt.on_duplicate_key_update(tag=stmt.inserted.tag)
+        elif dialect == "postgresql":
+            stmt = postgresql.insert(ChangeCounter).values(rows).on_conflict_do_nothing(index_elements=["tag"])
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(ChangeCounter).values(rows).on_conflict_do_nothing(index_elements=["tag"])
+        else:
+            # 其它方言：逐行检查后在保存点内插入，冲突只回滚保存点
+            for row in rows:
+                if db.get(ChangeCounter, row["tag"]) is None:
+                    try:
+                        with db.begin_nested():
+                            db.execute(insert(ChangeCounter).values(**row))
+                    except IntegrityError:
+                        pass
+            return
+        db.execute(stmt)
+
+
+# 创建变更计数器 CRUD 实例
+change_counter = CRUDChangeCounter()
@@ -0,0 +1,489 @@
+"""
+仪表板快照 CRUD 操作
+
+该模块负责维护 dashboard_snapshots / dashboard_order_snapshots 读模型。
+主要功能：
+1. 在库存、订单、产品、仓库写操作的同一事务内增量更新计数器
+2. 从业务表全量重建快照，并报告与现有快照之间的偏差
+3. 按主键读取全局或单个仓库的快照
+
+所有 apply_* 方法只执行 UPDATE/INSERT，不提交事务，由调用方统一 commit。
+全局快照行不存在时视为快照尚未初始化，增量维护直接跳过。完整构建只在应用启动时
+（DashboardService.initialize_read_models）或通过 scripts/reconcile_dashboard_snapshot.py 进行，
+读路径从不写库。
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+from sqlalchemy import and_, case, func, select, update
+from sqlalchemy.orm import Session
+from app.models.dashboard_snapshot import (
+    GLOBAL_SNAPSHOT_ID,
+    DashboardOrderSnapshot,
+    DashboardSnapshot,
+)
+from app.models.inventory import Inventory, Warehouse
+from app.models.product import Product
+from app.models.sales import SalesOrder
+
+# 计入“待处理订单”的订单状态
+PENDING_ORDER_STATUSES = ("pending", "processing")
+
+# 库存相关计数器字段
+STOCK_COUNTER_FIELDS = (
+    "inventory_rows",
+    "total_inventory",
+    "normal_stock",
+    "low_stock",
+    "out_of_stock",
+    "inventory_value",
+)
+
+# 快照行中参与对账的全部字段
+SNAPSHOT_FIELDS = STOCK_COUNTER_FIELDS + ("total_products", "total_warehouses", "pending_orders")
+
+
+class StockState(NamedTuple):
+    """一条库存记录对计数器有影响的状态"""
+
+    warehouse_id: int
+    quantity: Optional[int]
+    min_stock_level: Optional[int]
+    price: Optional[float]
+
+    @classmethod
+    def of(cls, db: Session, item: Inventory) -> "StockState":
+        product = db.get(Product, item.product_id)
+        return cls(
+            item.warehouse_id,  # type: ignore[arg-type]
+            item.quantity,  # type: ignore[arg-type]
+            product.min_stock_level if product is not None else None,  # type: ignore[arg-type]
+            product.price if product is not None else None,  # type: ignore[arg-type]
+        )
+
+
+class ProductState(NamedTuple):
+    """产品对计数器有影响的状态"""
+
+    min_stock_level: Optional[int]
+    price: Optional[float]
+    is_active: bool
+
+    @classmethod
+    def of(cls, product: Product) -> "ProductState":
+        return cls(product.min_stock_level, product.price, bool(product.is_active))  # type: ignore[arg-type]
+
+
+class OrderState(NamedTuple):
+    """一条订单对计数器有影响的状态"""
+
+    warehouse_id: Optional[int]
+    status: str
+    total_value: float
+
+    @classmethod
+    def of(cls, order: SalesOrder) -> "OrderState":
+        return cls(order.warehouse_id, str(order.status), float(order.total_value or 0.0))  # type: ignore[arg-type]
+
+
+def inventory_metric_columns() -> List[Any]:
+    """
+    库存条件聚合列
+
+    需配合 ``select_from(Inventory).outerjoin(Product, ...)`` 使用，
+    仪表板实时统计与快照重建共用这一组表达式，保证口径一致。
+
+    Returns:
+        List: 带标签的聚合列
+    """
+    is_low_stock = and_(
+        Inventory.quantity <= Product.min_stock_level,  # type: ignore[arg-type]
+        Inventory.quantity > 0,  # type: ignore[arg-type]
+    )
+    return [
+        func.count(Inventory.id).label("inventory_rows"),
+        func.sum(Inventory.quantity).label("total_inventory"),
+        func.sum(case((Inventory.quantity > Product.min_stock_level, 1), else_=0)).label("normal_stock"),  # type: ignore[arg-type]
+        func.sum(case((is_low_stock, 1), else_=0)).label("low_stock"),
+        func.sum(case((Inventory.quantity == 0, 1), else_=0)).label("out_of_stock"),  # type: ignore[arg-type]
+        func.sum(Inventory.quantity * Product.price).label("inventory_value"),
+    ]
+
+
+def _stock_counters(state: StockState) -> Dict[str, Any]:
+    """计算单条库存记录贡献的计数器（口径与 inventory_metric_columns 一致）"""
+    counters: Dict[str, Any] = {"inventory_rows": 1}
+    if state.quantity is None:
+        return counters
+
+    quantity = int(state.quantity)
+    min_level = state.min_stock_level
+    counters["total_inventory"] = quantity
+    counters["normal_stock"] = int(min_level is not None and quantity > min_level)
+    counters["low_stock"] = int(min_level is not None and 0 < quantity <= min_level)
+    counters["out_of_stock"] = int(quantity == 0)
+    counters["inventory_value"] = quantity * float(state.price) if state.price is not None else 0.0
+    return counters
+
+
+def _merge(target: Dict[str, Any], counters: Dict[str, Any], sign: int) -> None:
+    for field, value in counters.items():
+        target[field] = target.get(field, 0) + sign * value
+
+
+class CRUDDashboardSnapshot:
+    """仪表板快照 CRUD 操作类"""
+
+    def get(self, db: Session, warehouse_id: int = GLOBAL_SNAPSHOT_ID) -> Optional[DashboardSnapshot]:
+        """
+        按主键获取快照
+
+        Args:
+            db: 数据库会话
+            warehouse_id: 仓库ID，默认为全局快照
+
+        Returns:
+            Optional[DashboardSnapshot]: 快照对象或 None
+        """
+        return db.get(DashboardSnapshot, warehouse_id)
+
+    def get_order_snapshots(
+        self, db: Session, warehouse_id: int = GLOBAL_SNAPSHOT_ID
+    ) -> List[DashboardOrderSnapshot]:
+        """
+        获取订单状态快照（按主键前缀读取）
+
+        Args:
+            db: 数据库会话
+            warehouse_id: 仓库ID，默认为全局快照
+
+        Returns:
+            List[DashboardOrderSnapshot]: 订单数量大于 0 的状态快照
+        """
+        return (
+            db.query(DashboardOrderSnapshot)
+            .filter(
+                DashboardOrderSnapshot.warehouse_id == warehouse_id,
+                DashboardOrderSnapshot.order_count > 0,  # type: ignore[arg-type]
+            )
+            .order_by(DashboardOrderSnapshot.status)
+            .all()
+        )
+
+    def is_initialized(self, db: Session) -> bool:
+        """全局快照行存在即视为快照已初始化"""
+        return self.get(db) is not None
+
+    def _increment(self, db: Session, warehouse_ids: Iterable[int], deltas: Dict[str, Any]) -> None:
+        """对指定快照行的计数器做原子增减"""
+        deltas = {field: value for field, value in deltas.items() if value}
+        if not deltas:
+            return
+
+        ids = sorted(set(warehouse_ids))
+        for warehouse_id in ids:
+            if warehouse_id != GLOBAL_SNAPSHOT_ID and self.get(db, warehouse_id) is None:
+                db.add(DashboardSnapshot(warehouse_id=warehouse_id, **{f: 0 for f in SNAPSHOT_FIELDS}))
+                db.flush()
+
+        db.execute(
+            update(DashboardSnapshot)
+            .where(DashboardSnapshot.warehouse_id.in_(ids))
+            .values({field: getattr(DashboardSnapshot, field) + value for field, value in deltas.items()})
+            .execution_options(synchronize_session=False)
+        )
+
+    def _increment_order_status(
+        self, db: Session, warehouse_ids: Iterable[int], status: str, count: int, total_value: float
+    ) -> None:
+        """对指定订单状态快照行做原子增减"""
+        ids = sorted(set(warehouse_ids))
+        for warehouse_id in ids:
+            if db.get(DashboardOrderSnapshot, (warehouse_id, status)) is None:
+                db.add(DashboardOrderSnapshot(
+                    warehouse_id=warehouse_id, status=status, order_count=0, total_value=0.0
+                ))
+                db.flush()
+
+        db.execute(
+            update(DashboardOrderSnapshot)
+            .where(
+                DashboardOrderSnapshot.warehouse_id.in_(ids),
+                DashboardOrderSnapshot.status == status,
+            )
+            .values(
+                order_count=DashboardOrderSnapshot.order_count + count,
+                total_value=DashboardOrderSnapshot.total_value + total_value,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def apply_inventory_change(
+        self,
+        db: Session,
+        *,
+        before: Optional[StockState],
+        after: Optional[StockState],
+    ) -> None:
+        """
+        根据库存记录的前后状态增量更新快照
+
+        Args:
+            db: 数据库会话
+            before: 变更前状态（新建时为 None）
+            after: 变更后状态（删除时为 None）
+        """
+        if not self.is_initialized(db):
+            return
+
+        per_warehouse: Dict[int, Dict[str, Any]] = {}
+        if before is not None:
+            _merge(per_warehouse.setdefault(before.warehouse_id, {}), _stock_counters(before), -1)
+        if after is not None:
+            _merge(per_warehouse.setdefault(after.warehouse_id, {}), _stock_counters(after), 1)
+
+        global_deltas: Dict[str, Any] = {}
+        for warehouse_id, deltas in per_warehouse.items():
+            _merge(global_deltas, deltas, 1)
+            self._increment(db, [warehouse_id], deltas)
+        self._increment(db, [GLOBAL_SNAPSHOT_ID], global_deltas)
+
+    def apply_order_change(
+        self,
+        db: Session,
+        *,
+        before: Optional[OrderState],
+        after: Optional[OrderState],
+    ) -> None:
+        """
+        根据订单的前后状态增量更新快照
+
+        Args:
+            db: 数据库会话
+            before: 变更前状态（新建时为 None）
+            after: 变更后状态（删除时为 None）
+        """
+        if not self.is_initialized(db) or before == after:
+            return
+
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            scopes = [GLOBAL_SNAPSHOT_ID]
+            if state.warehouse_id is not None:
+                scopes.append(state.warehouse_id)
+
+            self._increment_order_status(
+                db, scopes, state.status, sign, sign * float(state.total_value or 0.0)
+            )
+            if state.status in PENDING_ORDER_STATUSES:
+                self._increment(db, scopes, {"pending_orders": sign})
+
+    def apply_product_change(
+        self,
+        db: Session,
+        *,
+        product: Product,
+        previous: Optional[ProductState],
+    ) -> None:
+        """
+        产品的最低库存线、价格或启用状态变化时更新快照
+
+        Args:
+            db: 数据库会话
+            product: 变更后的产品对象
+            previous: 变更前状态（新建时为 None）
+        """
+        if not self.is_initialized(db):
+            return
+
+        is_active = bool(product.is_active)
+        if previous is None:
+            if is_active:
+                self._increment(db, [GLOBAL_SNAPSHOT_ID], {"total_products": 1})
+            return
+
+        if bool(previous.is_active) != is_active:
+            self._increment(db, [GLOBAL_SNAPSHOT_ID], {"total_products": 1 if is_active else -1})
+
+        current = ProductState.of(product)
+        if (previous.min_stock_level, previous.price) == (current.min_stock_level, current.price):
+            return
+
+        rows = db.query(Inventory.warehouse_id, Inventory.quantity).filter(
+            Inventory.product_id == product.id
+        ).all()
+        for warehouse_id, quantity in rows:
+            self.apply_inventory_change(
+                db,
+                before=StockState(warehouse_id, quantity, previous.min_stock_level, previous.price),
+                after=StockState(warehouse_id, quantity, current.min_stock_level, current.price),
+            )
+
+    def apply_warehouse_change(
+        self,
+        db: Session,
+        *,
+        warehouse_id: int,
+        was_active: Optional[bool],
+        is_active: bool,
+    ) -> None:
+        """
+        仓库新建或启用状态变化时更新快照
+
+        Args:
+            db: 数据库会话
+            warehouse_id: 仓库ID
+            was_active: 变更前的启用状态（新建时为 None）
+            is_active: 变更后的启用状态
+        """
+        if not self.is_initialized(db):
+            return
+
+        delta = int(bool(is_active)) - int(bool(was_active))
+        self._increment(db, [GLOBAL_SNAPSHOT_ID], {"total_warehouses": delta})
+        if was_active is None and self.get(db, warehouse_id) is None:
+            db.add(DashboardSnapshot(warehouse_id=warehouse_id, **{f: 0 for f in SNAPSHOT_FIELDS}))
+            db.flush()
+
+    def _compute_expected(self, db: Session) -> Dict[str, Any]:
+        """从业务表全量计算快照应有的值"""
+        snapshots: Dict[int, Dict[str, Any]] = {
+            GLOBAL_SNAPSHOT_ID: {field: 0 for field in SNAPSHOT_FIELDS}
+        }
+        order_snapshots: Dict[tuple, Dict[str, Any]] = {}
+
+        for (warehouse_id,) in db.query(Warehouse.id).all():
+            snapshots[int(warehouse_id)] = {field: 0 for field in SNAPSHOT_FIELDS}
+
+        inventory_rows = db.execute(
+            select(Inventory.warehouse_id, *inventory_metric_columns())
+            .select_from(Inventory)
+            .outerjoin(Product, Inventory.product_id == Product.id)
+            .group_by(Inventory.warehouse_id)
+        ).all()
+        for row in inventory_rows:
+            counters = {
+                "inventory_rows": int(row.inventory_rows or 0),
+                "total_inventory": int(row.total_inventory or 0),
+                "normal_stock": int(row.normal_stock or 0),
+                "low_stock": int(row.low_stock or 0),
+                "out_of_stock": int(row.out_of_stock or 0),
+                "inventory_value": float(row.inventory_value or 0.0),
+            }
+            snapshot = snapshots.setdefault(int(row.warehouse_id), {field: 0 for field in SNAPSHOT_FIELDS})
+            _merge(snapshot, counters, 1)
+            _merge(snapshots[GLOBAL_SNAPSHOT_ID], counters, 1)
+
+        order_rows = (
+            db.query(
+                SalesOrder.warehouse_id,
+                SalesOrder.status,
+                func.count(SalesOrder.id).label("order_count"),
+                func.sum(SalesOrder.total_value).label("total_value"),
+            )
+            .group_by(SalesOrder.warehouse_id, SalesOrder.status)
+            .all()
+        )
+        for row in order_rows:
+            scopes = [GLOBAL_SNAPSHOT_ID]
+            if row.warehouse_id is not None:
+                scopes.append(int(row.warehouse_id))
+            for scope in scopes:
+                entry = order_snapshots.setdefault(
+                    (scope, str(row.status)), {"order_count": 0, "total_value": 0.0}
+                )
+                entry["order_count"] += int(row.order_count)
+                entry["total_value"] += float(row.total_value or 0.0)
+                if row.status in PENDING_ORDER_STATUSES:
+                    snapshot = snapshots.setdefault(scope, {field: 0 for field in SNAPSHOT_FIELDS})
+                    snapshot["pending_orders"] += int(row.order_count)
+
+        global_snapshot = snapshots[GLOBAL_SNAPSHOT_ID]
+        global_snapshot["total_products"] = (
+            db.query(func.count(Product.id)).filter(Product.is_active == True).scalar() or 0  # type: ignore[arg-type]
+        )
+        global_snapshot["total_warehouses"] = (
+            db.query(func.count(Warehouse.id)).filter(Warehouse.is_active == True).scalar() or 0  # type: ignore[arg-type]
+        )
+
+        return {"snapshots": snapshots, "order_snapshots": order_snapshots}
+
+    def rebuild(self, db: Session) -> List[Dict[str, Any]]:
+        """
+        从业务表全量重建快照，并返回重建前的偏差
+
+        Args:
+            db: 数据库会话（方法内不提交，由调用方 commit）
+
+        Returns:
+            List[Dict[str, Any]]: 偏差列表，每项包含 scope、field、snapshot、actual
+        """
+        expected = self._compute_expected(db)
+        drift: List[Dict[str, Any]] = []
+
+        current = {int(row.warehouse_id): row for row in db.query(DashboardSnapshot).all()}
+        for warehouse_id in sorted(set(current) | set(expected["snapshots"])):
+            row = current.get(warehouse_id)
+            values = expected["snapshots"].get(warehouse_id, {field: 0 for field in SNAPSHOT_FIELDS})
+            for field in SNAPSHOT_FIELDS:
+                snapshot_value = getattr(row, field) if row is not None else None
+                if not _matches(snapshot_value, values[field]):
+                    drift.append({
+                        "scope": f"warehouse:{warehouse_id}" if warehouse_id else "global",
+                        "field": field,
+                        "snapshot": snapshot_value,
+                        "actual": values[field],
+                    })
+
+        current_orders = {
+            (int(row.warehouse_id), str(row.status)): row
+            for row in db.query(DashboardOrderSnapshot).all()
+        }
+        for key in sorted(set(current_orders) | set(expected["order_snapshots"])):
+            row = current_orders.get(key)
+            values = expected["order_snapshots"].get(key, {"order_count": 0, "total_value": 0.0})
+            for field in ("order_count", "total_value"):
+                snapshot_value = getattr(row, field) if row is not None else None
+                if not _matches(snapshot_value, values[field]):
+                    drift.append({
+                        "scope": f"warehouse:{key[0]}:{key[1]}" if key[0] else f"global:{key[1]}",
+                        "field": field,
+                        "snapshot": snapshot_value,
+                        "actual": values[field],
+                    })
+
+        for warehouse_id, values in expected["snapshots"].items():
+            row = current.pop(warehouse_id, None)
+            if row is None:
+                db.add(DashboardSnapshot(warehouse_id=warehouse_id, **values))
+            else:
+                for field, value in values.items():
+                    setattr(row, field, value)
+        for row in current.values():
+            db.delete(row)
+
+        for key, values in expected["order_snapshots"].items():
+            order_row = current_orders.pop(key, None)
+            if order_row is None:
+                db.add(DashboardOrderSnapshot(warehouse_id=key[0], status=key[1], **values))
+            else:
+                for field, value in values.items():
+                    setattr(order_row, field, value)
+        for order_row in current_orders.values():
+            db.delete(order_row)
+
+        db.flush()
+        return drift
+
+
+def _matches(snapshot_value: Any, actual_value: Any) -> bool:
+    """快照值与实际值是否一致（浮点金额允许 0.01 的累计误差）"""
+    if snapshot_value is None:
+        return not actual_value
+    if isinstance(actual_value, float) or isinstance(snapshot_value, float):
+        return abs(float(snapshot_value) - float(actual_value)) < 0.01
+    return int(snapshot_value) == int(actual_value)
+
+
+# 创建仪表板快照 CRUD 实例
+dashboard_snapshot = CRUDDashboardSnapshot()
@@ -5,12 +5,17 @@
 主要功能：
 1. 库存项目的创建、获取、更新、删除
 2. 仓库的创建、获取、更新、删除
+3. 库存变化提交后向 warehouse:{id}:inventory 主题发布增量事件
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
+from app.core.topics import inventory_topic, publish_event
 from app.crud.base import CRUDBase
-from app.models.inventory import Inventory, Warehouse
+from app.crud.change_counter import TAG_INVENTORY, TAG_WAREHOUSES, change_counter
+from app.crud.dashboard_snapshot import StockState, dashboard_snapshot
+from app.models.inventory import Inventory, InventoryTransaction, Warehouse
 from app.schemas.inventory import (
     InventoryCreate,
     InventoryUpdate,
@@ -38,9 +43,183 @@ class CRUDInventory(CRUDBase[Inventory, InventoryCreate, InventoryUpdate]):
             Inventory.warehouse_id == warehouse_id
         ).first()
 
+    def _record_transaction(self, db: Session, db_obj: Inventory, delta: int, transaction_type: str) -> None:
+        """记录库存变化流水（quantity 为带符号的变化量），供库存历史查询使用"""
+        if not delta:
+            return
+        db.add(InventoryTransaction(
+            product_id=db_obj.product_id,
+            warehouse_id=db_obj.warehouse_id,
+            transaction_type=transaction_type,
+            quantity=delta,
+        ))
+
+    def _event(self, db_obj: Inventory, delta: int, quantity: Optional[int] = None) -> Tuple[str, Dict[str, Any]]:
+        """构造库存主题及增量事件数据（在提交前取值，提交后发布）"""
+        return inventory_topic(db_obj.warehouse_id), {  # type: ignore[arg-type]
+            "id": db_obj.id,
+            "product_id": db_obj.product_id,
+            "warehouse_id": db_obj.warehouse_id,
+            "quantity": db_obj.quantity if quantity is None else quantity,
+            "delta": delta,
+        }
+
+    def create(self, db: Session, *, obj_in: InventoryCreate) -> Inventory:
+        """
+        创建库存项目，并在同一事务内记录入库流水、更新仪表板快照
+
+        Args:
+            db: 数据库会话
+            obj_in: 创建库存的模式实例
+
+        Returns:
+            Inventory: 创建的库存项目
+        """
+        db_obj = Inventory(**jsonable_encoder(obj_in))
+        db.add(db_obj)
+        db.flush()
+        self._record_transaction(db, db_obj, int(db_obj.quantity or 0), "IN")  # type: ignore[arg-type]
+        dashboard_snapshot.apply_inventory_change(db, before=None, after=StockState.of(db, db_obj))
+        change_counter.bump(db, TAG_INVENTORY)
+        topic, data = self._event(db_obj, int(db_obj.quantity or 0))  # type: ignore[arg-type]
+        db.commit()
+        publish_event(topic, "inventory.created", data)
+        db.refresh(db_obj)
+        return db_obj
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Inventory,
+        obj_in: Union[InventoryUpdate, Dict[str, Any]]
+    ) -> Inventory:
+        """
+        更新库存项目，并在同一事务内记录调整流水、更新仪表板快照
+
+        Args:
+            db: 数据库会话
+            db_obj: 库存项目对象
+            obj_in: 更新数据（模式实例或字典）
+
+        Returns:
+            Inventory: 更新后的库存项目
+        """
+        before = StockState.of(db, db_obj)
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            if hasattr(db_obj, field):
+                setattr(db_obj, field, value)
+        db.add(db_obj)
+        delta = int(db_obj.quantity or 0) - int(before.quantity or 0)  # type: ignore[arg-type]
+        self._record_transaction(db, db_obj, delta, "ADJUST")
+        dashboard_snapshot.apply_inventory_change(db, before=before, after=StockState.of(db, db_obj))
+        change_counter.bump(db, TAG_INVENTORY)
+        topic, data = self._event(db_obj, delta)
+        db.commit()
+        if before.warehouse_id != data["warehouse_id"]:
+            # 库存记录换了仓库：原仓库的订阅者收到移出事件
+            publish_event(inventory_topic(before.warehouse_id), "inventory.deleted", {
+                **data, "warehouse_id": before.warehouse_id, "quantity": 0, "delta": -int(before.quantity or 0)
+            })
+        publish_event(topic, "inventory.updated", data)
+        db.refresh(db_obj)
+        return db_obj
+
+    def remove(self, db: Session, *, id: int) -> Inventory:
+        """
+        删除库存项目，并在同一事务内记录调整流水、更新仪表板快照
+
+        Args:
+            db: 数据库会话
+            id: 库存项目ID
+
+        Returns:
+            Inventory: 删除的库存项目
+        """
+        db_obj = db.get(Inventory, id)
+        if db_obj is None:
+            raise ValueError(f"Inventory with id {id} not found")
+        self._record_transaction(db, db_obj, -int(db_obj.quantity or 0), "ADJUST")  # type: ignore[arg-type]
+        dashboard_snapshot.apply_inventory_change(db, before=StockState.of(db, db_obj), after=None)
+        change_counter.bump(db, TAG_INVENTORY)
+        topic, data = self._event(db_obj, -int(db_obj.quantity or 0), quantity=0)  # type: ignore[arg-type]
+        db.delete(db_obj)
+        db.commit()
+        publish_event(topic, "inventory.deleted", data)
+        return db_obj
+
 class CRUDWarehouse(CRUDBase[Warehouse, WarehouseCreate, WarehouseUpdate]):
     """仓库 CRUD 操作类"""
-    pass
+
+    change_tags = (TAG_WAREHOUSES,)
+
+    def create(self, db: Session, *, obj_in: WarehouseCreate) -> Warehouse:
+        """
+        创建仓库，并在同一事务内更新仪表板快照
+
+        Args:
+            db: 数据库会话
+            obj_in: 创建仓库的模式实例
+
+        Returns:
+            Warehouse: 创建的仓库
+        """
+        db_obj = Warehouse(**jsonable_encoder(obj_in))
+        db.add(db_obj)
+        db.flush()
+        dashboard_snapshot.apply_warehouse_change(
+            db,
+            warehouse_id=int(db_obj.id),  # type: ignore[arg-type]
+            was_active=None,
+            is_active=bool(db_obj.is_active),
+        )
+        change_counter.bump(db, TAG_WAREHOUSES)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Warehouse,
+        obj_in: Union[WarehouseUpdate, Dict[str, Any]]
+    ) -> Warehouse:
+        """
+        更新仓库，启用状态变化时在同一事务内更新仪表板快照
+
+        Args:
+            db: 数据库会话
+            db_obj: 仓库对象
+            obj_in: 更新数据（模式实例或字典）
+
+        Returns:
+            Warehouse: 更新后的仓库
+        """
+        was_active = bool(db_obj.is_active)
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            if hasattr(db_obj, field):
+                setattr(db_obj, field, value)
+        db.add(db_obj)
+        if bool(db_obj.is_active) != was_active:
+            dashboard_snapshot.apply_warehouse_change(
+                db,
+                warehouse_id=int(db_obj.id),  # type: ignore[arg-type]
+                was_active=was_active,
+                is_active=bool(db_obj.is_active),
+            )
+        self._bump(db)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
 
 # 创建库存 CRUD 实例
 inventory = CRUDInventory(Inventory)
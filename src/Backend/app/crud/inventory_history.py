@@ -0,0 +1,159 @@
+"""
+库存历史 CRUD 操作
+
+该模块负责每日库存快照的写入，以及“某一时刻库存水平”的查询。
+主要功能：
+1. 将当前 inventories 写入当天的快照（同一天重复执行会覆盖）
+2. 以最近一次快照为基准，叠加 inventory_transactions 增量求任意时刻的库存水平
+
+交易流水中的 quantity 为带符号的变化量（入库为正、出库为负）。
+交易流水的 created_at 由数据库时钟写入，因此快照时刻与“当前时刻”也取数据库时间：
+应用主机与数据库时区不同（例如应用在 UTC+8、RDS 在 UTC）时两者仍可直接比较。
+"""
+
+from datetime import date, datetime
+from typing import Any, Optional
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+from app.models.inventory import Inventory, InventoryTransaction
+from app.models.inventory_history import InventoryDailySnapshot
+
+
+def _db_now(db: Session) -> datetime:
+    """数据库当前时间（去掉时区信息，与无时区的 taken_at 比较）"""
+    now = db.scalar(select(func.now()))
+    return now.replace(tzinfo=None) if now.tzinfo is not None else now
+
+
+class CRUDInventoryHistory:
+    """库存历史 CRUD 操作类"""
+
+    def take_snapshot(self, db: Session, *, taken_at: Optional[datetime] = None) -> int:
+        """
+        将当前库存写入快照（不提交事务）
+
+        默认的快照时刻在 INSERT ... SELECT 语句内由数据库取当前时间，与读取库存是同一条语句：
+        交易流水与快照时刻使用同一个时钟，且不会有交易在“取时间”与“读库存”之间提交，
+        被同时计入快照和其后的增量。created_at 等于快照时刻的交易视为已计入快照，
+        边界精度即数据库时间戳的精度。
+
+        Args:
+            db: 数据库会话
+            taken_at: 快照时刻，默认取数据库当前时间（指定时由调用方保证与交易流水一致，用于回填）
+
+        Returns:
+            int: 写入的快照行数
+        """
+        if taken_at is None:
+            day: Any = func.current_date()
+            taken_at_value: Any = func.now()
+        else:
+            day = literal(taken_at.date(), InventoryDailySnapshot.day.type)
+            taken_at_value = literal(taken_at, InventoryDailySnapshot.taken_at.type)
+        db.execute(delete(InventoryDailySnapshot).where(InventoryDailySnapshot.day == day))
+        result = db.execute(
+            insert(InventoryDailySnapshot).from_select(
+                ["day", "warehouse_id", "product_id", "quantity", "taken_at"],
+                select(
+                    day,
+                    Inventory.warehouse_id,
+                    Inventory.product_id,
+                    func.coalesce(Inventory.quantity, 0),
+                    taken_at_value,
+                ),
+            )
+        )
+        return int(result.rowcount or 0)
+
+    def _snapshot_total(self, db: Session, taken_at: Any, **filters: Optional[int]) -> int:
+        query = db.query(func.sum(InventoryDailySnapshot.quantity)).filter(
+            InventoryDailySnapshot.taken_at == taken_at
+        )
+        for field, value in filters.items():
+            if value is not None:
+                query = query.filter(getattr(InventoryDailySnapshot, field) == value)
+        return int(query.scalar() or 0)
+
+    def _delta(
+        self,
+        db: Session,
+        after: Any,
+        until: Any,
+        **filters: Optional[int],
+    ) -> int:
+        """时间区间 (after, until] 内的库存变化量（边界可以是时间值或快照时刻子查询）"""
+        query = db.query(func.sum(InventoryTransaction.quantity))
+        if after is not None:
+            query = query.filter(InventoryTransaction.created_at > after)  # type: ignore[arg-type]
+        if until is not None:
+            query = query.filter(InventoryTransaction.created_at <= until)  # type: ignore[arg-type]
+        for field, value in filters.items():
+            if value is not None:
+                query = query.filter(getattr(InventoryTransaction, field) == value)
+        return int(query.scalar() or 0)
+
+    def get_stock_level(
+        self,
+        db: Session,
+        at: datetime,
+        *,
+        warehouse_id: Optional[int] = None,
+        product_id: Optional[int] = None,
+    ) -> int:
+        """
+        获取某一时刻的库存水平
+
+        优先使用该时刻之前最近的一次快照加上其后的交易增量；
+        没有更早的快照时，使用之后最近的快照（或当前库存）减去其间的增量。
+
+        Args:
+            db: 数据库会话
+            at: 查询时刻
+            warehouse_id: 仓库ID，为 None 时汇总全部仓库
+            product_id: 产品ID，为 None 时汇总全部产品
+
+        Returns:
+            int: 库存数量
+        """
+        filters = {"warehouse_id": warehouse_id, "product_id": product_id}
+
+        # 快照时刻以子查询传给后续查询：数据库写入的时间值原样比较，不经 Python 往返改变精度或格式
+        previous = (
+            select(func.max(InventoryDailySnapshot.taken_at))
+            .where(InventoryDailySnapshot.taken_at <= at)  # type: ignore[arg-type]
+            .scalar_subquery()
+        )
+        if db.scalar(select(previous)) is not None:
+            return self._snapshot_total(db, previous, **filters) + self._delta(db, previous, at, **filters)
+
+        following = (
+            select(func.min(InventoryDailySnapshot.taken_at))
+            .where(InventoryDailySnapshot.taken_at > at)  # type: ignore[arg-type]
+            .scalar_subquery()
+        )
+        if db.scalar(select(following)) is not None:
+            return self._snapshot_total(db, following, **filters) - self._delta(db, at, following, **filters)
+
+        current = db.query(func.sum(Inventory.quantity))
+        for field, value in filters.items():
+            if value is not None:
+                current = current.filter(getattr(Inventory, field) == value)
+        return int(current.scalar() or 0) - self._delta(db, at, None, **filters)
+
+    def get_stock_level_on(self, db: Session, day: date, **filters: Optional[int]) -> int:
+        """
+        获取某一天结束时的库存水平（当天则为数据库当前时刻）
+
+        Args:
+            db: 数据库会话
+            day: 日期
+            filters: warehouse_id / product_id 过滤条件
+
+        Returns:
+            int: 库存数量
+        """
+        at = min(datetime.combine(day, datetime.max.time()), _db_now(db))
+        return self.get_stock_level(db, at, **filters)
+
+
+inventory_history = CRUDInventoryHistory()
@@ -46,6 +46,27 @@ class CRUDNotification(CRUDBase[Notification, NotificationCreate, NotificationUp
 
         return query.order_by(self.model.created_at.desc()).offset(skip).limit(limit).all()
 
+    def get_after(self, db: Session, *, user_id: int, after_id: int, limit: int = 100) -> List[Notification]:
+        """
+        按 ID 升序获取用户某个通知之后的未过期通知（WebSocket 重连补发使用）
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            after_id: 起始通知ID（不含）
+            limit: 返回的记录数限制
+
+        Returns:
+            List[Notification]: 通知列表
+        """
+        return db.query(self.model).filter(
+            and_(
+                self.model.user_id == user_id,
+                self.model.id > after_id,
+                self.model.expires_at > datetime.utcnow()  # 未过期
+            )
+        ).order_by(self.model.id).limit(limit).all()
+
     def get_unread_count(self, db: Session, *, user_id: int) -> int:
         """
         获取用户未读通知数量
@@ -7,17 +7,75 @@
 2. 产品分类的创建、获取、更新、删除
 """
 
+from typing import Any, Dict, Union
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
+from app.crud.change_counter import TAG_CATEGORIES, TAG_PRODUCTS, change_counter
+from app.crud.dashboard_snapshot import ProductState, dashboard_snapshot
 from app.models.product import Product, ProductCategory
 from app.schemas.product import ProductCreate, ProductUpdate, ProductCategoryCreate, ProductCategoryUpdate
 
 class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
     """产品 CRUD 操作类"""
-    pass
+
+    def create(self, db: Session, *, obj_in: ProductCreate) -> Product:
+        """
+        创建产品，并在同一事务内更新仪表板快照
+
+        Args:
+            db: 数据库会话
+            obj_in: 创建产品的模式实例
+
+        Returns:
+            Product: 创建的产品
+        """
+        db_obj = Product(**jsonable_encoder(obj_in))
+        db.add(db_obj)
+        db.flush()
+        dashboard_snapshot.apply_product_change(db, product=db_obj, previous=None)
+        change_counter.bump(db, TAG_PRODUCTS)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Product,
+        obj_in: Union[ProductUpdate, Dict[str, Any]]
+    ) -> Product:
+        """
+        更新产品，价格、最低库存线或启用状态变化时同步更新仪表板快照
+
+        Args:
+            db: 数据库会话
+            db_obj: 产品对象
+            obj_in: 更新数据（模式实例或字典）
+
+        Returns:
+            Product: 更新后的产品
+        """
+        previous = ProductState.of(db_obj)
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            if hasattr(db_obj, field):
+                setattr(db_obj, field, value)
+        db.add(db_obj)
+        dashboard_snapshot.apply_product_change(db, product=db_obj, previous=previous)
+        change_counter.bump(db, TAG_PRODUCTS)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
 
 class CRUDProductCategory(CRUDBase[ProductCategory, ProductCategoryCreate, ProductCategoryUpdate]):
     """产品分类 CRUD 操作类"""
-    pass
+
+    change_tags = (TAG_CATEGORIES,)
 
 # 创建产品 CRUD 实例
 product = CRUDProduct(Product)
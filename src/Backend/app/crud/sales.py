@@ -1,8 +1,12 @@
 """销售相关 CRUD"""
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 from sqlalchemy.orm import Session
+from app.core.topics import TOPIC_ORDER_STATUS, publish_event
 from app.crud.base import CRUDBase
+from app.crud.change_counter import TAG_ORDERS, change_counter
+from app.crud.dashboard_snapshot import OrderState, dashboard_snapshot
+from app.crud.sales_rollup import RollupState, sales_rollup
 from app.models.sales import Distributor, SalesOrder
 from app.schemas.sales import (
     DistributorCreate,
@@ -36,6 +40,58 @@ class CRUDSalesOrder(CRUDBase[SalesOrder, SalesOrderCreate, SalesOrderUpdate]):
     def get_by_code(self, db: Session, *, order_code: str) -> Optional[SalesOrder]:
         return db.query(SalesOrder).filter(SalesOrder.order_code == order_code).first()
 
+    def _status_event(self, db_obj: SalesOrder, previous_status: Optional[str]) -> Dict[str, Any]:
+        """构造 orders:status 主题的增量事件数据（在提交前取值，提交后发布）"""
+        return {
+            "id": db_obj.id,
+            "order_code": db_obj.order_code,
+            "warehouse_id": db_obj.warehouse_id,
+            "status": db_obj.status,
+            "previous_status": previous_status,
+        }
+
+    def create(self, db: Session, *, obj_in: SalesOrderCreate) -> SalesOrder:
+        """创建订单，并在同一事务内更新仪表板快照与销售日汇总；提交后发布订单状态事件"""
+        db_obj = SalesOrder(**obj_in.model_dump())
+        db.add(db_obj)
+        db.flush()
+        dashboard_snapshot.apply_order_change(db, before=None, after=OrderState.of(db_obj))
+        sales_rollup.apply_order_change(db, before=None, after=RollupState.of(db_obj))
+        change_counter.bump(db, TAG_ORDERS)
+        event = self._status_event(db_obj, None)
+        db.commit()
+        publish_event(TOPIC_ORDER_STATUS, "order.created", event)
+        db.refresh(db_obj)
+        return db_obj
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: SalesOrder,
+        obj_in: Union[SalesOrderUpdate, Dict[str, Any]]
+    ) -> SalesOrder:
+        """更新订单，状态、金额或出货仓库变化时同步更新仪表板快照与销售日汇总；状态变化时提交后发布事件"""
+        before = OrderState.of(db_obj)
+        rollup_before = RollupState.of(db_obj)
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            if hasattr(db_obj, field):
+                setattr(db_obj, field, value)
+        db.add(db_obj)
+        dashboard_snapshot.apply_order_change(db, before=before, after=OrderState.of(db_obj))
+        sales_rollup.apply_order_change(db, before=rollup_before, after=RollupState.of(db_obj))
+        change_counter.bump(db, TAG_ORDERS)
+        event = self._status_event(db_obj, before.status) if str(db_obj.status) != before.status else None
+        db.commit()
+        if event is not None:
+            publish_event(TOPIC_ORDER_STATUS, "order.status_changed", event)
+        db.refresh(db_obj)
+        return db_obj
+
 
 distributor = CRUDDistributor(Distributor)
 sales_order = CRUDSalesOrder(SalesOrder)
@@ -0,0 +1,182 @@
+"""
+销售日汇总 CRUD 操作
+
+该模块负责维护 sales_daily_rollup 汇总表。
+主要功能：
+1. 在订单创建、更新的同一事务内增量更新汇总行
+2. 从 sales_orders 全量重建汇总表（回填）
+
+apply_order_change 只执行 UPDATE/INSERT，不提交事务，由调用方统一 commit。
+汇总表为空且已有订单时视为尚未初始化，增量维护直接跳过；完整构建只在应用启动时
+（ensure_initialized）或通过 scripts/backfill_sales_rollup.py 进行，读路径从不写库。
+"""
+
+from datetime import date, datetime
+from typing import Any, NamedTuple, Optional
+from sqlalchemy import delete, func, update
+from sqlalchemy.orm import Session
+from app.models.sales import SalesOrder
+from app.models.sales_rollup import NO_WAREHOUSE_ID, SalesDailyRollup
+
+
+def _as_date(value: Any) -> date:
+    """将数据库返回的日期（SQLite 下为字符串）或 datetime 规整为 date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+class RollupState(NamedTuple):
+    """一条订单对汇总表的贡献"""
+
+    day: date
+    product_id: int
+    distributor_id: int
+    warehouse_id: int
+    status: str
+    quantity: int
+    total_value: float
+
+    @classmethod
+    def of(cls, order: SalesOrder) -> "RollupState":
+        return cls(
+            _as_date(order.order_date),
+            order.product_id,  # type: ignore[arg-type]
+            order.distributor_id,  # type: ignore[arg-type]
+            order.warehouse_id or NO_WAREHOUSE_ID,  # type: ignore[arg-type]
+            str(order.status),
+            int(order.quantity or 0),  # type: ignore[arg-type]
+            float(order.total_value or 0.0),  # type: ignore[arg-type]
+        )
+
+    @property
+    def key(self) -> tuple:
+        return (self.day, self.product_id, self.distributor_id, self.warehouse_id, self.status)
+
+
+class CRUDSalesRollup:
+    """销售日汇总 CRUD 操作类"""
+
+    def is_initialized(self, db: Session) -> bool:
+        """汇总表中存在任意一行即视为已初始化"""
+        return db.query(SalesDailyRollup.day).first() is not None
+
+    def ensure_initialized(self, db: Session) -> None:
+        """
+        汇总表尚未初始化且已有订单时，从 sales_orders 完整构建一次（应用启动时调用）
+
+        Args:
+            db: 数据库会话
+        """
+        if self.is_initialized(db) or db.query(SalesOrder.id).first() is None:
+            return
+        self.rebuild(db)
+        db.commit()
+
+    def _increment(self, db: Session, state: RollupState, sign: int) -> None:
+        """对一条汇总行做原子增减，行不存在时先创建"""
+        if db.get(SalesDailyRollup, state.key) is None:
+            day, product_id, distributor_id, warehouse_id, status = state.key
+            db.add(SalesDailyRollup(
+                day=day,
+                product_id=product_id,
+                distributor_id=distributor_id,
+                warehouse_id=warehouse_id,
+                status=status,
+                order_count=0,
+                total_quantity=0,
+                total_value=0.0,
+            ))
+            db.flush()
+
+        db.execute(
+            update(SalesDailyRollup)
+            .where(
+                SalesDailyRollup.day == state.day,
+                SalesDailyRollup.product_id == state.product_id,
+                SalesDailyRollup.distributor_id == state.distributor_id,
+                SalesDailyRollup.warehouse_id == state.warehouse_id,
+                SalesDailyRollup.status == state.status,
+            )
+            .values(
+                order_count=SalesDailyRollup.order_count + sign,
+                total_quantity=SalesDailyRollup.total_quantity + sign * state.quantity,
+                total_value=SalesDailyRollup.total_value + sign * state.total_value,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def apply_order_change(
+        self,
+        db: Session,
+        *,
+        before: Optional[RollupState],
+        after: Optional[RollupState],
+    ) -> None:
+        """
+        根据订单的前后状态增量更新汇总表
+
+        Args:
+            db: 数据库会话
+            before: 变更前状态（新建时为 None）
+            after: 变更后状态（删除时为 None）
+        """
+        if before == after:
+            return
+        if not self.is_initialized(db) and not (before is None and db.query(func.count(SalesOrder.id)).scalar() == 1):
+            # 汇总表为空但已有其它订单：尚未构建，等待启动时构建或回填；
+            # 空库中的第一笔订单则直接计入，空汇总表与之前的订单（没有订单）一致
+            return
+        if before is not None:
+            self._increment(db, before, -1)
+        if after is not None:
+            self._increment(db, after, 1)
+
+    def rebuild(self, db: Session) -> int:
+        """
+        从 sales_orders 全量重建汇总表（不提交事务）
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            int: 重建后的汇总行数
+        """
+        day = func.date(SalesOrder.order_date)
+        warehouse_id = func.coalesce(SalesOrder.warehouse_id, NO_WAREHOUSE_ID)
+        rows = (
+            db.query(
+                day.label("day"),
+                SalesOrder.product_id,
+                SalesOrder.distributor_id,
+                warehouse_id.label("warehouse_id"),
+                SalesOrder.status,
+                func.count(SalesOrder.id).label("order_count"),
+                func.sum(SalesOrder.quantity).label("total_quantity"),
+                func.sum(SalesOrder.total_value).label("total_value"),
+            )
+            .group_by(day, SalesOrder.product_id, SalesOrder.distributor_id, warehouse_id, SalesOrder.status)
+            .all()
+        )
+
+        db.execute(delete(SalesDailyRollup))
+        db.add_all([
+            SalesDailyRollup(
+                day=_as_date(row.day),
+                product_id=row.product_id,
+                distributor_id=row.distributor_id,
+                warehouse_id=row.warehouse_id,
+                status=str(row.status),
+                order_count=int(row.order_count),
+                total_quantity=int(row.total_quantity or 0),
+                total_value=float(row.total_value or 0.0),
+            )
+            for row in rows
+        ])
+        db.flush()
+        return len(rows)
+
+
+sales_rollup = CRUDSalesRollup()
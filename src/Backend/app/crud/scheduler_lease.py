@@ -0,0 +1,113 @@
+"""
+调度器租约 CRUD 操作
+
+通过单条带条件的 UPDATE 抢占或续约：只有租约无人持有、已过期或本来就属于自己时才会更新成功，
+数据库的行锁保证同一时刻最多一个持有者。
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import case, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.scheduler_lease import SchedulerLease
+
+
+class CRUDSchedulerLease:
+    """调度器租约 CRUD 操作类"""
+
+    def _ensure_row(self, db: Session, name: str) -> None:
+        """租约行不存在时创建（并发创建时忽略主键冲突）"""
+        if db.get(SchedulerLease, name) is not None:
+            return
+        db.add(SchedulerLease(name=name, holder=None, expires_at=datetime(1970, 1, 1)))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+
+    def try_acquire(
+        self,
+        db: Session,
+        name: str,
+        holder: str,
+        lease_seconds: float,
+        now: Optional[datetime] = None,
+    ) -> bool:
+        """
+        抢占或续约租约
+
+        Args:
+            db: 数据库会话
+            name: 租约名称
+            holder: 持有者标识
+            lease_seconds: 租约时长（秒）
+            now: 当前时间（UTC），默认取当前时间
+
+        Returns:
+            bool: 调用方是否持有租约
+        """
+        now = now or datetime.utcnow()
+        self._ensure_row(db, name)
+        result = db.execute(
+            update(SchedulerLease)
+            .where(
+                SchedulerLease.name == name,
+                or_(
+                    SchedulerLease.holder == holder,
+                    SchedulerLease.holder.is_(None),
+                    SchedulerLease.expires_at < now,
+                ),
+            )
+            # 续约时保留原取得时间，换主时记录新的取得时间。MySQL 按书写顺序执行 SET，
+            # 后面的赋值会看到前面已更新的列，因此 acquired_at 必须在 holder 之前赋值
+            .ordered_values(
+                (
+                    SchedulerLease.acquired_at,
+                    case((SchedulerLease.holder == holder, SchedulerLease.acquired_at), else_=now),
+                ),
+                (SchedulerLease.holder, holder),
+                (SchedulerLease.expires_at, now + timedelta(seconds=lease_seconds)),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount == 1  # type: ignore[attr-defined]
+
+    def release(self, db: Session, name: str, holder: str) -> bool:
+        """
+        主动释放租约（仅当仍由 holder 持有时）
+
+        Args:
+            db: 数据库会话
+            name: 租约名称
+            holder: 持有者标识
+
+        Returns:
+            bool: 是否释放成功
+        """
+        result = db.execute(
+            update(SchedulerLease)
+            .where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+            .values(holder=None, expires_at=datetime.utcnow(), acquired_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount == 1  # type: ignore[attr-defined]
+
+    def get(self, db: Session, name: str) -> Optional[SchedulerLease]:
+        """
+        获取租约当前状态
+
+        Args:
+            db: 数据库会话
+            name: 租约名称
+
+        Returns:
+            Optional[SchedulerLease]: 租约对象，不存在时返回 None
+        """
+        return db.get(SchedulerLease, name)
+
+
+# 创建调度器租约 CRUD 实例
+scheduler_lease = CRUDSchedulerLease()
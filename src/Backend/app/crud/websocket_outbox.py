@@ -0,0 +1,92 @@
+"""
+WebSocket 推送发件箱 CRUD 操作
+
+供数据库消息总线（app.core.message_bus.DatabaseBus）写入与按 ID 顺序读取消息。
+"""
+
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from app.models.websocket_outbox import WebSocketOutbox
+
+
+class CRUDWebSocketOutbox:
+    """WebSocket 推送发件箱 CRUD 操作类"""
+
+    def append(
+        self,
+        db: Session,
+        *,
+        user_id: Optional[int],
+        message: str,
+        topic: Optional[str] = None,
+    ) -> int:
+        """
+        写入一条待推送的消息
+
+        Args:
+            db: 数据库会话
+            user_id: 目标用户ID，None 表示广播
+            message: 已编码的消息文本
+            topic: 订阅主题，None 表示不按主题投递
+
+        Returns:
+            int: 消息 ID
+        """
+        row = WebSocketOutbox(user_id=user_id, topic=topic, message=message, created_at=datetime.utcnow())
+        db.add(row)
+        db.commit()
+        return int(row.id)  # type: ignore[arg-type]
+
+    def get_after(self, db: Session, *, after_id: int, limit: int = 500) -> List[WebSocketOutbox]:
+        """
+        按 ID 顺序获取某个 ID 之后的消息
+
+        Args:
+            db: 数据库会话
+            after_id: 起始 ID（不含）
+            limit: 最多返回的条数
+
+        Returns:
+            List[WebSocketOutbox]: 消息列表
+        """
+        return list(
+            db.scalars(
+                select(WebSocketOutbox)
+                .where(WebSocketOutbox.id > after_id)
+                .order_by(WebSocketOutbox.id)
+                .limit(limit)
+            )
+        )
+
+    def get_max_id(self, db: Session) -> int:
+        """
+        获取当前最大消息 ID（表为空时返回 0）
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            int: 最大消息 ID
+        """
+        return int(db.scalar(select(func.max(WebSocketOutbox.id))) or 0)
+
+    def purge_before(self, db: Session, cutoff: datetime) -> int:
+        """
+        删除早于指定时间的消息
+
+        Args:
+            db: 数据库会话
+            cutoff: 截止时间（UTC）
+
+        Returns:
+            int: 删除的行数
+        """
+        result = db.execute(delete(WebSocketOutbox).where(WebSocketOutbox.created_at < cutoff))
+        db.commit()
+        return result.rowcount  # type: ignore[attr-defined]
+
+
+# 创建 WebSocket 推送发件箱 CRUD 实例
+websocket_outbox = CRUDWebSocketOutbox()
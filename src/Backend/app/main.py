@@ -17,13 +17,27 @@ from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from .api.v1 import api_router
 from app.core.config import settings
-from app.core.database import Base, engine
+from app.core.database import (
+    Base,
+    ReadYourWritesMiddleware,
+    SessionLocal,
+    dispose_async_engines,
+    engine,
+    ensure_indexes,
+)
+from app.core.security import password_hasher
 # 导入模型以确保元数据注册
 from app.models import user as user_models  # noqa: F401
 from app.models import product as product_models  # noqa: F401
 from app.models import inventory as inventory_models  # noqa: F401
 from app.models import sales as sales_models  # noqa: F401
 from app.models import notification as notification_models  # noqa: F401
+from app.models import dashboard_snapshot as dashboard_snapshot_models  # noqa: F401
+from app.models import change_counter as change_counter_models  # noqa: F401
+from app.models import sales_rollup as sales_rollup_models  # noqa: F401
+from app.models import inventory_history as inventory_history_models  # noqa: F401
+from app.models import scheduler_lease as scheduler_lease_models  # noqa: F401
+from app.models import websocket_outbox as websocket_outbox_models  # noqa: F401
 import os
 
 app = FastAPI(
@@ -41,6 +55,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 配置了只读副本时，写请求后短时间内的读请求仍走主库
+app.add_middleware(ReadYourWritesMiddleware)
+
 # 包含API路由
 app.include_router(api_router, prefix="/api/v1")
 
@@ -90,6 +107,18 @@ def on_startup() -> None:
     同时启动后台任务调度器。
     """
     Base.metadata.create_all(bind=engine)
+    # create_all 不会修改已有的表：为旧库补建后续新增的索引
+    ensure_indexes(engine, "ix_sales_orders_updated_at", "ix_notifications_user_id_id")
+
+    # 预先写入变更计数器标签行；仪表板读模型只在启动时于主库上构建，读路径不写库
+    from app.crud.change_counter import change_counter
+    from app.services.dashboard_service import DashboardService
+    db = SessionLocal()
+    try:
+        change_counter.ensure_tags(db)
+        DashboardService.initialize_read_models(db)
+    finally:
+        db.close()
 
     # 启动后台任务调度器
     from app.core.scheduler import start_scheduler
@@ -100,10 +129,19 @@ def on_startup() -> None:
 def on_shutdown() -> None:
     """应用关闭时清理资源。
 
-    关闭后台任务调度器。
+    关闭后台任务调度器与密码哈希线程池。
     """
     from app.core.scheduler import shutdown_scheduler
     shutdown_scheduler()
+    password_hasher.shutdown()
+
+
+@app.on_event("shutdown")
+async def close_async_resources() -> None:
+    """应用关闭时排空并关闭 WebSocket 连接、停止消息总线，并释放异步引擎的连接池"""
+    from app.core.websocket import manager
+    await manager.stop(settings.WS_DRAIN_TIMEOUT_SECONDS)
+    await dispose_async_engines()
 
 if __name__ == "__main__":
     import uvicorn
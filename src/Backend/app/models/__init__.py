@@ -9,6 +9,12 @@ from app.models.product import Product, ProductCategory
 from app.models.inventory import Warehouse, Inventory, InventoryTransaction
 from app.models.sales import Distributor, SalesOrder
 from app.models.activity_log import ActivityLog
+from app.models.dashboard_snapshot import DashboardSnapshot, DashboardOrderSnapshot
+from app.models.change_counter import ChangeCounter
+from app.models.sales_rollup import SalesDailyRollup
+from app.models.inventory_history import InventoryDailySnapshot
+from app.models.scheduler_lease import SchedulerLease
+from app.models.websocket_outbox import WebSocketOutbox
 
 __all__ = [
     "User",
@@ -20,4 +26,11 @@ __all__ = [
     "Distributor",
     "SalesOrder",
     "ActivityLog",
+    "DashboardSnapshot",
+    "DashboardOrderSnapshot",
+    "ChangeCounter",
+    "SalesDailyRollup",
+    "InventoryDailySnapshot",
+    "SchedulerLease",
+    "WebSocketOutbox",
 ]
@@ -0,0 +1,25 @@
+"""
+变更计数器数据模型
+
+该模块定义了按数据标签（如 inventory、orders）递增的版本计数器。
+写操作在同一事务内递增对应标签的版本号，读取方通过比较版本号判断
+缓存是否仍然有效；计数器存放在数据库中，因此对所有 worker 进程可见。
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class ChangeCounter(Base):
+    """
+    变更计数器模型
+
+    标签: inventory=库存, products=产品, warehouses=仓库, orders=订单
+    """
+
+    __tablename__ = "change_counters"
+
+    tag = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
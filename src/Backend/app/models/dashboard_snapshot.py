@@ -0,0 +1,58 @@
+"""
+仪表板快照数据模型
+
+该模块定义了仪表板计数器的读模型（Read Model）。
+主要包含：
+1. DashboardSnapshot - 按仓库（及全局）汇总的库存/订单计数器
+2. DashboardOrderSnapshot - 按仓库（及全局）、订单状态汇总的订单计数器
+
+快照与库存、订单、产品的写操作在同一事务内增量维护，
+仪表板读取时只需按主键取出一行，无需对业务表做全表聚合。
+"""
+
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+# 全局快照使用的 warehouse_id（真实仓库 ID 从 1 开始）
+GLOBAL_SNAPSHOT_ID = 0
+
+
+class DashboardSnapshot(Base):
+    """
+    仪表板计数器快照
+
+    warehouse_id = 0 表示全局汇总，其余为对应仓库的汇总。
+    total_products / total_warehouses 仅在全局行中维护。
+    """
+
+    __tablename__ = "dashboard_snapshots"
+
+    warehouse_id = Column(Integer, primary_key=True, autoincrement=False)
+    inventory_rows = Column(Integer, nullable=False, default=0)  # 库存记录数（库存状态百分比的分母）
+    total_inventory = Column(Integer, nullable=False, default=0)  # 库存总量
+    normal_stock = Column(Integer, nullable=False, default=0)  # 正常库存记录数
+    low_stock = Column(Integer, nullable=False, default=0)  # 低库存记录数
+    out_of_stock = Column(Integer, nullable=False, default=0)  # 缺货记录数
+    inventory_value = Column(Float, nullable=False, default=0.0)  # 库存总价值
+    total_products = Column(Integer, nullable=False, default=0)  # 启用的产品数
+    total_warehouses = Column(Integer, nullable=False, default=0)  # 启用的仓库数
+    pending_orders = Column(Integer, nullable=False, default=0)  # 待处理订单数（pending/processing）
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class DashboardOrderSnapshot(Base):
+    """
+    订单状态计数器快照
+
+    以 (warehouse_id, status) 为主键，warehouse_id = 0 表示全局汇总。
+    未指定出货仓库的订单只计入全局行。
+    """
+
+    __tablename__ = "dashboard_order_snapshots"
+
+    warehouse_id = Column(Integer, primary_key=True, autoincrement=False)
+    status = Column(String(20), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    total_value = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
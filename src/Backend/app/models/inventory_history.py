@@ -0,0 +1,22 @@
+"""
+库存历史数据模型
+
+该模块定义了每日库存快照（日 × 仓库 × 产品）。
+快照由后台任务每天写入一次，配合 inventory_transactions 中的增量，
+即可得到任意一天的库存水平，而无需回放全部交易流水。
+"""
+
+from sqlalchemy import Column, Integer, Date, DateTime
+from app.core.database import Base
+
+
+class InventoryDailySnapshot(Base):
+    """每日库存快照"""
+
+    __tablename__ = "inventory_daily_snapshots"
+
+    day = Column(Date, primary_key=True)  # 快照日期
+    warehouse_id = Column(Integer, primary_key=True, autoincrement=False)
+    product_id = Column(Integer, primary_key=True, autoincrement=False)
+    quantity = Column(Integer, nullable=False, default=0)  # 快照时刻的库存数量
+    taken_at = Column(DateTime, nullable=False, index=True)  # 快照时刻（同一次快照的所有行相同）
@@ -6,7 +6,7 @@
 1. Notification - 通知模型，用于存储用户通知
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index, Text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -35,3 +35,8 @@ class Notification(Base):
 
     # 关系
     user = relationship("User", backref="notifications")
+
+    # 索引：WebSocket 重连补发按 (user_id, id > seq) 范围扫描
+    __table_args__ = (
+        Index('ix_notifications_user_id_id', 'user_id', 'id'),
+    )
@@ -0,0 +1,30 @@
+"""
+销售日汇总数据模型
+
+该模块定义了销售订单的日汇总表（日 × 产品 × 经销商 × 仓库 × 状态）。
+订单创建、更新时在同一事务内增量维护，也可以通过回填脚本从 sales_orders 全量重建。
+趋势、热门产品等仪表板查询读取该表，查询量与“天数 × 产品数”成正比，而与订单数无关。
+"""
+
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+# 未指定出货仓库的订单在汇总表中使用的 warehouse_id（真实仓库 ID 从 1 开始）
+NO_WAREHOUSE_ID = 0
+
+
+class SalesDailyRollup(Base):
+    """销售日汇总"""
+
+    __tablename__ = "sales_daily_rollup"
+
+    day = Column(Date, primary_key=True)  # 下单日期
+    product_id = Column(Integer, primary_key=True, autoincrement=False)
+    distributor_id = Column(Integer, primary_key=True, autoincrement=False)
+    warehouse_id = Column(Integer, primary_key=True, autoincrement=False)  # 0 表示未指定仓库
+    status = Column(String(20), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)  # 订单数
+    total_quantity = Column(Integer, nullable=False, default=0)  # 销售数量
+    total_value = Column(Float, nullable=False, default=0.0)  # 销售金额
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,21 @@
+"""
+调度器租约数据模型
+
+该模块定义了用于多 worker 选主的租约表。
+持有未过期租约的进程为主节点，只有主节点执行定时任务；
+主节点定期续约，进程退出或失联后租约过期，其它进程即可接管。
+"""
+
+from sqlalchemy import Column, String, DateTime
+from app.core.database import Base
+
+
+class SchedulerLease(Base):
+    """调度器租约"""
+
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(50), primary_key=True)  # 租约名称（如 scheduler）
+    holder = Column(String(120), nullable=True)  # 持有者标识（主机名:进程号:随机后缀），NULL 表示无人持有
+    expires_at = Column(DateTime, nullable=False)  # 租约到期时间（UTC）
+    acquired_at = Column(DateTime, nullable=True)  # 当前持有者取得租约的时间（UTC）
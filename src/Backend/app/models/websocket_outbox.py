@@ -0,0 +1,21 @@
+"""
+WebSocket 推送发件箱数据模型
+
+该模块定义了跨 worker 推送 WebSocket 消息用的发件箱表（数据库消息总线）。
+任一 worker 发布的消息写入本表，所有 worker 轮询新行并只推送给本进程持有的连接。
+"""
+
+from sqlalchemy import Column, DateTime, Integer, String, Text
+from app.core.database import Base
+
+
+class WebSocketOutbox(Base):
+    """WebSocket 推送发件箱"""
+
+    __tablename__ = "websocket_outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)  # 单调递增，各 worker 按 ID 顺序消费
+    user_id = Column(Integer, nullable=True)  # 目标用户ID，NULL 表示广播给所有连接
+    topic = Column(String(100), nullable=True)  # 订阅主题，非 NULL 时只推送给订阅了该主题的连接
+    message = Column(Text, nullable=False)  # 已编码的消息文本（JSON）
+    created_at = Column(DateTime, nullable=False, index=True)  # 写入时间（UTC），用于清理
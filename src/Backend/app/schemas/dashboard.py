@@ -109,13 +109,14 @@ class OrderStatusDistribution(BaseModel):
 class DashboardResponse(BaseModel):
     """仪表板完整响应"""
 
-    stats: DashboardStats
-    stock_status: List[StockStatus]
-    recent_activities: List[ActivityLogResponse]
-    inventory_alerts: List[InventoryAlert]
+    stats: Optional[DashboardStats] = None
+    stock_status: List[StockStatus] = []
+    recent_activities: List[ActivityLogResponse] = []
+    inventory_alerts: List[InventoryAlert] = []
     top_products: Optional[List[TopProduct]] = []
     warehouse_utilization: Optional[List[WarehouseUtilization]] = []
     order_status_distribution: Optional[List[OrderStatusDistribution]] = []
+    degraded_sections: List[str] = []  # 超时或出错而以空值返回的分区
 
     class Config:
         from_attributes = True
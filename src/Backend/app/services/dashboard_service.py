@@ -4,15 +4,43 @@ Dashboard 服务
 该模块提供仪表板数据聚合的业务逻辑。
 """
 
-from typing import List, Dict, Any
+import asyncio
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
+from typing import List, Dict, Any, Awaitable, Callable, Mapping, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case, desc
+from sqlalchemy import func, desc, select
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta
 
 from app.models.product import Product
 from app.models.inventory import Inventory, Warehouse
 from app.models.sales import SalesOrder
+from app.core.cache import SectionCache
+from app.core.config import settings
+from app.core.time_buckets import DAY, MONTH, WEEK, Bucket, date_bucket, recent_buckets
+from app.crud.change_counter import (
+    TAG_INVENTORY,
+    TAG_ORDERS,
+    TAG_PRODUCTS,
+    TAG_WAREHOUSES,
+    change_counter,
+)
 from app.models.activity_log import ActivityLog
+from app.models.dashboard_snapshot import GLOBAL_SNAPSHOT_ID
+from app.crud.inventory_history import inventory_history
+from app.crud.sales_rollup import sales_rollup
+from app.models.sales_rollup import SalesDailyRollup
+from app.crud.dashboard_snapshot import (
+    PENDING_ORDER_STATUSES,
+    dashboard_snapshot,
+    inventory_metric_columns,
+)
 from app.schemas.dashboard import (
     DashboardStats,
     StockStatus,
@@ -24,125 +52,277 @@ from app.schemas.dashboard import (
     DashboardResponse,
 )
 
+# 仪表板分区缓存（进程内），通过变更计数器跨 worker 失效
+dashboard_cache = SectionCache(
+    ttl_seconds=settings.DASHBOARD_CACHE_TTL_SECONDS,
+    stale_seconds=settings.DASHBOARD_CACHE_STALE_SECONDS,
+    max_entries=settings.DASHBOARD_CACHE_MAX_ENTRIES,
+)
+
+# 并行计算仪表板分区的线程池（有界，避免单个请求占满数据库连接池）
+section_executor = ThreadPoolExecutor(
+    max_workers=settings.DASHBOARD_SECTION_WORKERS, thread_name_prefix="dashboard-section"
+)
+
+logger = logging.getLogger(__name__)
+
+# 各分区依赖的数据标签：对应标签的写操作只会使这些分区失效
+SECTION_TAGS: Dict[str, Tuple[str, ...]] = {
+    "stats": (TAG_INVENTORY, TAG_PRODUCTS, TAG_WAREHOUSES, TAG_ORDERS),
+    "stock_status": (TAG_INVENTORY, TAG_PRODUCTS),
+    "inventory_alerts": (TAG_INVENTORY, TAG_PRODUCTS, TAG_WAREHOUSES),
+    "top_products": (TAG_ORDERS, TAG_PRODUCTS),
+    "warehouse_utilization": (TAG_WAREHOUSES,),
+    "order_status_distribution": (TAG_ORDERS,),
+}
+
 
 class DashboardService:
     """仪表板服务类"""
 
     @staticmethod
-    def get_dashboard_stats(db: Session) -> DashboardStats:
+    def _query_inventory_metrics(db: Session) -> Dict[str, Any]:
         """
-        获取仪表板统计数据
+        单次扫描 inventories ⨝ products，计算库存相关的全部计数
+
+        使用条件聚合（SUM(CASE ...)）一次性得到库存总量、正常/低库存/缺货数量
+        与库存总价值；产品数与仓库数以标量子查询并入同一条语句，整个仪表板
+        只需一次往返即可得到全部库存指标。
 
         Args:
             db: 数据库会话
 
         Returns:
-            DashboardStats: 统计数据
+            Dict[str, Any]: 库存指标字典
         """
-        # 产品总数
-        total_products = db.query(Product).filter(Product.is_active == True).count()  # type: ignore[arg-type]
-
-        # 库存总量
-        total_inventory_result = db.query(func.sum(Inventory.quantity)).scalar()
-        total_inventory = int(total_inventory_result) if total_inventory_result else 0
+        active_products = (
+            select(func.count(Product.id))
+            .where(Product.is_active == True)  # type: ignore[arg-type]
+            .scalar_subquery()
+        )
+        active_warehouses = (
+            select(func.count(Warehouse.id))
+            .where(Warehouse.is_active == True)  # type: ignore[arg-type]
+            .scalar_subquery()
+        )
 
-        # 低库存商品数（库存低于最低库存水平）
-        low_stock_items = (
-            db.query(Inventory)
-            .join(Product, Inventory.product_id == Product.id)
-            .filter(
-                Inventory.quantity <= Product.min_stock_level,  # type: ignore[arg-type]
-                Inventory.quantity > 0,  # type: ignore[arg-type]
+        row = db.execute(
+            select(
+                *inventory_metric_columns(),
+                active_products.label("total_products"),
+                active_warehouses.label("total_warehouses"),
             )
-            .count()
-        )
+            .select_from(Inventory)
+            .outerjoin(Product, Inventory.product_id == Product.id)
+        ).one()
+
+        return {
+            "inventory_rows": int(row.inventory_rows or 0),
+            "total_inventory": int(row.total_inventory or 0),
+            "normal_stock": int(row.normal_stock or 0),
+            "low_stock": int(row.low_stock or 0),
+            "out_of_stock": int(row.out_of_stock or 0),
+            "inventory_value": float(row.inventory_value or 0.0),
+            "total_products": int(row.total_products or 0),
+            "total_warehouses": int(row.total_warehouses or 0),
+        }
+
+    @staticmethod
+    def _query_order_metrics(db: Session) -> List[OrderStatusDistribution]:
+        """
+        单次扫描 sales_orders，按状态分组统计订单数量与金额
 
-        # 缺货商品数
-        out_of_stock = db.query(Inventory).filter(Inventory.quantity == 0).count()  # type: ignore[arg-type]
+        待处理订单数由 pending/processing 两个分组相加得到，无需再次扫描。
 
-        # 仓库总数
-        total_warehouses = db.query(Warehouse).filter(Warehouse.is_active == True).count()  # type: ignore[arg-type]
+        Args:
+            db: 数据库会话
 
-        # 待处理订单数
-        pending_orders = (
-            db.query(SalesOrder)
-            .filter(SalesOrder.status.in_(["pending", "processing"]))  # type: ignore[arg-type]
-            .count()
+        Returns:
+            List[OrderStatusDistribution]: 订单状态分布列表
+        """
+        order_stats = (
+            db.query(
+                SalesOrder.status,
+                func.count(SalesOrder.id).label("count"),
+                func.sum(SalesOrder.total_value).label("total_value"),
+            )
+            .group_by(SalesOrder.status)
+            .all()
         )
 
-        # 库存总价值（库存数量 × 产品价格）
-        inventory_value_result = (
-            db.query(func.sum(Inventory.quantity * Product.price))
-            .join(Product, Inventory.product_id == Product.id)
-            .scalar()
+        return [
+            OrderStatusDistribution(
+                status=str(stat.status),
+                count=int(stat.count),  # type: ignore[arg-type]
+                total_value=round(float(stat.total_value or 0.0), 2),
+            )
+            for stat in order_stats
+        ]
+
+    @staticmethod
+    def _build_stats(
+        inventory_metrics: Dict[str, Any],
+        order_distribution: List[OrderStatusDistribution],
+    ) -> DashboardStats:
+        """根据库存指标与订单分布构建统计数据"""
+        pending_orders = sum(
+            item.count for item in order_distribution if item.status in PENDING_ORDER_STATUSES
         )
-        inventory_value = float(inventory_value_result) if inventory_value_result else 0.0
 
         return DashboardStats(
-            total_products=total_products,
-            total_inventory=total_inventory,
-            low_stock_items=low_stock_items,
-            out_of_stock=out_of_stock,
-            total_warehouses=total_warehouses,
+            total_products=inventory_metrics["total_products"],
+            total_inventory=inventory_metrics["total_inventory"],
+            low_stock_items=inventory_metrics["low_stock"],
+            out_of_stock=inventory_metrics["out_of_stock"],
+            total_warehouses=inventory_metrics["total_warehouses"],
             pending_orders=pending_orders,
-            total_inventory_value=round(inventory_value, 2),
+            total_inventory_value=round(inventory_metrics["inventory_value"], 2),
         )
 
     @staticmethod
-    def get_stock_status(db: Session) -> List[StockStatus]:
+    def _build_stock_status(inventory_metrics: Dict[str, Any]) -> List[StockStatus]:
+        """根据库存指标构建库存状态分布"""
+        total = inventory_metrics["inventory_rows"]
+        if total == 0:
+            return []
+
+        buckets = [
+            ("正常", inventory_metrics["normal_stock"]),
+            ("低库存", inventory_metrics["low_stock"]),
+            ("缺货", inventory_metrics["out_of_stock"]),
+        ]
+        return [
+            StockStatus(
+                status=status,
+                count=count,
+                percentage=round((count / total) * 100, 2),
+            )
+            for status, count in buckets
+        ]
+
+    @staticmethod
+    def get_dashboard_overview(
+        db: Session,
+    ) -> Tuple[DashboardStats, List[StockStatus], List[OrderStatusDistribution]]:
         """
-        获取库存状态分布
+        获取统计数据、库存状态分布与订单状态分布
+
+        三者共享同一次库存扫描与同一次订单扫描的结果。
 
         Args:
             db: 数据库会话
 
         Returns:
-            List[StockStatus]: 库存状态列表
+            Tuple: (统计数据, 库存状态列表, 订单状态分布列表)
         """
-        total_products = db.query(Inventory).count()
-        if total_products == 0:
-            return []
+        inventory_metrics = DashboardService._query_inventory_metrics(db)
+        order_distribution = DashboardService._query_order_metrics(db)
 
-        # 正常库存
-        normal_stock = (
-            db.query(Inventory)
-            .join(Product, Inventory.product_id == Product.id)
-            .filter(Inventory.quantity > Product.min_stock_level)  # type: ignore[arg-type]
-            .count()
+        return (
+            DashboardService._build_stats(inventory_metrics, order_distribution),
+            DashboardService._build_stock_status(inventory_metrics),
+            order_distribution,
         )
 
-        # 低库存
-        low_stock = (
-            db.query(Inventory)
-            .join(Product, Inventory.product_id == Product.id)
-            .filter(
-                Inventory.quantity <= Product.min_stock_level,  # type: ignore[arg-type]
-                Inventory.quantity > 0,  # type: ignore[arg-type]
-            )
-            .count()
-        )
+    @staticmethod
+    def initialize_read_models(db: Session) -> None:
+        """
+        构建尚未初始化的仪表板快照与销售日汇总
 
-        # 缺货
-        out_of_stock = db.query(Inventory).filter(Inventory.quantity == 0).count()  # type: ignore[arg-type]
+        应用启动时在主库会话上调用；读路径从不写库。多个 worker 同时启动时，
+        主键冲突说明另一个 worker 已完成构建，回滚即可。首次构建期间其它进程提交的写入
+        可能未计入快照，由 scripts/reconcile_dashboard_snapshot.py 对账修正。
 
-        return [
-            StockStatus(
-                status="正常",
-                count=normal_stock,
-                percentage=round((normal_stock / total_products) * 100, 2),
-            ),
-            StockStatus(
-                status="低库存",
-                count=low_stock,
-                percentage=round((low_stock / total_products) * 100, 2),
-            ),
-            StockStatus(
-                status="缺货",
-                count=out_of_stock,
-                percentage=round((out_of_stock / total_products) * 100, 2),
-            ),
+        Args:
+            db: 主库会话
+        """
+        if not dashboard_snapshot.is_initialized(db):
+            try:
+                dashboard_snapshot.rebuild(db)
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                logger.info("仪表板快照已由其它进程初始化")
+        try:
+            sales_rollup.ensure_initialized(db)
+        except IntegrityError:
+            db.rollback()
+            logger.info("销售日汇总已由其它进程初始化")
+
+    @staticmethod
+    def get_snapshot_overview(
+        db: Session,
+        warehouse_id: int = GLOBAL_SNAPSHOT_ID,
+    ) -> Tuple[DashboardStats, List[StockStatus], List[OrderStatusDistribution]]:
+        """
+        从仪表板快照读取统计数据、库存状态分布与订单状态分布
+
+        快照按主键读取，不扫描业务表。快照尚未初始化（应用启动时构建）时
+        全局统计回退到业务表聚合查询，读路径不写库。
+
+        Args:
+            db: 数据库会话
+            warehouse_id: 仓库ID，默认为全局快照
+
+        Returns:
+            Tuple: (统计数据, 库存状态列表, 订单状态分布列表)
+        """
+        snapshot = dashboard_snapshot.get(db, warehouse_id)
+        if snapshot is None and warehouse_id == GLOBAL_SNAPSHOT_ID:
+            return DashboardService.get_dashboard_overview(db)
+        if snapshot is None:
+            raise ValueError(f"仓库 ID {warehouse_id} 不存在仪表板快照")
+
+        inventory_metrics = {
+            "inventory_rows": int(snapshot.inventory_rows or 0),  # type: ignore[arg-type]
+            "total_inventory": int(snapshot.total_inventory or 0),  # type: ignore[arg-type]
+            "normal_stock": int(snapshot.normal_stock or 0),  # type: ignore[arg-type]
+            "low_stock": int(snapshot.low_stock or 0),  # type: ignore[arg-type]
+            "out_of_stock": int(snapshot.out_of_stock or 0),  # type: ignore[arg-type]
+            "inventory_value": float(snapshot.inventory_value or 0.0),  # type: ignore[arg-type]
+            "total_products": int(snapshot.total_products or 0),  # type: ignore[arg-type]
+            "total_warehouses": int(snapshot.total_warehouses or 0),  # type: ignore[arg-type]
+        }
+        order_distribution = [
+            OrderStatusDistribution(
+                status=str(row.status),
+                count=int(row.order_count),  # type: ignore[arg-type]
+                total_value=round(float(row.total_value or 0.0), 2),  # type: ignore[arg-type]
+            )
+            for row in dashboard_snapshot.get_order_snapshots(db, warehouse_id)
         ]
 
+        stats = DashboardService._build_stats(inventory_metrics, order_distribution)
+        stats.pending_orders = int(snapshot.pending_orders or 0)  # type: ignore[arg-type]
+        return stats, DashboardService._build_stock_status(inventory_metrics), order_distribution
+
+    @staticmethod
+    def get_dashboard_stats(db: Session) -> DashboardStats:
+        """
+        获取仪表板统计数据
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            DashboardStats: 统计数据
+        """
+        stats, _, _ = DashboardService.get_dashboard_overview(db)
+        return stats
+
+    @staticmethod
+    def get_stock_status(db: Session) -> List[StockStatus]:
+        """
+        获取库存状态分布
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            List[StockStatus]: 库存状态列表
+        """
+        return DashboardService._build_stock_status(DashboardService._query_inventory_metrics(db))
+
     @staticmethod
     def get_recent_activities(db: Session, limit: int = 10) -> List[ActivityLogResponse]:
         """
@@ -214,6 +394,10 @@ class DashboardService:
         """
         获取热门产品（按销量）
 
+        销量读取销售日汇总（按 product_id 聚合），名称与 SKU 取自 products 表的当前值：
+        产品改名后历史订单合并到同一行并显示新名称，不再像直接聚合 sales_orders 时那样
+        按订单上记录的 product_name 拆分为多行。
+
         Args:
             db: 数据库会话
             limit: 返回记录数量限制
@@ -222,29 +406,32 @@ class DashboardService:
         Returns:
             List[TopProduct]: 热门产品列表
         """
-        start_date = datetime.now() - timedelta(days=days)
-
-        top_products = (
-            db.query(
-                SalesOrder.product_id,
-                SalesOrder.product_name,
-                Product.sku,
-                func.sum(SalesOrder.quantity).label("total_sold"),
-                func.sum(SalesOrder.total_value).label("total_revenue"),
+        start_day = (datetime.now() - timedelta(days=days)).date()
+
+        # 先在汇总表上按产品聚合并取前 N，再只为这 N 个产品关联 products 取名称与 SKU
+        ranked = (
+            select(
+                SalesDailyRollup.product_id,
+                func.sum(SalesDailyRollup.total_quantity).label("total_sold"),
+                func.sum(SalesDailyRollup.total_value).label("total_revenue"),
             )
-            .join(Product, SalesOrder.product_id == Product.id)
-            .filter(SalesOrder.order_date >= start_date)  # type: ignore[arg-type]
-            .filter(SalesOrder.status != "cancelled")  # type: ignore[arg-type]
-            .group_by(SalesOrder.product_id, SalesOrder.product_name, Product.sku)
+            .where(SalesDailyRollup.day >= start_day)  # type: ignore[arg-type]
+            .where(SalesDailyRollup.status != "cancelled")  # type: ignore[arg-type]
+            .group_by(SalesDailyRollup.product_id)
             .order_by(desc("total_sold"))
             .limit(limit)
-            .all()
+            .subquery()
         )
+        top_products = db.execute(
+            select(ranked, Product.name, Product.sku)
+            .join(Product, ranked.c.product_id == Product.id)
+            .order_by(ranked.c.total_sold.desc())
+        ).all()
 
         return [
             TopProduct(
                 product_id=p.product_id,
-                product_name=p.product_name,
+                product_name=p.name,
                 sku=p.sku,
                 total_sold=p.total_sold,
                 total_revenue=round(p.total_revenue, 2),
@@ -294,92 +481,75 @@ class DashboardService:
         """
         获取订单状态分布
 
+        与完整仪表板使用同一来源（仪表板快照，见 get_snapshot_overview），两处数字始终一致。
+
         Args:
             db: 数据库会话
 
         Returns:
             List[OrderStatusDistribution]: 订单状态分布列表
         """
-        order_stats = (
-            db.query(
-                SalesOrder.status,
-                func.count(SalesOrder.id).label("count"),
-                func.sum(SalesOrder.total_value).label("total_value"),
-            )
-            .group_by(SalesOrder.status)
-            .all()
-        )
+        return DashboardService.get_snapshot_overview(db)[2]
 
-        return [
-            OrderStatusDistribution(
-                status=str(stat.status),
-                count=int(stat.count),  # type: ignore[arg-type]
-                total_value=round(float(stat.total_value or 0.0), 2),
-            )
-            for stat in order_stats
-        ]
+    @staticmethod
+    def _trend_buckets(period: str) -> Tuple[str, List[Bucket], List[str]]:
+        """
+        根据周期生成时间粒度、时间桶与图表标签
+
+        daily 为最近 7 天，weekly 为最近 4 个 ISO 周，monthly 为最近 6 个自然月。
+
+        Args:
+            period: 时间周期 (daily, weekly, monthly)
+
+        Returns:
+            Tuple: (时间粒度, 时间桶列表, 标签列表)
+        """
+        today = datetime.now().date()
+        if period == "daily":
+            buckets = recent_buckets(DAY, 7, today)
+            return DAY, buckets, [bucket.first_day.strftime("%m-%d") for bucket in buckets]
+        if period == "monthly":
+            buckets = recent_buckets(MONTH, 6, today)
+            return MONTH, buckets, [bucket.key for bucket in buckets]
+        buckets = recent_buckets(WEEK, 4, today)
+        return WEEK, buckets, [f"第{i+1}周" for i in range(len(buckets))]
 
     @staticmethod
     def get_inventory_sales_trend(db: Session, period: str = "weekly", days: int = 30) -> Dict[str, Any]:
         """
         获取库存和销售趋势数据
 
+        销售额在数据库中按时间桶分组（见 app.core.time_buckets），
+        只扫描统计区间内的销售日汇总。
+
         Args:
             db: 数据库会话
             period: 时间周期 (daily, weekly, monthly)
-            days: 统计天数
+            days: 统计天数（不早于第一个时间桶的起始日）
 
         Returns:
             Dict: 包含 labels, inventory_levels, sales_data 的字典
         """
-        from datetime import datetime, timedelta
-
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
+        granularity, buckets, labels = DashboardService._trend_buckets(period)
+        since = max((datetime.now() - timedelta(days=days)).date(), buckets[0].first_day)
 
-        # 根据周期设置分组
-        if period == "daily":
-            # 按天统计最近7天
-            labels = [(end_date - timedelta(days=i)).strftime("%m-%d") for i in range(6, -1, -1)]
-            date_format = "%Y-%m-%d"
-        elif period == "monthly":
-            # 按月统计最近6个月
-            labels = [(end_date - timedelta(days=30*i)).strftime("%Y-%m") for i in range(5, -1, -1)]
-            date_format = "%Y-%m"
-        else:  # weekly
-            # 按周统计最近4周
-            labels = [f"第{i+1}周" for i in range(4)]
-            date_format = None  # 周统计需要特殊处理
-
-        # 获取销售数据
+        # 获取销售数据（读取销售日汇总，每天至多“产品 × 经销商 × 仓库”行）
+        period_key = date_bucket(SalesDailyRollup.day, granularity).label("period")
         sales_query = (
             db.query(
-                func.date_format(SalesOrder.order_date, '%Y-%m-%d' if period == 'daily' else '%Y-%m').label("period"),
-                func.sum(SalesOrder.total_value).label("total_sales")
+                period_key,
+                func.sum(SalesDailyRollup.total_value).label("total_sales"),
             )
-            .filter(SalesOrder.order_date >= start_date)  # type: ignore[arg-type]
-            .filter(SalesOrder.status != "cancelled")  # type: ignore[arg-type]
-            .group_by("period")
+            .filter(SalesDailyRollup.day >= since)  # type: ignore[arg-type]
+            .filter(SalesDailyRollup.status != "cancelled")  # type: ignore[arg-type]
+            .group_by(period_key)
             .all()
         )
-
-        # 获取当前库存总量（简化处理，实际应该是历史快照）
-        total_inventory = db.query(func.sum(Inventory.quantity)).scalar() or 0
-
-        # 构建返回数据
-        sales_data = [0.0] * len(labels)
         sales_dict = {row.period: float(row.total_sales or 0) for row in sales_query}
+        sales_data = [sales_dict.get(bucket.key, 0.0) for bucket in buckets]
 
-        # 填充销售数据
-        for i, label in enumerate(labels):
-            if period == "daily":
-                date_key = (end_date - timedelta(days=6-i)).strftime("%Y-%m-%d")
-            else:
-                date_key = label
-            sales_data[i] = sales_dict.get(date_key, 0.0)
-
-        # 库存水平（简化：使用当前总库存，实际应该查历史记录）
-        inventory_levels = [int(total_inventory)] * len(labels)
+        # 库存水平：每个时间桶末尾的库存（最近快照 + 交易增量）
+        inventory_levels = [inventory_history.get_stock_level_on(db, bucket.last_day) for bucket in buckets]
 
         return {
             "labels": labels,
@@ -395,44 +565,30 @@ class DashboardService:
         Args:
             db: 数据库会话
             period: 时间周期
-            days: 统计天数
+            days: 统计天数（不早于第一个时间桶的起始日）
 
         Returns:
             Dict: 包含 labels 和 movement_data 的字典
         """
         from app.models.inventory import InventoryTransaction
-        from datetime import datetime, timedelta
-
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
 
-        if period == "daily":
-            labels = [(end_date - timedelta(days=i)).strftime("%m-%d") for i in range(6, -1, -1)]
-        elif period == "monthly":
-            labels = [(end_date - timedelta(days=30*i)).strftime("%Y-%m") for i in range(5, -1, -1)]
-        else:  # weekly
-            labels = [f"第{i+1}周" for i in range(4)]
+        granularity, buckets, labels = DashboardService._trend_buckets(period)
+        since = max((datetime.now() - timedelta(days=days)).date(), buckets[0].first_day)
 
         # 获取交易统计
+        period_key = date_bucket(InventoryTransaction.created_at, granularity).label("period")
         movements = (
             db.query(
-                func.date_format(InventoryTransaction.created_at, '%Y-%m-%d' if period == 'daily' else '%Y-%m').label("period"),
+                period_key,
                 func.sum(func.abs(InventoryTransaction.quantity)).label("total_movement")
             )
-            .filter(InventoryTransaction.created_at >= start_date)  # type: ignore[arg-type]
-            .group_by("period")
+            .filter(InventoryTransaction.created_at >= datetime.combine(since, datetime.min.time()))  # type: ignore[arg-type]
+            .group_by(period_key)
             .all()
         )
 
         movement_dict = {row.period: int(row.total_movement or 0) for row in movements}
-        movement_data = [0] * len(labels)
-
-        for i, label in enumerate(labels):
-            if period == "daily":
-                date_key = (end_date - timedelta(days=6-i)).strftime("%Y-%m-%d")
-            else:
-                date_key = label
-            movement_data[i] = movement_dict.get(date_key, 0)
+        movement_data = [movement_dict.get(bucket.key, 0) for bucket in buckets]
 
         return {
             "labels": labels,
@@ -478,22 +634,268 @@ class DashboardService:
         }
 
     @staticmethod
-    def get_full_dashboard(db: Session) -> DashboardResponse:
+    def _section_loaders() -> Dict[str, Callable[..., Any]]:
+        """分区名称到计算函数的映射"""
+        return {
+            "stats": lambda db: DashboardService.get_snapshot_overview(db)[0],
+            "stock_status": lambda db: DashboardService.get_snapshot_overview(db)[1],
+            "inventory_alerts": DashboardService.get_inventory_alerts,
+            "top_products": DashboardService.get_top_products,
+            "warehouse_utilization": DashboardService.get_warehouse_utilization,
+            "order_status_distribution": DashboardService.get_order_status_distribution,
+        }
+
+    @staticmethod
+    def get_cached_section(
+        db: Session,
+        section: str,
+        *args: Any,
+        versions: Optional[Mapping[str, int]] = None,
+        allow_stale: bool = True,
+    ) -> Any:
+        """
+        通过分区缓存获取仪表板分区数据
+
+        并发的未命中请求只会计算一次；条目 TTL 到期但仍在宽限期内时直接返回旧值（被写操作失效的条目总是同步重新计算），
+        后台刷新使用独立的数据库会话（请求结束后 db 会被关闭）。
+
+        Args:
+            db: 数据库会话
+            section: 分区名称，见 SECTION_TAGS
+            args: 传给分区计算函数的参数（同时作为缓存键）
+            versions: 变更计数器版本号；为 None 时从数据库读取
+            allow_stale: 是否允许返回失效的旧值；为 False 时失效条目会同步重新计算
+
+        Returns:
+            分区数据
+        """
+        if versions is None:
+            versions = change_counter.get_versions(db)
+        loader = DashboardService._section_loaders()[section]
+        return dashboard_cache.get_or_compute(
+            section,
+            args,
+            SECTION_TAGS[section],
+            versions,
+            lambda: loader(db, *args),
+            DashboardService._background_refresh(db.get_bind(), loader, args) if allow_stale else None,
+        )
+
+    @staticmethod
+    def _background_refresh(bind: Any, loader: Callable[..., Any], args: Tuple[Any, ...]) -> Callable[[], Any]:
+        """后台刷新函数：在刷新线程中用独立的同步会话重新计算分区"""
+
+        def refresh() -> Any:
+            refresh_db = Session(bind=bind)
+            try:
+                return loader(refresh_db, *args)
+            finally:
+                refresh_db.close()
+
+        return refresh
+
+    @staticmethod
+    async def get_cached_section_async(
+        db: AsyncSession,
+        section: str,
+        *args: Any,
+        versions: Optional[Mapping[str, int]] = None,
+        allow_stale: bool = True,
+    ) -> Any:
+        """
+        get_cached_section 的异步版本
+
+        分区计算通过 AsyncSession.run_sync 在异步连接上执行，不占用线程池线程；
+        后台刷新使用与 db 指向同一数据库的同步引擎（db.info["sync_bind"]）。
+
+        Args:
+            db: 异步数据库会话（由 get_async_db / get_async_read_db 创建）
+            section: 分区名称，见 SECTION_TAGS
+            args: 传给分区计算函数的参数（同时作为缓存键）
+            versions: 变更计数器版本号；为 None 时从数据库读取
+            allow_stale: 是否允许返回失效的旧值
+
+        Returns:
+            分区数据
+        """
+        if versions is None:
+            versions = await db.run_sync(change_counter.get_versions)
+        loader = DashboardService._section_loaders()[section]
+        return await dashboard_cache.get_or_compute_async(
+            section,
+            args,
+            SECTION_TAGS[section],
+            versions,
+            lambda: db.run_sync(loader, *args),
+            DashboardService._background_refresh(db.info["sync_bind"], loader, args) if allow_stale else None,
+        )
+
+    @staticmethod
+    def get_dashboard_sections(
+        versions: Mapping[str, int],
+        allow_stale: bool = True,
+    ) -> Dict[str, Callable[[Session], Any]]:
+        """
+        完整仪表板各分区的计算函数（分区名与 DashboardResponse 字段一致）
+
+        Args:
+            versions: 变更计数器版本号
+            allow_stale: 是否允许返回失效的旧值
+
+        Returns:
+            Dict[str, Callable]: 分区名称到“接收数据库会话、返回分区数据”的函数
+        """
+        def cached(section: str, *args: Any) -> Callable[[Session], Any]:
+            return lambda db: DashboardService.get_cached_section(
+                db, section, *args, versions=versions, allow_stale=allow_stale
+            )
+
+        return {
+            "stats": cached("stats"),
+            "stock_status": cached("stock_status"),
+            "recent_activities": DashboardService.get_recent_activities,
+            "inventory_alerts": cached("inventory_alerts", 20),
+            "top_products": cached("top_products", 5, 30),
+            "warehouse_utilization": cached("warehouse_utilization"),
+            "order_status_distribution": cached("order_status_distribution"),
+        }
+
+    @staticmethod
+    def get_dashboard_sections_async(
+        versions: Mapping[str, int],
+        allow_stale: bool = True,
+    ) -> Dict[str, Callable[[AsyncSession], Awaitable[Any]]]:
+        """
+        get_dashboard_sections 的异步版本
+
+        Args:
+            versions: 变更计数器版本号
+            allow_stale: 是否允许返回失效的旧值
+
+        Returns:
+            Dict[str, Callable]: 分区名称到“接收异步会话、返回分区数据的协程”的函数
+        """
+        def cached(section: str, *args: Any) -> Callable[[AsyncSession], Awaitable[Any]]:
+            return lambda db: DashboardService.get_cached_section_async(
+                db, section, *args, versions=versions, allow_stale=allow_stale
+            )
+
+        return {
+            "stats": cached("stats"),
+            "stock_status": cached("stock_status"),
+            "recent_activities": lambda db: db.run_sync(DashboardService.get_recent_activities),
+            "inventory_alerts": cached("inventory_alerts", 20),
+            "top_products": cached("top_products", 5, 30),
+            "warehouse_utilization": cached("warehouse_utilization"),
+            "order_status_distribution": cached("order_status_distribution"),
+        }
+
+    @staticmethod
+    def get_full_dashboard(
+        db: Session,
+        parallel: Optional[bool] = None,
+        session_factory: Optional[Callable[[], Session]] = None,
+    ) -> DashboardResponse:
         """
         获取完整的仪表板数据
 
+        统计数据、库存状态与订单状态分布读取自仪表板快照；
+        除最近活动外，各分区均经过分区缓存。
+
         Args:
             db: 数据库会话
+            parallel: 是否并行计算各分区，为 None 时使用 DASHBOARD_PARALLEL_SECTIONS
+            session_factory: 并行模式下为每个分区创建会话的工厂，默认绑定到 db 所用的引擎（主库或副本）
 
         Returns:
             DashboardResponse: 完整仪表板数据
         """
-        return DashboardResponse(
-            stats=DashboardService.get_dashboard_stats(db),
-            stock_status=DashboardService.get_stock_status(db),
-            recent_activities=DashboardService.get_recent_activities(db),
-            inventory_alerts=DashboardService.get_inventory_alerts(db),
-            top_products=DashboardService.get_top_products(db),
-            warehouse_utilization=DashboardService.get_warehouse_utilization(db),
-            order_status_distribution=DashboardService.get_order_status_distribution(db),
-        )
+        versions = change_counter.get_versions(db)
+        sections = DashboardService.get_dashboard_sections(versions)
+
+        if parallel is None:
+            parallel = settings.DASHBOARD_PARALLEL_SECTIONS
+        if not parallel:
+            return DashboardResponse(**{name: compute(db) for name, compute in sections.items()})
+
+        if session_factory is None:
+            session_factory = partial(Session, bind=db.get_bind())
+
+        def run(compute: Callable[[Session], Any]) -> Any:
+            section_db = session_factory()
+            try:
+                return compute(section_db)
+            finally:
+                section_db.close()
+
+        futures = {
+            name: section_executor.submit(contextvars.copy_context().run, run, compute)
+            for name, compute in sections.items()
+        }
+        deadline = time.monotonic() + settings.DASHBOARD_SECTION_TIMEOUT_SECONDS
+        results: Dict[str, Any] = {}
+        degraded: List[str] = []
+        for name, future in futures.items():
+            try:
+                results[name] = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeoutError:
+                future.cancel()
+                degraded.append(name)
+                logger.warning(f"仪表板分区 {name} 超时，返回部分数据")
+            except Exception as e:
+                degraded.append(name)
+                logger.error(f"仪表板分区 {name} 计算失败: {e}")
+
+        return DashboardResponse(**results, degraded_sections=degraded)
+
+    @staticmethod
+    async def get_full_dashboard_async(
+        db: AsyncSession,
+        parallel: Optional[bool] = None,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+    ) -> DashboardResponse:
+        """
+        get_full_dashboard 的异步版本
+
+        并行模式下各分区作为独立任务在各自的异步会话上执行，并发度受连接池限制，
+        不再需要分区线程池；超时与失败的分区同样列在 degraded_sections 中。
+
+        Args:
+            db: 异步数据库会话
+            parallel: 是否并行计算各分区，为 None 时使用 DASHBOARD_PARALLEL_SECTIONS
+            session_factory: 并行模式下为每个分区创建异步会话的工厂，默认与 db 使用同一引擎
+
+        Returns:
+            DashboardResponse: 完整仪表板数据
+        """
+        versions = await db.run_sync(change_counter.get_versions)
+        sections = DashboardService.get_dashboard_sections_async(versions)
+
+        if parallel is None:
+            parallel = settings.DASHBOARD_PARALLEL_SECTIONS
+        if not parallel:
+            return DashboardResponse(**{name: await load(db) for name, load in sections.items()})
+
+        if session_factory is None:
+            session_factory = partial(AsyncSession, bind=db.bind, info=db.info)
+
+        async def run(load: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+            async with session_factory() as section_db:
+                return await load(section_db)
+
+        tasks = {name: asyncio.ensure_future(run(load)) for name, load in sections.items()}
+        _, pending = await asyncio.wait(tasks.values(), timeout=settings.DASHBOARD_SECTION_TIMEOUT_SECONDS)
+        results: Dict[str, Any] = {}
+        degraded: List[str] = []
+        for name, task in tasks.items():
+            if task in pending:
+                task.cancel()
+                degraded.append(name)
+                logger.warning(f"仪表板分区 {name} 超时，返回部分数据")
+            elif task.exception() is not None:
+                degraded.append(name)
+                logger.error(f"仪表板分区 {name} 计算失败: {task.exception()}")
+            else:
+                results[name] = task.result()
+
+        return DashboardResponse(**results, degraded_sections=degraded)
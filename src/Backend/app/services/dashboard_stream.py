@@ -0,0 +1,205 @@
+"""
+仪表板实时推送服务
+
+该模块为 GET /api/v1/dashboard/stream 提供 Server-Sent Events 事件流。
+主要功能：
+1. 连接建立后先推送一次完整的仪表板数据（event: dashboard）
+2. 之后只推送发生变化的分区（event: delta）
+3. 每个进程只有一个后台任务轮询变更计数器，所有订阅者共享轮询结果
+4. 推送去抖：同一订阅者每个去抖窗口内最多收到一次增量，连续写入合并为一次
+
+变化检测基于变更计数器（见 app.crud.change_counter）：只重新计算依赖标签发生变化的分区，
+并与上一次推送的内容比较，内容未变的分区不会推送。
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import ReadSessionLocal
+from app.crud.change_counter import change_counter
+from app.services.dashboard_service import SECTION_TAGS, DashboardService
+
+
+def format_event(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    """
+    按 SSE 协议格式化一条事件
+
+    Args:
+        event: 事件类型
+        data: 事件数据（会被编码为 JSON）
+        event_id: 事件序号
+
+    Returns:
+        str: SSE 文本
+    """
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(jsonable_encoder(data), ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class ChangeWatcher:
+    """
+    变更计数器观察者
+
+    有订阅者时在后台轮询变更计数器，版本变化时唤醒所有等待者；
+    最后一个订阅者离开后轮询任务自动结束。
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = ReadSessionLocal,
+        poll_seconds: float = 1.0,
+    ):
+        """
+        初始化观察者
+
+        Args:
+            session_factory: 读取变更计数器时使用的会话工厂
+            poll_seconds: 轮询间隔（秒）
+        """
+        self.session_factory = session_factory
+        self.poll_seconds = poll_seconds
+        self.versions: Dict[str, int] = {}
+        self._subscribers = 0
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._condition: Optional[asyncio.Condition] = None
+
+    def _read_versions(self) -> Dict[str, int]:
+        db = self.session_factory()
+        try:
+            return change_counter.get_versions(db)
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        condition = self._condition
+        assert condition is not None
+        try:
+            while self._subscribers > 0:
+                versions = await run_in_threadpool(self._read_versions)
+                if versions != self.versions:
+                    async with condition:
+                        self.versions = versions
+                        condition.notify_all()
+                await asyncio.sleep(self.poll_seconds)
+        finally:
+            self._task = None
+
+    async def wait_for_change(self, known: Dict[str, int], timeout: float) -> Dict[str, int]:
+        """
+        等待任一变更计数器超过 known 中的版本
+
+        计数器只增不减，因此只比较“是否更新”，观察者自身落后于调用方时不会误唤醒。
+
+        Args:
+            known: 调用方已知的版本号
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            Dict[str, int]: 最新版本号；超时未变化时返回 known
+        """
+        if self._task is None:
+            self._condition = asyncio.Condition()
+            self._task = asyncio.create_task(self._run())
+        condition = self._condition
+        assert condition is not None
+
+        self._subscribers += 1
+        try:
+            async with condition:
+                await asyncio.wait_for(
+                    condition.wait_for(
+                        lambda: any(version > known.get(tag, 0) for tag, version in self.versions.items())
+                    ),
+                    timeout,
+                )
+                return dict(self.versions)
+        except asyncio.TimeoutError:
+            return known
+        finally:
+            self._subscribers -= 1
+
+
+change_watcher = ChangeWatcher(poll_seconds=settings.DASHBOARD_STREAM_POLL_SECONDS)
+
+
+def _load_full(session_factory: Callable[[], Session]) -> Tuple[Dict[str, int], Dict[str, Any]]:
+    """读取当前版本号与完整仪表板数据"""
+    db = session_factory()
+    try:
+        versions = change_counter.get_versions(db)
+        sections = DashboardService.get_dashboard_sections(versions, allow_stale=False)
+        return versions, {name: jsonable_encoder(compute(db)) for name, compute in sections.items()}
+    finally:
+        db.close()
+
+
+def _load_changed(
+    session_factory: Callable[[], Session],
+    known: Dict[str, int],
+) -> Tuple[Dict[str, int], Dict[str, Any]]:
+    """读取当前版本号，并只重新计算依赖标签相对 known 发生变化的分区"""
+    db = session_factory()
+    try:
+        versions = change_counter.get_versions(db)
+        changed_tags = {tag for tag in set(versions) | set(known) if versions.get(tag) != known.get(tag)}
+        if not changed_tags:
+            return versions, {}
+        sections = DashboardService.get_dashboard_sections(versions, allow_stale=False)
+        names = [name for name, tags in SECTION_TAGS.items() if changed_tags & set(tags)]
+        names.append("recent_activities")  # 写操作通常伴随活动记录
+        return versions, {name: jsonable_encoder(sections[name](db)) for name in names}
+    finally:
+        db.close()
+
+
+async def dashboard_event_stream(
+    is_disconnected: Callable[[], Awaitable[bool]],
+    watcher: ChangeWatcher = change_watcher,
+    session_factory: Callable[[], Session] = ReadSessionLocal,
+) -> AsyncIterator[str]:
+    """
+    仪表板 SSE 事件流
+
+    Args:
+        is_disconnected: 检查客户端是否已断开的协程函数
+        watcher: 变更计数器观察者
+        session_factory: 计算分区时使用的会话工厂
+
+    Yields:
+        str: SSE 文本（完整数据、增量或保活注释）
+    """
+    versions, sent = await run_in_threadpool(_load_full, session_factory)
+    event_id = 1
+    yield format_event("dashboard", sent, event_id)
+
+    last_push = float("-inf")
+    while not await is_disconnected():
+        latest = await watcher.wait_for_change(versions, settings.DASHBOARD_STREAM_KEEPALIVE_SECONDS)
+        if latest == versions:
+            yield ": keepalive\n\n"
+            continue
+
+        # 去抖：距上次推送不足一个窗口时先等待，窗口内的后续写入会在下面一并读取
+        wait = last_push + settings.DASHBOARD_STREAM_DEBOUNCE_SECONDS - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        versions, values = await run_in_threadpool(_load_changed, session_factory, versions)
+        delta = {name: value for name, value in values.items() if sent.get(name) != value}
+        if not delta:
+            continue
+        sent.update(delta)
+        event_id += 1
+        last_push = time.monotonic()
+        yield format_event("delta", delta, event_id)
+
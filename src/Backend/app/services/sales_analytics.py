@@ -0,0 +1,419 @@
+"""
+销售分析列式缓存
+
+该模块把 sales_orders 加载为进程内的 NumPy 列式数组，用于即席多维分析。
+主要功能：
+1. 数值列（数量、金额、日期、月份、产品、仓库）存为定长数组
+2. 状态与经销商列做字典编码，地区通过经销商字典间接得到
+3. 按 id / updated_at 水位线增量刷新：新订单追加，已变更订单原地覆盖
+4. 在数组上完成过滤、分组聚合与 Top-K，不访问数据库
+5. 刷新构建新的列数组与字典后整体替换，读取不加锁、不等待刷新；并发的过期刷新只执行一次
+
+NumPy 为可选依赖，未安装时 is_available() 返回 False，调用方应降级处理。
+订单删除不会被增量刷新感知，需要时调用 refresh(db, full=True) 全量重载。
+"""
+
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models.sales import Distributor, SalesOrder
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - 取决于部署环境
+    np = None  # type: ignore[assignment]
+
+# 支持的分组维度与度量
+DIMENSIONS = ("region", "distributor", "product", "warehouse", "status", "month")
+METRICS = ("revenue", "quantity", "orders")
+
+_EPOCH = date(1970, 1, 1)
+_LOAD_BATCH_SIZE = 50_000
+# 水位线回看窗口：updated_at 通常只有秒级精度，回看一秒以免漏掉与水位线同一秒内的更新
+_WATERMARK_OVERLAP = timedelta(seconds=1)
+
+
+def _to_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def _to_datetime(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def is_available() -> bool:
+    """NumPy 是否可用"""
+    return np is not None
+
+
+class _StoreState:
+    """一次刷新得到的缓存内容（列数组、字典与水位线），发布后不再修改"""
+
+    def __init__(self) -> None:
+        self.columns: Dict[str, Any] = {}
+        self.statuses: List[str] = []  # 状态字典：code -> status
+        self.status_codes: Dict[str, int] = {}
+        self.distributor_ids: List[int] = []  # 经销商字典：code -> distributor_id
+        self.distributor_codes: Dict[int, int] = {}
+        self.distributor_names: List[str] = []
+        self.distributor_regions: Any = None  # code -> region code
+        self.regions: List[str] = []
+        self.product_names: Dict[int, str] = {}
+        self.max_id = 0
+        self.max_updated_at: Optional[datetime] = None
+        self.refreshed_at: Optional[float] = None
+
+    def copy(self) -> "_StoreState":
+        """复制字典与列表供下一次刷新修改；列数组只会被整体替换，直接共享"""
+        state = _StoreState()
+        state.columns = dict(self.columns)
+        state.statuses = list(self.statuses)
+        state.status_codes = dict(self.status_codes)
+        state.distributor_ids = list(self.distributor_ids)
+        state.distributor_codes = dict(self.distributor_codes)
+        state.distributor_names = list(self.distributor_names)
+        state.distributor_regions = self.distributor_regions
+        state.regions = list(self.regions)
+        state.product_names = dict(self.product_names)
+        state.max_id = self.max_id
+        state.max_updated_at = self.max_updated_at
+        state.refreshed_at = self.refreshed_at
+        return state
+
+    def encode_status(self, status: str) -> int:
+        code = self.status_codes.get(status)
+        if code is None:
+            code = len(self.statuses)
+            self.statuses.append(status)
+            self.status_codes[status] = code
+        return code
+
+    def load_distributors(self, db: Session) -> None:
+        """重载经销商字典（经销商表很小，每次刷新都全量读取以获取地区变化）"""
+        regions: Dict[str, int] = {region: code for code, region in enumerate(self.regions)}
+        region_codes = list(self.distributor_regions) if self.distributor_regions is not None else []
+        for distributor_id, name, region in db.query(Distributor.id, Distributor.name, Distributor.region):
+            region_code = regions.setdefault(str(region), len(regions))
+            code = self.distributor_codes.get(distributor_id)
+            if code is None:
+                code = len(self.distributor_ids)
+                self.distributor_ids.append(distributor_id)
+                self.distributor_codes[distributor_id] = code
+                self.distributor_names.append(str(name))
+                region_codes.append(region_code)
+            else:
+                self.distributor_names[code] = str(name)
+                region_codes[code] = region_code
+        self.regions = sorted(regions, key=regions.__getitem__)
+        self.distributor_regions = np.array(region_codes, dtype=np.int32)
+
+    def distributor_code(self, distributor_id: int) -> int:
+        code = self.distributor_codes.get(distributor_id)
+        if code is None:
+            # 经销商在本次读取字典之后才创建：先记入字典，地区待下次刷新补全
+            code = len(self.distributor_ids)
+            self.distributor_ids.append(distributor_id)
+            self.distributor_codes[distributor_id] = code
+            self.distributor_names.append(str(distributor_id))
+            self.distributor_regions = np.append(self.distributor_regions, 0).astype(np.int32)
+        return code
+
+
+class SalesColumnStore:
+    """
+    sales_orders 的列式缓存
+
+    刷新在独立的刷新锁内读取数据库并构建新的 _StoreState，完成后整体替换 self._state；
+    读取方只取一次 self._state 的引用，不加锁，也不会被进行中的刷新阻塞。
+    """
+
+    _INT_COLUMNS = ("id", "product_id", "distributor_code", "warehouse_id", "status_code", "quantity", "day", "month")
+
+    def __init__(self) -> None:
+        self._refresh_lock = threading.Lock()
+        self._state = _StoreState()
+
+    @property
+    def size(self) -> int:
+        """缓存中的订单数"""
+        ids = self._state.columns.get("id")
+        return 0 if ids is None else int(len(ids))
+
+    def _fetch(self, db: Session, state: _StoreState, full: bool) -> Tuple[Dict[str, Any], Optional[datetime]]:
+        """读取水位线之后新增或变更的订单，返回列数组与新的 updated_at 水位线"""
+        query = db.query(
+            SalesOrder.id,
+            SalesOrder.product_id,
+            SalesOrder.product_name,
+            SalesOrder.distributor_id,
+            SalesOrder.warehouse_id,
+            SalesOrder.status,
+            SalesOrder.quantity,
+            SalesOrder.total_value,
+            SalesOrder.order_date,
+            SalesOrder.updated_at,
+        )
+        if not full:
+            conditions = [SalesOrder.id > state.max_id]  # type: ignore[operator]
+            if state.max_updated_at is not None:
+                # 回看窗口内的行会被重复读取，原地覆盖是幂等的
+                conditions.append(
+                    SalesOrder.updated_at >= state.max_updated_at - _WATERMARK_OVERLAP  # type: ignore[operator]
+                )
+            query = query.filter(or_(*conditions))
+
+        values: Dict[str, List[Any]] = {name: [] for name in self._INT_COLUMNS + ("total_value",)}
+        max_updated_at = None if full else state.max_updated_at
+        for row in query.order_by(SalesOrder.id).yield_per(_LOAD_BATCH_SIZE):
+            order_day = _to_date(row.order_date)
+            values["id"].append(row.id)
+            values["product_id"].append(row.product_id)
+            values["distributor_code"].append(state.distributor_code(row.distributor_id))
+            values["warehouse_id"].append(row.warehouse_id or 0)
+            values["status_code"].append(state.encode_status(str(row.status)))
+            values["quantity"].append(row.quantity or 0)
+            values["total_value"].append(row.total_value or 0.0)
+            values["day"].append((order_day - _EPOCH).days)
+            values["month"].append(order_day.year * 100 + order_day.month)
+            state.product_names[row.product_id] = str(row.product_name)
+
+            updated_at = _to_datetime(row.updated_at)
+            if updated_at is not None and (max_updated_at is None or updated_at > max_updated_at):
+                max_updated_at = updated_at
+
+        columns = {name: np.array(values[name], dtype=np.int64) for name in self._INT_COLUMNS}
+        columns["total_value"] = np.array(values["total_value"], dtype=np.float64)
+        return columns, max_updated_at
+
+    def _is_stale(self, max_age_seconds: float) -> bool:
+        refreshed_at = self._state.refreshed_at
+        return refreshed_at is None or time.monotonic() - refreshed_at >= max_age_seconds
+
+    def refresh(self, db: Session, *, full: bool = False) -> int:
+        """
+        从数据库增量（或全量）刷新缓存
+
+        Args:
+            db: 数据库会话
+            full: 是否全量重载
+
+        Returns:
+            int: 本次读取的订单行数
+        """
+        if not is_available():
+            raise RuntimeError("NumPy 未安装，销售分析缓存不可用")
+        with self._refresh_lock:
+            return self._refresh_locked(db, full)
+
+    def _refresh_locked(self, db: Session, full: bool) -> int:
+        """在刷新锁内构建新状态并整体替换，读取方继续使用旧状态直到替换完成"""
+        current = self._state
+        full = full or not current.columns
+        state = _StoreState() if full else current.copy()
+        state.load_distributors(db)
+        fetched, max_updated_at = self._fetch(db, state, full)
+        fetched_count = int(len(fetched["id"]))
+
+        if full:
+            columns = fetched
+        else:
+            columns = {name: array.copy() for name, array in current.columns.items()}
+            ids = columns["id"]
+            positions = np.searchsorted(ids, fetched["id"])
+            existing = positions < len(ids)
+            existing[existing] = ids[positions[existing]] == fetched["id"][existing]
+            for name, array in fetched.items():
+                array_existing = array[existing]
+                columns[name][positions[existing]] = array_existing
+                columns[name] = np.concatenate([columns[name], array[~existing]])
+            # 晚提交的小 id 订单会追加在末尾，需要重新按 id 排序以保证 searchsorted 正确
+            if np.any(np.diff(columns["id"]) < 0):
+                order = np.argsort(columns["id"], kind="stable")
+                columns = {name: array[order] for name, array in columns.items()}
+
+        state.columns = columns
+        if fetched_count:
+            state.max_id = max(state.max_id, int(fetched["id"].max()))
+        state.max_updated_at = max_updated_at
+        state.refreshed_at = time.monotonic()
+        self._state = state
+        return fetched_count
+
+    def refresh_if_stale(self, db: Session, max_age_seconds: float) -> None:
+        """
+        缓存超过 max_age_seconds 未刷新时做一次增量刷新
+
+        并发的请求只有第一个执行刷新：其余请求在刷新锁上等待，取得锁后缓存已是新的，直接返回。
+
+        Args:
+            db: 数据库会话
+            max_age_seconds: 允许的最大缓存时长（秒）
+        """
+        if not self._is_stale(max_age_seconds):
+            return
+        with self._refresh_lock:
+            if self._is_stale(max_age_seconds):
+                self._refresh_locked(db, full=False)
+
+    def _filter_mask(
+        self,
+        state: _StoreState,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        statuses: Optional[Sequence[str]],
+        exclude_statuses: Sequence[str],
+        distributor_id: Optional[int],
+        product_id: Optional[int],
+        region: Optional[str],
+    ) -> Any:
+        columns = state.columns
+        mask = np.ones(len(columns["id"]), dtype=bool)
+        if start_date is not None:
+            mask &= columns["day"] >= (start_date - _EPOCH).days
+        if end_date is not None:
+            mask &= columns["day"] <= (end_date - _EPOCH).days
+        if statuses:
+            codes = [state.status_codes[s] for s in statuses if s in state.status_codes]
+            mask &= np.isin(columns["status_code"], codes)
+        elif exclude_statuses:
+            codes = [state.status_codes[s] for s in exclude_statuses if s in state.status_codes]
+            mask &= ~np.isin(columns["status_code"], codes)
+        if distributor_id is not None:
+            mask &= columns["distributor_code"] == state.distributor_codes.get(distributor_id, -1)
+        if product_id is not None:
+            mask &= columns["product_id"] == product_id
+        if region is not None:
+            region_code = state.regions.index(region) if region in state.regions else -1
+            mask &= state.distributor_regions[columns["distributor_code"]] == region_code
+        return mask
+
+    @staticmethod
+    def _label(state: _StoreState, dimension: str, key: int) -> Tuple[Any, str]:
+        """返回 (维度键, 显示名称)"""
+        if dimension == "region":
+            return state.regions[key], state.regions[key]
+        if dimension == "distributor":
+            return state.distributor_ids[key], state.distributor_names[key]
+        if dimension == "status":
+            return state.statuses[key], state.statuses[key]
+        if dimension == "month":
+            label = f"{key // 100:04d}-{key % 100:02d}"
+            return label, label
+        if dimension == "product":
+            return key, state.product_names.get(key, str(key))
+        return key, str(key)
+
+    def group_by(
+        self,
+        dimension: str,
+        *,
+        metric: str = "revenue",
+        top_k: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        statuses: Optional[Sequence[str]] = None,
+        exclude_statuses: Sequence[str] = ("cancelled",),
+        distributor_id: Optional[int] = None,
+        product_id: Optional[int] = None,
+        region: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        按维度分组聚合
+
+        Args:
+            dimension: 分组维度，见 DIMENSIONS
+            metric: 排序与聚合的度量，见 METRICS
+            top_k: 只返回度量最大的前 K 组，为 None 时返回全部（按度量降序）
+            start_date: 下单日期下限（含）
+            end_date: 下单日期上限（含）
+            statuses: 只统计这些状态
+            exclude_statuses: 未指定 statuses 时排除这些状态，默认排除已取消订单
+            distributor_id: 经销商过滤
+            product_id: 产品过滤
+            region: 地区过滤
+
+        Returns:
+            List[Dict[str, Any]]: 每组的 key、label、revenue、quantity、orders
+        """
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"不支持的分组维度: {dimension}")
+        if metric not in METRICS:
+            raise ValueError(f"不支持的度量: {metric}")
+
+        state = self._state
+        columns = state.columns
+        if not columns or not len(columns["id"]):
+            return []
+        mask = self._filter_mask(
+            state, start_date, end_date, statuses, exclude_statuses,
+            distributor_id, product_id, region,
+        )
+
+        if dimension == "region":
+            raw_keys = state.distributor_regions[columns["distributor_code"][mask]]
+        else:
+            source = {
+                "distributor": "distributor_code",
+                "product": "product_id",
+                "warehouse": "warehouse_id",
+                "status": "status_code",
+                "month": "month",
+            }[dimension]
+            raw_keys = columns[source][mask]
+
+        # 把任意整数键压缩为 0..n-1，再用 bincount 一次性完成各度量的分组求和
+        keys, inverse = np.unique(raw_keys, return_inverse=True)
+        totals = {
+            "revenue": np.bincount(inverse, weights=columns["total_value"][mask], minlength=len(keys)),
+            "quantity": np.bincount(inverse, weights=columns["quantity"][mask], minlength=len(keys)),
+            "orders": np.bincount(inverse, minlength=len(keys)),
+        }
+
+        ranking = totals[metric]
+        if top_k is not None and top_k < len(keys):
+            selected = np.argpartition(-ranking, top_k - 1)[:top_k]
+        else:
+            selected = np.arange(len(keys))
+        selected = selected[np.argsort(-ranking[selected], kind="stable")]
+
+        results = []
+        for index in selected:
+            key, label = self._label(state, dimension, int(keys[index]))
+            results.append({
+                "key": key,
+                "label": label,
+                "revenue": round(float(totals["revenue"][index]), 2),
+                "quantity": int(totals["quantity"][index]),
+                "orders": int(totals["orders"][index]),
+            })
+        return results
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        获取缓存状态
+
+        Returns:
+            Dict[str, Any]: 是否可用、订单数与水位线
+        """
+        state = self._state
+        ids = state.columns.get("id")
+        return {
+            "available": is_available(),
+            "orders": 0 if ids is None else int(len(ids)),
+            "max_id": state.max_id,
+            "max_updated_at": state.max_updated_at,
+        }
+
+
+sales_column_store = SalesColumnStore()
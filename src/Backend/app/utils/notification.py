@@ -3,7 +3,9 @@
 from typing import Optional, List
 from sqlalchemy.orm import Session
 from app.crud.notification import notification as notification_crud
-import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def send_notification(
@@ -41,37 +43,22 @@ def send_notification(
         days_to_expire=days_to_expire
     )
 
-    # 实时推送（如果用户在线）
+    # 实时推送（经消息总线送达用户连接所在的 worker）
     try:
         from app.core.websocket import manager
 
-        # 创建异步任务推送通知
-        async def push_notification():
-            await manager.send_notification(
-                user_id=user_id,
-                notification_id=int(notification.id),  # type: ignore[arg-type]
-                title=title,
-                message=message,
-                notification_type=notification_type,
-                reference_id=reference_id,# type: ignore[arg-type]
-                reference_type=reference_type# type: ignore[arg-type]
-            )
-
-        # 尝试在事件循环中运行
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # 如果事件循环正在运行，创建任务
-                asyncio.create_task(push_notification())
-            else:
-                # 如果没有运行中的事件循环，直接运行
-                loop.run_until_complete(push_notification())
-        except RuntimeError:
-            # 如果没有事件循环，创建新的
-            asyncio.run(push_notification())
+        manager.publish_notification(
+            user_id=user_id,
+            notification_id=int(notification.id),  # type: ignore[arg-type]
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            reference_id=reference_id,
+            reference_type=reference_type,
+        )
     except Exception:
         # WebSocket推送失败不应影响通知保存
-        pass
+        logger.exception("发布 WebSocket 通知失败")
 
 
 def send_notification_to_multiple(
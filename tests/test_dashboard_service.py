@@ -0,0 +1,640 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_PATH = PROJECT_ROOT / "src" / "Backend"
+if str(BACKEND_PATH) not in sys.path:
+    sys.path.append(str(BACKEND_PATH))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./tests/test_api.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func, select, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.api.v1 import dashboard as dashboard_api
+from app.core.cache import SectionCache
+from app.core.dependencies import get_current_active_user
+from app.core.principal_cache import Principal
+from app.core.database import Base, get_async_read_db
+from app.core.etag import conditional_etag
+from app.crud.change_counter import ALL_TAGS, TAG_WAREHOUSES, change_counter
+from app.models.product import Product, ProductCategory
+from app.models.inventory import Warehouse, Inventory, InventoryTransaction
+from app.models.sales import Distributor, SalesOrder
+from app.crud.dashboard_snapshot import dashboard_snapshot
+from app.crud.inventory_history import inventory_history
+from app.crud.sales_rollup import sales_rollup
+from app.models.dashboard_snapshot import DashboardOrderSnapshot, DashboardSnapshot
+from app.models.change_counter import ChangeCounter
+from app.models.inventory_history import InventoryDailySnapshot
+from app.models.sales_rollup import SalesDailyRollup
+from app.crud.inventory import inventory as inventory_crud, warehouse as warehouse_crud
+from app.crud.product import product as product_crud
+from app.crud.sales import sales_order as sales_order_crud
+from app.schemas.inventory import InventoryCreate, InventoryUpdate, WarehouseCreate
+from app.schemas.sales import SalesOrderCreate, SalesOrderUpdate
+from app.services.dashboard_service import DashboardService, dashboard_cache
+from app.services.dashboard_stream import ChangeWatcher, dashboard_event_stream
+
+
+class DashboardServiceTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        # 同一个 SQLite 文件同时供同步与异步引擎访问
+        self.tmpdir = tempfile.TemporaryDirectory()
+        path = f"{self.tmpdir.name}/dashboard.db"
+        self.engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        self.async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.AsyncSessionLocal = async_sessionmaker(
+            self.async_engine, expire_on_commit=False, info={"sync_bind": self.engine}
+        )
+        self.db = self.SessionLocal()
+        dashboard_cache.clear()
+        self._seed()
+        DashboardService.initialize_read_models(self.db)
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def _seed(self) -> None:
+        db = self.db
+        category = ProductCategory(name="滤芯")
+        db.add(category)
+        db.flush()
+
+        products = [
+            Product(name="机油滤芯", sku="SKU-1", price=10.0, min_stock_level=10, category_id=category.id),
+            Product(name="燃油滤芯", sku="SKU-2", price=20.0, min_stock_level=10, category_id=category.id),
+            Product(name="空气滤芯", sku="SKU-3", price=5.0, min_stock_level=10, category_id=category.id),
+            Product(name="停产滤芯", sku="SKU-4", price=1.0, min_stock_level=10, is_active=False),
+        ]
+        db.add_all(products)
+        warehouse_a = Warehouse(name="A 仓", capacity=100)
+        warehouse_b = Warehouse(name="B 仓", capacity=100, is_active=False)
+        db.add_all([warehouse_a, warehouse_b])
+        db.flush()
+
+        db.add_all([
+            Inventory(product_id=products[0].id, warehouse_id=warehouse_a.id, quantity=50),  # 正常
+            Inventory(product_id=products[1].id, warehouse_id=warehouse_a.id, quantity=5),  # 低库存
+            Inventory(product_id=products[2].id, warehouse_id=warehouse_a.id, quantity=0),  # 缺货
+            Inventory(product_id=products[0].id, warehouse_id=warehouse_b.id, quantity=10),  # 低库存（等于阈值）
+        ])
+
+        distributor = Distributor(name="经销商", contact_person="张三", phone="1", region="华东")
+        db.add(distributor)
+        db.flush()
+        for code, status, value in [
+            ("SO-1", "pending", 100.0),
+            ("SO-2", "processing", 50.0),
+            ("SO-3", "completed", 25.5),
+            ("SO-4", "pending", 10.0),
+        ]:
+            db.add(SalesOrder(
+                order_code=code,
+                distributor_id=distributor.id,
+                product_id=products[0].id,
+                product_name=products[0].name,
+                quantity=1,
+                unit_price=value,
+                total_value=value,
+                status=status,
+                order_date=datetime.now(),
+            ))
+        db.commit()
+
+    def test_stats_from_single_pass(self):
+        stats = DashboardService.get_dashboard_stats(self.db)
+        self.assertEqual(stats.total_products, 3)
+        self.assertEqual(stats.total_inventory, 65)
+        self.assertEqual(stats.low_stock_items, 2)
+        self.assertEqual(stats.out_of_stock, 1)
+        self.assertEqual(stats.total_warehouses, 1)
+        self.assertEqual(stats.pending_orders, 3)
+        self.assertEqual(stats.total_inventory_value, 700.0)
+
+    def test_stock_status_buckets(self):
+        buckets = {item.status: item for item in DashboardService.get_stock_status(self.db)}
+        self.assertEqual(buckets["正常"].count, 1)
+        self.assertEqual(buckets["低库存"].count, 2)
+        self.assertEqual(buckets["缺货"].count, 1)
+        self.assertEqual(buckets["低库存"].percentage, 50.0)
+
+    def test_full_dashboard_scans_each_table_once(self):
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", _record)
+        try:
+            overview = DashboardService.get_dashboard_overview(self.db)
+        finally:
+            event.remove(self.engine, "before_cursor_execute", _record)
+
+        self.assertEqual(len(statements), 2)
+        stats, stock_status, order_distribution = overview
+        self.assertEqual(stats.pending_orders, 3)
+        self.assertEqual(len(stock_status), 3)
+        self.assertEqual(
+            {item.status: item.count for item in order_distribution},
+            {"pending": 2, "processing": 1, "completed": 1},
+        )
+
+    def test_snapshot_tracks_writes_without_drift(self):
+        db = self.db
+        self.assertEqual(DashboardService.get_snapshot_overview(db), DashboardService.get_dashboard_overview(db))
+
+        warehouse = warehouse_crud.create(db, obj_in=WarehouseCreate(name="C 仓", capacity=10))
+        product = db.query(Product).filter(Product.sku == "SKU-3").one()
+        item = inventory_crud.create(
+            db, obj_in=InventoryCreate(product_id=product.id, warehouse_id=warehouse.id, quantity=3)
+        )
+        inventory_crud.update(db, db_obj=item, obj_in=InventoryUpdate(quantity=0))
+        product_crud.update(db, db_obj=product, obj_in={"price": 7.5, "min_stock_level": 2})
+        product_crud.update(db, db_obj=product, obj_in={"is_active": False})
+
+        order = sales_order_crud.create(db, obj_in=SalesOrderCreate(
+            order_code="SO-5",
+            distributor_id=1,
+            product_id=product.id,
+            product_name=product.name,
+            quantity=2,
+            unit_price=7.5,
+            total_value=15.0,
+            order_date=datetime.now(),
+            warehouse_id=warehouse.id,
+        ))
+        sales_order_crud.update(db, db_obj=order, obj_in=SalesOrderUpdate(status="cancelled"))
+
+        snapshot_overview = DashboardService.get_snapshot_overview(db)
+        self.assertEqual(snapshot_overview, DashboardService.get_dashboard_overview(db))
+        self.assertEqual(snapshot_overview[0].total_warehouses, 2)
+        self.assertEqual(snapshot_overview[0].total_products, 2)
+
+        self.assertEqual(dashboard_snapshot.rebuild(db), [])
+        warehouse_snapshot = dashboard_snapshot.get(db, warehouse.id)
+        self.assertEqual(warehouse_snapshot.out_of_stock, 1)
+        self.assertEqual(
+            [(row.status, row.order_count) for row in dashboard_snapshot.get_order_snapshots(db, warehouse.id)],
+            [("cancelled", 1)],
+        )
+
+    def test_bump_inserts_missing_tags_without_conflict(self):
+        db = self.db
+        db.query(ChangeCounter).delete()
+        db.commit()
+
+        change_counter.bump(db, TAG_WAREHOUSES)
+        change_counter.bump(db, TAG_WAREHOUSES)
+        db.commit()
+        change_counter.ensure_tags(db)
+
+        versions = change_counter.get_versions(db)
+        self.assertEqual(versions[TAG_WAREHOUSES], 2)
+        self.assertEqual(set(versions), set(ALL_TAGS))
+
+    def test_uninitialized_snapshot_falls_back_without_writing(self):
+        db = self.db
+        db.query(DashboardOrderSnapshot).delete()
+        db.query(DashboardSnapshot).delete()
+        db.commit()
+
+        self.assertEqual(DashboardService.get_snapshot_overview(db), DashboardService.get_dashboard_overview(db))
+        self.assertEqual(DashboardService.get_full_dashboard(db, parallel=True).degraded_sections, [])
+        self.assertFalse(dashboard_snapshot.is_initialized(db))
+
+    def test_rebuild_reports_drift(self):
+        db = self.db
+        DashboardService.get_snapshot_overview(db)
+        snapshot = dashboard_snapshot.get(db)
+        snapshot.total_inventory = 1
+        db.commit()
+
+        drift = dashboard_snapshot.rebuild(db)
+        db.commit()
+        self.assertEqual(
+            drift, [{"scope": "global", "field": "total_inventory", "snapshot": 1, "actual": 65}]
+        )
+        self.assertEqual(dashboard_snapshot.get(db).total_inventory, 65)
+
+    def test_section_cache_invalidated_by_tag(self):
+        db = self.db
+        DashboardService.get_full_dashboard(db)
+        DashboardService.get_full_dashboard(db)
+        sections = dashboard_cache.get_stats()["sections"]
+        self.assertEqual(sections["stock_status"]["hits"], 1)
+        self.assertEqual(sections["stock_status"]["misses"], 1)
+
+        item = db.query(Inventory).filter(Inventory.quantity == 5).one()
+        inventory_crud.update(db, db_obj=item, obj_in=InventoryUpdate(quantity=0))
+
+        # 写操作使条目失效：写后读同步重新计算，不返回写入前的旧值
+        dashboard = DashboardService.get_full_dashboard(db)
+        sections = dashboard_cache.get_stats()["sections"]
+        self.assertEqual(sections["stock_status"]["invalidations"], 1)
+        self.assertEqual(sections["stock_status"]["stale_hits"], 0)
+        self.assertEqual(sections["stock_status"]["misses"], 2)
+        self.assertEqual(sections["warehouse_utilization"]["hits"], 2)
+        self.assertEqual(sections["order_status_distribution"]["hits"], 2)
+        self.assertEqual(dashboard.stats.out_of_stock, 2)
+
+    def test_parallel_dashboard_matches_sequential(self):
+        sequential = DashboardService.get_full_dashboard(self.db, parallel=False)
+        dashboard_cache.clear()
+        parallel = DashboardService.get_full_dashboard(
+            self.db, parallel=True, session_factory=self.SessionLocal
+        )
+        self.assertEqual(parallel.degraded_sections, [])
+        self.assertEqual(parallel.model_dump(), sequential.model_dump())
+
+    def test_async_dashboard_matches_sync(self):
+        sequential = DashboardService.get_full_dashboard(self.db, parallel=False)
+
+        async def load(parallel):
+            dashboard_cache.clear()
+            async with self.AsyncSessionLocal() as db:
+                return await DashboardService.get_full_dashboard_async(db, parallel=parallel)
+
+        for parallel in (False, True):
+            dashboard = asyncio.run(load(parallel))
+            self.assertEqual(dashboard.degraded_sections, [])
+            self.assertEqual(dashboard.model_dump(), sequential.model_dump())
+
+    def test_slow_section_degrades_to_partial_response(self):
+        def slow_activities(db, limit=10):
+            time.sleep(1)
+            return []
+
+        with mock.patch.object(DashboardService, "get_recent_activities", slow_activities), \
+                mock.patch("app.services.dashboard_service.settings.DASHBOARD_SECTION_TIMEOUT_SECONDS", 0.2):
+            dashboard = DashboardService.get_full_dashboard(
+                self.db, parallel=True, session_factory=self.SessionLocal
+            )
+        self.assertEqual(dashboard.degraded_sections, ["recent_activities"])
+        self.assertEqual(dashboard.stats.pending_orders, 3)
+
+    def _rollup_rows(self):
+        return sorted(
+            (row.day, row.product_id, row.distributor_id, row.warehouse_id, row.status,
+             row.order_count, row.total_quantity, round(row.total_value, 2))
+            for row in self.db.query(SalesDailyRollup).filter(SalesDailyRollup.order_count != 0)
+        )
+
+    def test_sales_rollup_tracks_order_writes(self):
+        db = self.db
+        top = DashboardService.get_top_products(db, 5, 30)
+        self.assertEqual([(p.sku, p.total_sold, p.total_revenue) for p in top], [("SKU-1", 4, 185.5)])
+
+        product = db.query(Product).filter(Product.sku == "SKU-2").one()
+        order = sales_order_crud.create(db, obj_in=SalesOrderCreate(
+            order_code="SO-5",
+            distributor_id=1,
+            product_id=product.id,
+            product_name=product.name,
+            quantity=4,
+            unit_price=20.0,
+            total_value=80.0,
+            order_date=datetime.now(),
+            warehouse_id=1,
+        ))
+        sales_order_crud.update(db, db_obj=order, obj_in=SalesOrderUpdate(status="completed"))
+
+        incremental = self._rollup_rows()
+        sales_rollup.rebuild(db)
+        db.commit()
+        self.assertEqual(self._rollup_rows(), incremental)
+
+        top = DashboardService.get_top_products(db, 1, 30)
+        self.assertEqual([(p.sku, p.product_name, p.total_sold) for p in top], [("SKU-2", "燃油滤芯", 4)])
+        self.assertEqual(
+            {item.status: item.count for item in DashboardService.get_order_status_distribution(db)},
+            {"pending": 2, "processing": 1, "completed": 2},
+        )
+
+    def test_sales_rollup_never_built_on_read(self):
+        db = self.db
+        db.query(SalesDailyRollup).delete()
+        db.commit()
+
+        self.assertEqual(DashboardService.get_top_products(db, 5, 30), [])
+        self.assertFalse(sales_rollup.is_initialized(db))
+
+        DashboardService.initialize_read_models(db)
+        self.assertEqual(len(DashboardService.get_top_products(db, 5, 30)), 1)
+
+    def test_first_order_on_empty_database_counted_in_rollup(self):
+        db = self.db
+        db.query(SalesDailyRollup).delete()
+        db.query(SalesOrder).delete()
+        db.commit()
+
+        product = db.query(Product).filter(Product.sku == "SKU-2").one()
+        sales_order_crud.create(db, obj_in=SalesOrderCreate(
+            order_code="SO-5",
+            distributor_id=1,
+            product_id=product.id,
+            product_name=product.name,
+            quantity=4,
+            unit_price=20.0,
+            total_value=80.0,
+            order_date=datetime.now(),
+            warehouse_id=1,
+        ))
+
+        top = DashboardService.get_top_products(db, 5, 30)
+        self.assertEqual([(p.sku, p.total_sold) for p in top], [("SKU-2", 4)])
+
+    def test_snapshot_boundary_counts_each_transaction_once(self):
+        db = self.db
+        item = db.query(Inventory).filter(Inventory.quantity == 5).one()
+        inventory_crud.update(db, db_obj=item, obj_in=InventoryUpdate(quantity=25))
+        inventory_history.take_snapshot(db)
+        db.commit()
+
+        # 交易恰好落在快照时刻：已计入快照，不能再作为其后的增量
+        snapshot_time = select(func.max(InventoryDailySnapshot.taken_at)).scalar_subquery()
+        db.execute(update(InventoryTransaction).values(created_at=snapshot_time))
+        db.commit()
+        self.assertEqual(inventory_history.get_stock_level(db, db.scalar(select(func.now()))), 85)
+
+        # 时间戳为秒级精度：等到数据库时钟越过快照时刻后再写入
+        time.sleep(1.1)
+        inventory_crud.update(db, db_obj=item, obj_in=InventoryUpdate(quantity=35))
+        self.assertEqual(inventory_history.get_stock_level(db, db.scalar(select(func.now()))), 95)
+        self.assertEqual(inventory_history.get_stock_level_on(db, date.today()), 95)
+
+    def test_stock_level_from_snapshot_and_transactions(self):
+        db = self.db
+        now = datetime.now()
+        inventory_history.take_snapshot(db, taken_at=now - timedelta(days=2))
+        db.commit()
+
+        item = db.query(Inventory).filter(Inventory.quantity == 5).one()
+        inventory_crud.update(db, db_obj=item, obj_in=InventoryUpdate(quantity=25))
+
+        self.assertEqual(inventory_history.get_stock_level(db, now - timedelta(days=1)), 65)
+        self.assertEqual(inventory_history.get_stock_level(db, datetime.now()), 85)
+        self.assertEqual(
+            inventory_history.get_stock_level(db, datetime.now(), warehouse_id=item.warehouse_id),
+            75,
+        )
+
+        # 没有更早的快照时，从当前库存倒推
+        db.query(InventoryDailySnapshot).delete()
+        db.commit()
+        self.assertEqual(inventory_history.get_stock_level(db, now - timedelta(days=1)), 65)
+
+        trend = DashboardService.get_inventory_sales_trend(db, "daily", 30)
+        self.assertEqual(trend["inventory_levels"][-1], 85)
+        self.assertEqual(trend["inventory_levels"][-2], 65)
+        self.assertEqual(trend["sales_data"][-1], 185.5)
+
+        weekly = DashboardService.get_product_movement(db, "weekly", 30)
+        self.assertEqual(weekly["movement_data"][-1], 20)
+
+    def test_stream_sends_full_then_debounced_delta(self):
+        db = self.db
+        watcher = ChangeWatcher(session_factory=self.SessionLocal, poll_seconds=0.02)
+
+        async def not_disconnected():
+            return False
+
+        def parse(event):
+            lines = dict(line.split(": ", 1) for line in event.strip().splitlines())
+            return lines["event"], json.loads(lines["data"])
+
+        async def scenario():
+            stream = dashboard_event_stream(not_disconnected, watcher, self.SessionLocal)
+            kind, full = parse(await stream.__anext__())
+            self.assertEqual(kind, "dashboard")
+            self.assertEqual(full["stats"]["out_of_stock"], 1)
+
+            items = db.query(Inventory).filter(Inventory.quantity > 0).order_by(Inventory.id).all()
+            inventory_crud.update(db, db_obj=items[0], obj_in=InventoryUpdate(quantity=0))
+            kind, delta = parse(await asyncio.wait_for(stream.__anext__(), 5))
+            self.assertEqual(kind, "delta")
+            self.assertEqual(delta["stats"]["out_of_stock"], 2)
+            self.assertNotIn("warehouse_utilization", delta)
+            self.assertNotIn("order_status_distribution", delta)
+
+            # 去抖窗口内的连续写入合并为一次增量
+            started = time.monotonic()
+            inventory_crud.update(db, db_obj=items[1], obj_in=InventoryUpdate(quantity=0))
+            await asyncio.sleep(0.1)
+            inventory_crud.update(db, db_obj=items[2], obj_in=InventoryUpdate(quantity=0))
+            kind, delta = parse(await asyncio.wait_for(stream.__anext__(), 5))
+            self.assertGreaterEqual(time.monotonic() - started, 0.25)
+            self.assertEqual(delta["stats"]["out_of_stock"], 4)
+            await stream.aclose()
+
+        with mock.patch("app.services.dashboard_stream.settings.DASHBOARD_STREAM_DEBOUNCE_SECONDS", 0.3):
+            asyncio.run(scenario())
+
+
+    def test_conditional_get_revalidates_on_warehouse_write(self):
+        app = FastAPI()
+
+        @app.get("/warehouses")
+        def list_warehouses(_etag: str = Depends(conditional_etag(TAG_WAREHOUSES))):
+            return ["ok"]
+
+        async def read_db():
+            async with self.AsyncSessionLocal() as db:
+                yield db
+
+        app.dependency_overrides[get_async_read_db] = read_db
+        client = TestClient(app)
+
+        first = client.get("/warehouses")
+        etag = first.headers["ETag"]
+        revalidated = client.get("/warehouses", headers={"If-None-Match": etag})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.content, b"")
+
+        warehouse = self.db.query(Warehouse).filter(Warehouse.name == "A 仓").one()
+        warehouse_crud.update(self.db, db_obj=warehouse, obj_in={"name": "Renamed"})
+        changed = client.get("/warehouses", headers={"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["ETag"], etag)
+
+
+    def _dashboard_client(self) -> TestClient:
+        """挂载真实的仪表板路由，数据库依赖指向测试库"""
+        app = FastAPI()
+        app.include_router(dashboard_api.router, prefix="/dashboard")
+
+        async def read_db():
+            async with self.AsyncSessionLocal() as db:
+                yield db
+
+        app.dependency_overrides[get_async_read_db] = read_db
+        app.dependency_overrides[get_current_active_user] = lambda: Principal(
+            id=1, username="admin", role="admin", is_active=True, is_superuser=True
+        )
+        return TestClient(app)
+
+    def test_cached_dashboard_routes_revalidate_with_etag(self):
+        client = self._dashboard_client()
+        for path in ("/dashboard/stats", "/dashboard/alerts"):
+            first = client.get(path)
+            self.assertEqual(first.status_code, 200, first.text)
+            revalidated = client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+            self.assertEqual(revalidated.status_code, 304)
+
+    def test_async_routes_match_sync_service(self):
+        expected = json.loads(DashboardService.get_full_dashboard(self.db, parallel=False).model_dump_json())
+        dashboard_cache.clear()
+        client = self._dashboard_client()
+        sections = {
+            "/dashboard/stats": "stats",
+            "/dashboard/stock-status": "stock_status",
+            "/dashboard/alerts": "inventory_alerts",
+            "/dashboard/warehouse-utilization": "warehouse_utilization",
+            "/dashboard/order-status-distribution": "order_status_distribution",
+        }
+        for path, section in sections.items():
+            response = client.get(path)
+            self.assertEqual(response.status_code, 200, f"{path}: {response.text}")
+            self.assertEqual(response.json(), expected[section], path)
+
+        for path in (
+            "/dashboard/",
+            "/dashboard/activities",
+            "/dashboard/top-products",
+            "/dashboard/inventory-sales-trend",
+            "/dashboard/product-movement",
+            "/dashboard/category-distribution",
+        ):
+            response = client.get(path)
+            self.assertEqual(response.status_code, 200, f"{path}: {response.text}")
+
+
+class SectionCacheTestCase(unittest.TestCase):
+    def test_concurrent_async_misses_share_one_computation(self):
+        cache = SectionCache(ttl_seconds=30)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "value"
+
+        async def scenario():
+            return await asyncio.gather(
+                *(cache.get_or_compute_async("s", (), (), {}, compute) for _ in range(5))
+            )
+
+        self.assertEqual(asyncio.run(scenario()), ["value"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.get_stats()["sections"]["s"]["coalesced"], 4)
+
+    def test_concurrent_misses_share_one_computation(self):
+        cache = SectionCache(ttl_seconds=30)
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "value"
+
+        results = []
+        leader = threading.Thread(
+            target=lambda: results.append(cache.get_or_compute("s", (), ("t",), {"t": 1}, compute))
+        )
+        leader.start()
+        started.wait(5)
+        followers = [
+            threading.Thread(
+                target=lambda: results.append(cache.get_or_compute("s", (), ("t",), {"t": 1}, compute))
+            )
+            for _ in range(5)
+        ]
+        for thread in followers:
+            thread.start()
+        while cache.get_stats()["sections"]["s"]["coalesced"] < 5:
+            time.sleep(0.01)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 6)
+
+    def test_expired_entry_served_while_refreshing(self):
+        cache = SectionCache(ttl_seconds=0, stale_seconds=30)
+        cache.get_or_compute("s", (), (), {}, lambda: "old")
+        refreshed = threading.Event()
+
+        def refresh():
+            refreshed.set()
+            return "new"
+
+        self.assertEqual(cache.get_or_compute("s", (), (), {}, lambda: "sync", refresh), "old")
+        self.assertTrue(refreshed.wait(5))
+        stats = cache.get_stats()["sections"]["s"]
+        self.assertEqual(stats["stale_hits"], 1)
+        self.assertEqual(stats["refreshes"], 1)
+
+    def test_invalidated_entry_recomputed_instead_of_served_stale(self):
+        cache = SectionCache(ttl_seconds=30, stale_seconds=60)
+        cache.get_or_compute("s", (), ("t",), {"t": 1}, lambda: "before write", lambda: "refresh")
+
+        value = cache.get_or_compute("s", (), ("t",), {"t": 2}, lambda: "after write", lambda: "refresh")
+        self.assertEqual(value, "after write")
+        stats = cache.get_stats()["sections"]["s"]
+        self.assertEqual(stats["invalidations"], 1)
+        self.assertEqual(stats["stale_hits"], 0)
+        self.assertEqual(stats["refreshes"], 0)
+
+    def test_invalidated_read_not_coalesced_onto_older_refresh(self):
+        cache = SectionCache(ttl_seconds=0, stale_seconds=30)
+        cache.get_or_compute("s", (), ("t",), {"t": 1}, lambda: "v1")
+        release = threading.Event()
+
+        def slow_refresh():
+            release.wait(5)
+            return "v1 refreshed"
+
+        # TTL 到期：返回旧值并在后台以版本 1 刷新
+        self.assertEqual(cache.get_or_compute("s", (), ("t",), {"t": 1}, lambda: "sync", slow_refresh), "v1")
+        # 写入后版本为 2：不等待版本 1 的刷新，而是自行计算
+        self.assertEqual(cache.get_or_compute("s", (), ("t",), {"t": 2}, lambda: "v2"), "v2")
+        release.set()
+
+    def test_least_recently_used_entry_evicted(self):
+        cache = SectionCache(ttl_seconds=30, max_entries=2)
+        cache.get_or_compute("s", (1,), (), {}, lambda: "one")
+        cache.get_or_compute("s", (2,), (), {}, lambda: "two")
+        cache.get_or_compute("s", (1,), (), {}, lambda: "recomputed")
+        cache.get_or_compute("s", (3,), (), {}, lambda: "three")
+
+        stats = cache.get_stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["sections"]["s"]["evictions"], 1)
+        self.assertEqual(cache.get_or_compute("s", (1,), (), {}, lambda: "recomputed"), "one")
+        self.assertEqual(cache.get_or_compute("s", (2,), (), {}, lambda: "recomputed"), "recomputed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_PATH = PROJECT_ROOT / "src" / "Backend"
+if str(BACKEND_PATH) not in sys.path:
+    sys.path.append(str(BACKEND_PATH))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./tests/test_api.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from sqlalchemy import create_engine, text
+
+from app.core.db_metrics import TimedQueuePool, get_pool_stats, instrument_engine, pool_options
+
+
+class PoolMetricsTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{self.tmpdir.name}/metrics.db"
+        options = pool_options(url, pool_size=2, max_overflow=1, pool_timeout=1)
+        self.assertIs(options["poolclass"], TimedQueuePool)
+        self.engine = create_engine(url, **options)
+
+    def tearDown(self) -> None:
+        self.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def test_memory_sqlite_keeps_default_pool(self):
+        self.assertEqual(pool_options("sqlite://", 2, 1, 1), {})
+
+    def test_checkout_waits_and_live_pool_state(self):
+        metrics = instrument_engine("test-pool", self.engine)
+        held = self.engine.connect()
+        for _ in range(3):
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        stats = get_pool_stats()["engines"]["test-pool"]
+        self.assertEqual(stats["checked_out"], 1)
+        self.assertEqual(stats["checkouts"], 4)
+        self.assertEqual(stats["checkout_wait"]["count"], 4)
+        self.assertEqual(sum(stats["checkout_wait"]["histogram"].values()), 4)
+        held.close()
+        self.assertEqual(metrics.snapshot()["checked_out"], 0)
+
+    def test_slow_statements_are_logged(self):
+        instrument_engine("test-slow", self.engine, sample_rate=0.0, slow_threshold_ms=1e-6)
+        with self.assertLogs("app.sql", level="WARNING") as logs:
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT   1"))
+
+        entry = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(entry["event"], "sql_slow")
+        self.assertEqual(entry["statement"], "SELECT 1")
+        self.assertEqual(get_pool_stats()["engines"]["test-slow"]["slow_statements"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
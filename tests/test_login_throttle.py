@@ -0,0 +1,69 @@
+import os
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_PATH = PROJECT_ROOT / "src" / "Backend"
+if str(BACKEND_PATH) not in sys.path:
+    sys.path.append(str(BACKEND_PATH))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./tests/test_api.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from fastapi import HTTPException
+
+from app.core.login_throttle import LoginThrottle
+from app.core.security import PasswordHasher
+
+
+class LoginThrottleTestCase(unittest.TestCase):
+    def test_username_failures_block_until_window_passes(self):
+        throttle = LoginThrottle(window_seconds=60, max_failures_per_username=3, max_attempts_per_ip=100)
+        for second in range(3):
+            throttle.check("Alice", "10.0.0.1", now=100.0 + second)
+            throttle.record_failure("Alice", now=100.0 + second)
+
+        with self.assertRaises(HTTPException) as ctx:
+            throttle.check("alice", "10.0.0.2", now=110.0)
+        self.assertEqual(ctx.exception.status_code, 429)
+        self.assertEqual(ctx.exception.headers["Retry-After"], "50")
+
+        # 最早的失败移出窗口后放行
+        throttle.check("alice", "10.0.0.2", now=160.5)
+
+    def test_success_resets_username_but_not_ip(self):
+        throttle = LoginThrottle(window_seconds=60, max_failures_per_username=2, max_attempts_per_ip=3)
+        throttle.check("bob", "10.0.0.1", now=0.0)
+        throttle.record_failure("bob", now=0.0)
+        throttle.check("bob", "10.0.0.1", now=1.0)
+        throttle.record_success("bob")
+        throttle.check("bob", "10.0.0.1", now=2.0)
+
+        with self.assertRaises(HTTPException) as ctx:
+            throttle.check("carol", "10.0.0.1", now=3.0)
+        self.assertEqual(ctx.exception.status_code, 429)
+
+
+class PasswordHasherTestCase(unittest.TestCase):
+    def test_sheds_when_queue_is_full(self):
+        hasher = PasswordHasher(workers=1, max_queue=1)
+        self.addCleanup(hasher.shutdown)
+        release = threading.Event()
+        running = hasher._submit(release.wait)
+        queued = hasher._submit(release.wait)
+
+        with self.assertRaises(HTTPException) as ctx:
+            hasher._submit(release.wait)
+        self.assertEqual(ctx.exception.status_code, 503)
+
+        release.set()
+        running.result(timeout=5)
+        queued.result(timeout=5)
+        self.assertEqual(hasher.pending, 0)
+        self.assertTrue(hasher.verify("secret", hasher.hash("secret")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_PATH = PROJECT_ROOT / "src" / "Backend"
+if str(BACKEND_PATH) not in sys.path:
+    sys.path.append(str(BACKEND_PATH))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./tests/test_api.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1 import users
+from app.core.database import Base, get_db
+from app.core.dependencies import get_current_active_user
+from app.core.principal_cache import Principal, PrincipalCache, principal_cache
+from app.core.security import create_access_token, get_password_hash
+from app.models.user import User
+
+
+class PrincipalCacheTestCase(unittest.TestCase):
+    def test_entry_expires_with_ttl_or_token(self):
+        cache = PrincipalCache(ttl_seconds=30, max_entries=10)
+        principal = Principal(id=1, username="alice", role="staff", is_active=True, is_superuser=False)
+        cache.put("t1", principal, now=100.0)
+        cache.put("t2", principal, token_expires_at=110.0, now=100.0)
+
+        self.assertEqual(cache.get("t1", now=120.0), principal)
+        self.assertIsNone(cache.get("t2", now=120.0))
+        self.assertIsNone(cache.get("t1", now=131.0))
+
+    def test_invalidate_user_drops_all_tokens(self):
+        cache = PrincipalCache(ttl_seconds=30, max_entries=2)
+        alice = Principal(id=1, username="alice", role="staff", is_active=True, is_superuser=False)
+        bob = Principal(id=2, username="bob", role="admin", is_active=True, is_superuser=False)
+        cache.put("a1", alice)
+        cache.put("a2", alice)
+        cache.put("b1", bob)
+        # 超出容量时淘汰最久未使用的令牌
+        self.assertIsNone(cache.get("a1"))
+
+        cache.invalidate_user(1)
+        self.assertIsNone(cache.get("a2"))
+        self.assertEqual(cache.get("b1"), bob)
+
+
+class CurrentUserCacheTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{self.tmpdir.name}/auth.db")
+        Base.metadata.create_all(bind=self.engine, tables=[User.__table__])
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        with self.SessionLocal() as db:
+            db.add(User(
+                username="alice",
+                email="alice@example.com",
+                hashed_password=get_password_hash("old-password"),
+                role="staff",
+            ))
+            db.commit()
+        principal_cache.clear()
+        self.addCleanup(principal_cache.clear)
+
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._record)
+
+        app = FastAPI()
+
+        @app.get("/whoami")
+        def whoami(current_user: Principal = Depends(get_current_active_user)):
+            return {"id": current_user.id, "role": current_user.role}
+
+        app.include_router(users.router, prefix="/users")
+
+        def override_db():
+            db = self.SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_db
+        self.client = TestClient(app)
+        token = create_access_token({"sub": "alice"})
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    def tearDown(self) -> None:
+        self.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def test_repeated_requests_skip_user_lookup(self):
+        self.assertEqual(self.client.get("/whoami", headers=self.headers).json()["role"], "staff")
+        self.assertEqual(len(self.statements), 1)
+
+        self.statements.clear()
+        for _ in range(3):
+            self.assertEqual(self.client.get("/whoami", headers=self.headers).status_code, 200)
+        self.assertEqual(self.statements, [])
+
+    def test_profile_change_invalidates_cached_principal(self):
+        self.client.get("/whoami", headers=self.headers)
+        with self.SessionLocal() as db:
+            db.query(User).update({"role": "manager"})
+            db.commit()
+        # 直接改库不经过用户接口时，缓存有效期内仍返回旧身份
+        self.assertEqual(self.client.get("/whoami", headers=self.headers).json()["role"], "staff")
+
+        response = self.client.put("/users/me", headers=self.headers, json={"full_name": "Alice"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get("/whoami", headers=self.headers).json()["role"], "manager")
+
+    def test_password_change_invalidates_cached_principal(self):
+        self.client.get("/whoami", headers=self.headers)
+        response = self.client.post(
+            "/users/me/change-password",
+            headers=self.headers,
+            json={"current_password": "old-password", "new_password": "new-password"},
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.statements.clear()
+        self.client.get("/whoami", headers=self.headers)
+        self.assertEqual(len(self.statements), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
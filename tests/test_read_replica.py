@@ -0,0 +1,72 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_PATH = PROJECT_ROOT / "src" / "Backend"
+if str(BACKEND_PATH) not in sys.path:
+    sys.path.append(str(BACKEND_PATH))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./tests/test_api.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core import database
+from app.core.database import ReadYourWritesMiddleware, get_read_db
+
+
+class ReadReplicaRoutingTestCase(unittest.TestCase):
+    """主库与副本分别用两个 SQLite 文件模拟"""
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.primary = create_engine(f"sqlite:///{self.tmpdir.name}/primary.db")
+        self.replica = create_engine(f"sqlite:///{self.tmpdir.name}/replica.db")
+        patches = [
+            mock.patch.object(database, "replica_engine", self.replica),
+            mock.patch.object(database, "SessionLocal", sessionmaker(bind=self.primary)),
+            mock.patch.object(database, "ReadSessionLocal", sessionmaker(bind=self.replica)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        app = FastAPI()
+        app.add_middleware(ReadYourWritesMiddleware)
+
+        @app.get("/source")
+        def source(db: Session = Depends(get_read_db)):
+            return {"database": Path(db.get_bind().url.database).stem}
+
+        @app.post("/write")
+        def write():
+            return {"ok": True}
+
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        self.primary.dispose()
+        self.replica.dispose()
+        self.tmpdir.cleanup()
+
+    def test_reads_use_replica(self):
+        self.assertEqual(self.client.get("/source").json(), {"database": "replica"})
+
+    def test_reads_after_write_stay_on_primary(self):
+        response = self.client.post("/write")
+        self.assertIn(database.READ_PRIMARY_COOKIE, response.cookies)
+        self.assertEqual(self.client.get("/source").json(), {"database": "primary"})
+
+        self.client.cookies.clear()
+        self.assertEqual(self.client.get("/source").json(), {"database": "replica"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+import os
+import sys
+import threading
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_PATH = PROJECT_ROOT / "src" / "Backend"
+if str(BACKEND_PATH) not in sys.path:
+    sys.path.append(str(BACKEND_PATH))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./tests/test_api.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base, ensure_indexes
+from app.models.product import Product
+from app.models.sales import Distributor, SalesOrder
+from app.crud.sales import sales_order as sales_order_crud
+from app.schemas.sales import SalesOrderUpdate
+from app.services.sales_analytics import SalesColumnStore, is_available
+
+
+class WatermarkIndexTestCase(unittest.TestCase):
+    """增量刷新按 updated_at 过滤，旧库需在启动时补建该索引"""
+
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        with self.engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_sales_orders_updated_at"))
+
+    def tearDown(self) -> None:
+        self.engine.dispose()
+
+    def _indexes(self):
+        return {index["name"]: index["column_names"] for index in inspect(self.engine).get_indexes("sales_orders")}
+
+    def test_missing_index_created(self):
+        ensure_indexes(self.engine, "ix_sales_orders_updated_at")
+        ensure_indexes(self.engine, "ix_sales_orders_updated_at")
+        self.assertEqual(self._indexes()["ix_sales_orders_updated_at"], ["updated_at"])
+
+    def test_equivalent_index_kept(self):
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE INDEX idx_updated_at ON sales_orders (updated_at)"))
+        ensure_indexes(self.engine, "ix_sales_orders_updated_at")
+        self.assertNotIn("ix_sales_orders_updated_at", self._indexes())
+
+
+@unittest.skipUnless(is_available(), "numpy 未安装")
+class SalesColumnStoreTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)()
+
+        self.products = [Product(name="机油滤芯", sku="SKU-1", price=10.0), Product(name="燃油滤芯", sku="SKU-2", price=20.0)]
+        self.distributors = [
+            Distributor(name="华东经销商", contact_person="张三", phone="1", region="华东"),
+            Distributor(name="华南经销商", contact_person="李四", phone="2", region="华南"),
+        ]
+        self.db.add_all(self.products + self.distributors)
+        self.db.flush()
+        for i, (product, distributor, value, status, day) in enumerate([
+            (0, 0, 100.0, "completed", date(2026, 1, 5)),
+            (1, 0, 40.0, "pending", date(2026, 1, 20)),
+            (0, 1, 70.0, "completed", date(2026, 2, 3)),
+            (1, 1, 500.0, "cancelled", date(2026, 2, 4)),
+        ]):
+            self._add_order(i, product, distributor, value, status, day)
+        self.db.commit()
+        self.store = SalesColumnStore()
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.engine.dispose()
+
+    def _add_order(self, i, product, distributor, value, status, day):
+        order = SalesOrder(
+            order_code=f"SO-{i}",
+            distributor_id=self.distributors[distributor].id,
+            product_id=self.products[product].id,
+            product_name=self.products[product].name,
+            quantity=i + 1,
+            unit_price=value,
+            total_value=value,
+            status=status,
+            order_date=datetime.combine(day, datetime.min.time()),
+        )
+        self.db.add(order)
+        return order
+
+    def test_group_by_and_filters(self):
+        self.assertEqual(self.store.refresh(self.db), 4)
+
+        by_region = self.store.group_by("region")
+        self.assertEqual(
+            [(row["label"], row["revenue"], row["orders"]) for row in by_region],
+            [("华东", 140.0, 2), ("华南", 70.0, 1)],
+        )
+        by_month = self.store.group_by("month", metric="quantity", statuses=["completed", "cancelled"])
+        self.assertEqual([(row["key"], row["quantity"]) for row in by_month], [("2026-02", 7), ("2026-01", 1)])
+
+        top = self.store.group_by("product", top_k=1, start_date=date(2026, 1, 10))
+        self.assertEqual([(row["label"], row["revenue"]) for row in top], [("机油滤芯", 70.0)])
+
+    def test_incremental_refresh_by_watermark(self):
+        self.store.refresh(self.db)
+        pending = self.db.query(SalesOrder).filter(SalesOrder.status == "pending").one()
+        sales_order_crud.update(self.db, db_obj=pending, obj_in=SalesOrderUpdate(status="cancelled"))
+        self._add_order(9, 1, 1, 30.0, "completed", date(2026, 2, 10))
+        self.db.commit()
+
+        self.store.refresh(self.db)
+        self.assertEqual(self.store.size, 5)
+        by_distributor = {row["label"]: row["revenue"] for row in self.store.group_by("distributor")}
+        self.assertEqual(by_distributor, {"华东经销商": 100.0, "华南经销商": 100.0})
+
+    def test_concurrent_stale_reads_refresh_once_without_blocking_readers(self):
+        self.store.refresh(self.db)
+        before = self.store.group_by("region")
+        self._add_order(9, 1, 1, 30.0, "completed", date(2026, 2, 10))
+        self.db.commit()
+        self.store._state.refreshed_at -= 120
+
+        started, release = threading.Event(), threading.Event()
+        fetch = self.store._fetch
+        fetches = []
+
+        def slow_fetch(*args, **kwargs):
+            fetches.append(1)
+            started.set()
+            release.wait(5)
+            return fetch(*args, **kwargs)
+
+        with mock.patch.object(self.store, "_fetch", side_effect=slow_fetch):
+            threads = [
+                threading.Thread(target=self.store.refresh_if_stale, args=(self.db, 60)) for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            self.assertTrue(started.wait(5))
+            # 刷新进行中：读取方直接使用旧状态
+            self.assertEqual(self.store.group_by("region"), before)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertEqual(len(fetches), 1)
+        self.assertEqual(self.store.size, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_PATH = PROJECT_ROOT / "src" / "Backend"
+if str(BACKEND_PATH) not in sys.path:
+    sys.path.append(str(BACKEND_PATH))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./tests/test_api.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.core.scheduler import JobMonitor, SchedulerLeader, leader_only
+from app.crud.scheduler_lease import scheduler_lease
+from app.models.scheduler_lease import SchedulerLease
+
+
+class SchedulerLeaseTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine, tables=[SchedulerLease.__table__])
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.db = self.SessionLocal()
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.engine.dispose()
+
+    def test_single_holder_until_lease_expires(self):
+        now = datetime(2024, 1, 1, 12, 0, 0)
+        self.assertTrue(scheduler_lease.try_acquire(self.db, "scheduler", "a", 30, now=now))
+        self.assertFalse(scheduler_lease.try_acquire(self.db, "scheduler", "b", 30, now=now))
+        # 持有者续约
+        self.assertTrue(scheduler_lease.try_acquire(self.db, "scheduler", "a", 30, now=now + timedelta(seconds=20)))
+        self.assertFalse(scheduler_lease.try_acquire(self.db, "scheduler", "b", 30, now=now + timedelta(seconds=40)))
+        # 持有者失联，租约过期后被接管
+        self.assertTrue(scheduler_lease.try_acquire(self.db, "scheduler", "b", 30, now=now + timedelta(seconds=51)))
+        self.assertEqual(scheduler_lease.get(self.db, "scheduler").holder, "b")
+
+    def test_acquired_at_kept_on_renewal_and_reset_on_takeover(self):
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(self.engine, "before_cursor_execute", listener)
+        self.addCleanup(event.remove, self.engine, "before_cursor_execute", listener)
+
+        now = datetime(2024, 1, 1, 12, 0, 0)
+        scheduler_lease.try_acquire(self.db, "scheduler", "a", 30, now=now)
+        scheduler_lease.try_acquire(self.db, "scheduler", "a", 30, now=now + timedelta(seconds=20))
+        self.assertEqual(scheduler_lease.get(self.db, "scheduler").acquired_at, now)
+
+        self.db.expire_all()
+        takeover = now + timedelta(seconds=60)
+        scheduler_lease.try_acquire(self.db, "scheduler", "b", 30, now=takeover)
+        self.assertEqual(scheduler_lease.get(self.db, "scheduler").acquired_at, takeover)
+
+        # MySQL 按顺序执行 SET：acquired_at 的 CASE 必须在 holder 更新之前求值
+        update_sql = next(sql for sql in statements if sql.startswith("UPDATE"))
+        self.assertLess(update_sql.index("acquired_at="), update_sql.index("holder="))
+
+    def test_released_lease_is_taken_over_immediately(self):
+        first = SchedulerLeader("scheduler", 30, session_factory=self.SessionLocal)
+        second = SchedulerLeader("scheduler", 30, session_factory=self.SessionLocal)
+        self.assertTrue(first.renew())
+        self.assertFalse(second.renew())
+
+        first.release()
+        self.assertTrue(second.renew())
+        self.assertFalse(first.is_leader)
+
+    def test_jobs_run_only_on_leader(self):
+        leaders = [SchedulerLeader("scheduler", 30, session_factory=self.SessionLocal) for _ in range(4)]
+        runs = []
+        jobs = [leader_only(lambda: runs.append(1), leader) for leader in leaders]
+        for job in jobs:
+            job()
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(sum(leader.is_leader for leader in leaders), 1)
+
+
+class JobMonitorTestCase(unittest.TestCase):
+    def test_records_rows_duration_and_failures(self):
+        monitor = JobMonitor()
+        monitor.track("ok", lambda: 7)()
+
+        def broken():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            monitor.track("broken", broken)()
+        monitor.record_skip("ok")
+
+        stats = monitor.get_stats()
+        self.assertEqual(stats["ok"]["runs"], 1)
+        self.assertEqual(stats["ok"]["last_rows"], 7)
+        self.assertEqual(stats["ok"]["skipped_overlap"], 1)
+        self.assertIsNotNone(stats["ok"]["last_success_at"])
+        self.assertIsNotNone(stats["ok"]["last_duration_ms"])
+        self.assertFalse(stats["ok"]["running"])
+        self.assertEqual(stats["broken"]["failures"], 1)
+        self.assertEqual(stats["broken"]["last_error"], "boom")
+        self.assertIsNone(stats["broken"]["last_success_at"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_PATH = PROJECT_ROOT / "src" / "Backend"
+if str(BACKEND_PATH) not in sys.path:
+    sys.path.append(str(BACKEND_PATH))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./tests/test_api.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from sqlalchemy import column, create_engine, literal, select
+from sqlalchemy.dialects import mysql, oracle, postgresql
+from sqlalchemy.exc import CompileError
+
+from app.core.time_buckets import DAY, MONTH, WEEK, bucket_key, date_bucket, recent_buckets
+
+
+class TimeBucketTestCase(unittest.TestCase):
+    def test_sqlite_buckets_match_python(self):
+        engine = create_engine("sqlite://")
+        start = date(2020, 12, 20)
+        days = [start + timedelta(days=i) for i in range(30)] + [date(2021, 1, 3), date(2026, 12, 31)]
+        with engine.connect() as conn:
+            for granularity in (DAY, WEEK, MONTH):
+                for day in days:
+                    result = conn.execute(select(date_bucket(literal(day.isoformat()), granularity))).scalar()
+                    self.assertEqual(result, bucket_key(day, granularity), (granularity, day))
+
+    def test_compiles_per_dialect(self):
+        expr = date_bucket(column("order_date"), WEEK)
+        self.assertIn("DATE_FORMAT(order_date, '%%x-W%%v')", str(expr.compile(dialect=mysql.dialect())))
+        self.assertIn("to_char(order_date, 'IYYY-\"W\"IW')", str(expr.compile(dialect=postgresql.dialect())))
+
+    def test_unsupported_dialect_raises_compile_error(self):
+        with self.assertRaises(CompileError):
+            date_bucket(column("order_date"), DAY).compile(dialect=oracle.dialect())
+
+    def test_recent_buckets(self):
+        buckets = recent_buckets(MONTH, 3, date(2026, 3, 15))
+        self.assertEqual([b.key for b in buckets], ["2026-01", "2026-02", "2026-03"])
+        self.assertEqual(buckets[1].last_day, date(2026, 2, 28))
+
+        weeks = recent_buckets(WEEK, 2, date(2026, 1, 1))
+        self.assertEqual([w.key for w in weeks], ["2025-W52", "2026-W01"])
+        self.assertEqual(weeks[1].first_day, date(2025, 12, 29))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,463 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - 取决于测试环境
+    msgpack = None
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_PATH = PROJECT_ROOT / "src" / "Backend"
+if str(BACKEND_PATH) not in sys.path:
+    sys.path.append(str(BACKEND_PATH))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./tests/test_api.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.v1 import websocket
+from app.core import dependencies
+from app.core import websocket as core_websocket
+from app.core.database import Base, ensure_indexes
+from app.core.message_bus import DatabaseBus, LocalBus
+from app.core.principal_cache import principal_cache
+from app.core.replay_buffer import ReplayBuffer
+from app.core.security import create_access_token
+from app.core.topics import TOPIC_ACTIVITY, inventory_topic, publish_event
+from app.core.websocket import (
+    IDLE_TIMEOUT_CLOSE_CODE,
+    REPLACED_CLOSE_CODE,
+    SHUTDOWN_CLOSE_CODE,
+    SLOW_CONSUMER_CLOSE_CODE,
+    ConnectionManager,
+    encode_notification,
+    manager,
+)
+from app.models.notification import Notification
+from app.models.user import User
+from app.models.websocket_outbox import WebSocketOutbox
+
+POOL_SIZE = 2
+SOCKETS = 6
+
+
+class WebSocketConnectionTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.engine = create_engine(
+            f"sqlite:///{self.tmpdir.name}/ws.db",
+            poolclass=QueuePool,
+            pool_size=POOL_SIZE,
+            max_overflow=0,
+            pool_timeout=1,
+        )
+        Base.metadata.create_all(bind=self.engine, tables=[User.__table__])
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        with SessionLocal() as db:
+            for index in range(SOCKETS):
+                db.add(User(username=f"handheld{index}", email=f"h{index}@example.com", hashed_password="x"))
+            db.commit()
+
+        patch = mock.patch.object(dependencies, "SessionLocal", SessionLocal)
+        patch.start()
+        self.addCleanup(patch.stop)
+        principal_cache.clear()
+        self.addCleanup(principal_cache.clear)
+
+        app = FastAPI()
+        app.include_router(websocket.router)
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        self.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def test_open_sockets_hold_no_db_connections(self):
+        with ExitStack() as stack:
+            for index in range(SOCKETS):
+                token = create_access_token({"sub": f"handheld{index}"})
+                ws = stack.enter_context(self.client.websocket_connect(f"/ws/notifications?token={token}"))
+                self.assertEqual(ws.receive_json()["type"], "connection")
+
+            self.assertGreater(SOCKETS, POOL_SIZE)
+            self.assertEqual(self.engine.pool.checkedout(), 0)
+            self.assertEqual(len(manager.get_connected_users()), SOCKETS)
+
+        self.assertEqual(manager.get_connected_users(), [])
+
+    def test_subscribe_and_receive_topic_events(self):
+        # 独立的管理器：总线绑定本测试连接所在的事件循环
+        connections = ConnectionManager(LocalBus())
+        connections.heartbeat_seconds = 0
+        for module in (websocket, core_websocket):
+            patch = mock.patch.object(module, "manager", connections)
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        token = create_access_token({"sub": "handheld0"})
+        with self.client.websocket_connect(f"/ws/notifications?token={token}") as ws:
+            ws.receive_json()
+            ws.send_text(json.dumps({"action": "subscribe", "topics": ["warehouse:1:inventory", "orders:*"]}))
+            self.assertEqual(
+                ws.receive_json(),
+                {"type": "subscriptions", "data": {"topics": ["warehouse:1:inventory"], "rejected": ["orders:*"]}},
+            )
+
+            # 未订阅的主题不推送
+            publish_event(inventory_topic(2), "inventory.updated", {"id": 2, "quantity": 5})
+            publish_event(inventory_topic(1), "inventory.updated", {"id": 1, "quantity": 7, "delta": -3})
+            self.assertEqual(
+                ws.receive_json(),
+                {
+                    "type": "event",
+                    "topic": "warehouse:1:inventory",
+                    "event": "inventory.updated",
+                    "data": {"id": 1, "quantity": 7, "delta": -3},
+                },
+            )
+
+        self.assertEqual(connections.subscribers, {})
+
+    @unittest.skipIf(msgpack is None, "需要安装 msgpack")
+    def test_msgpack_negotiated_by_subprotocol(self):
+        token = create_access_token({"sub": "handheld0"})
+        with self.client.websocket_connect(f"/ws/notifications?token={token}", subprotocols=["msgpack"]) as ws:
+            self.assertEqual(ws.accepted_subprotocol, "msgpack")
+            message = msgpack.unpackb(ws.receive_bytes())
+            self.assertEqual((message["type"], message["data"]["encoding"]), ("connection", "msgpack"))
+
+    def test_invalid_token_is_rejected(self):
+        with self.assertRaises(WebSocketDisconnect) as ctx:
+            with self.client.websocket_connect("/ws/notifications?token=invalid"):
+                pass
+        self.assertEqual(ctx.exception.code, 1008)
+
+
+class FakeWebSocket:
+    def __init__(self, stalled=False):
+        self.sent = []
+        self.close_code = None
+        self._stalled = asyncio.Event() if stalled else None
+
+    async def accept(self, subprotocol=None):
+        self.subprotocol = subprotocol
+
+    async def send_text(self, message):
+        if self._stalled is not None:
+            await self._stalled.wait()
+        self.sent.append(json.loads(message))
+
+    async def send_bytes(self, message):
+        self.sent.append(msgpack.unpackb(message))
+
+    async def close(self, code=1000, reason=""):
+        self.close_code = code
+
+
+class SendQueueTestCase(unittest.TestCase):
+    def test_slow_consumer_is_evicted_without_delaying_others(self):
+        connections = ConnectionManager(LocalBus())
+        connections.queue_size = 3
+        fast, slow = FakeWebSocket(), FakeWebSocket(stalled=True)
+
+        async def scenario():
+            await connections.connect(fast, 1)
+            await connections.connect(slow, 2)
+            for index in range(10):
+                await connections.broadcast_local(json.dumps({"type": "alert", "index": index}))
+                await asyncio.sleep(0)
+            await asyncio.sleep(0.05)
+            return connections.get_stats()
+
+        stats = asyncio.run(scenario())
+        self.assertEqual([m["index"] for m in fast.sent], list(range(10)))
+        self.assertEqual(slow.close_code, SLOW_CONSUMER_CLOSE_CODE)
+        self.assertEqual(connections.get_connected_users(), [1])
+        self.assertEqual(stats["evicted_slow_consumers"], 1)
+        self.assertEqual(stats["sent"], 10)
+        # 写任务取走 1 条后阻塞，队列再放满 3 条，第 5 条溢出：丢弃溢出的 1 条与排队的 3 条
+        self.assertEqual(stats["dropped"], 4)
+        self.assertEqual(stats["max_queue_depth"], 0)
+
+
+class ConnectionLimitsTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.connections = ConnectionManager(LocalBus())
+        self.connections.heartbeat_seconds = 0
+
+    def test_user_cap_replaces_oldest_and_worker_cap_rejects(self):
+        self.connections.max_connections_per_user = 2
+        self.connections.max_connections = 3
+        sockets = [FakeWebSocket() for _ in range(5)]
+
+        async def scenario():
+            for socket in sockets[:3]:
+                await self.connections.connect(socket, 1)
+            await self.connections.connect(sockets[3], 2)
+            rejected = await self.connections.connect(sockets[4], 3)
+            await asyncio.sleep(0)
+            return rejected
+
+        self.assertIsNone(asyncio.run(scenario()))
+        self.assertEqual(sockets[0].close_code, REPLACED_CLOSE_CODE)
+        self.assertEqual(sockets[4].close_code, SLOW_CONSUMER_CLOSE_CODE)
+        self.assertEqual(self.connections.get_connection_count(1), 2)
+        self.assertEqual(self.connections.connection_count, 3)
+
+    def test_idle_connections_closed_and_active_ones_pinged(self):
+        self.connections.idle_timeout_seconds = 60
+        idle, active = FakeWebSocket(), FakeWebSocket()
+
+        async def scenario():
+            idle_conn = await self.connections.connect(idle, 1)
+            active_conn = await self.connections.connect(active, 2)
+            idle_conn.last_seen -= 120
+            active_conn.touch()
+            self.connections.sweep()
+            await asyncio.sleep(0.01)
+
+        asyncio.run(scenario())
+        self.assertEqual(idle.close_code, IDLE_TIMEOUT_CLOSE_CODE)
+        self.assertEqual(active.sent, [{"type": "ping"}])
+        self.assertEqual(self.connections.get_connected_users(), [2])
+
+    def test_shutdown_drains_queues_then_closes(self):
+        sockets = [FakeWebSocket() for _ in range(3)]
+
+        async def scenario():
+            for user_id, socket in enumerate(sockets):
+                await self.connections.connect(socket, user_id)
+            for index in range(5):
+                await self.connections.broadcast_local(json.dumps({"type": "alert", "index": index}))
+            await self.connections.stop(drain_timeout=1)
+            return await self.connections.connect(FakeWebSocket(), 9)
+
+        self.assertIsNone(asyncio.run(scenario()))
+        for socket in sockets:
+            self.assertEqual(len(socket.sent), 5)
+            self.assertEqual(socket.close_code, SHUTDOWN_CLOSE_CODE)
+        self.assertEqual(self.connections.connection_count, 0)
+
+
+class TopicSubscriptionTestCase(unittest.TestCase):
+    def test_topic_events_reach_only_subscribers(self):
+        connections = ConnectionManager(LocalBus())
+        connections.heartbeat_seconds = 0
+        connections.topic_batch_seconds = 0
+        connections.max_topics_per_connection = 2
+        sockets = [FakeWebSocket() for _ in range(3)]
+
+        async def scenario():
+            conns = [await connections.connect(socket, index) for index, socket in enumerate(sockets)]
+            connections.subscribe(conns[0], [inventory_topic(1), TOPIC_ACTIVITY])
+            _, rejected = connections.subscribe(conns[1], [TOPIC_ACTIVITY, "orders:status", inventory_topic(1)])
+            self.assertEqual(rejected, [inventory_topic(1)])
+            connections.publish(json.dumps({"type": "event", "n": 1}), topic=inventory_topic(1))
+            connections.publish(json.dumps({"type": "event", "n": 2}), topic=TOPIC_ACTIVITY)
+            await asyncio.sleep(0.01)
+
+            connections.unsubscribe(conns[0], [TOPIC_ACTIVITY])
+            connections.disconnect(sockets[1], 1)
+            connections.publish(json.dumps({"type": "event", "n": 3}), topic=TOPIC_ACTIVITY)
+            await asyncio.sleep(0.01)
+
+        asyncio.run(scenario())
+        self.assertEqual([m["n"] for m in sockets[0].sent], [1, 2])
+        self.assertEqual([m["n"] for m in sockets[1].sent], [2])
+        self.assertEqual(sockets[2].sent, [])
+        self.assertEqual(connections.subscribers.keys(), {inventory_topic(1)})
+
+
+class FramingTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.connections = ConnectionManager(LocalBus())
+        self.connections.heartbeat_seconds = 0
+
+    def test_topic_events_in_window_are_sent_as_one_frame(self):
+        self.connections.topic_batch_seconds = 0.05
+        socket = FakeWebSocket()
+
+        async def scenario():
+            connection = await self.connections.connect(socket, 1)
+            self.connections.subscribe(connection, [TOPIC_ACTIVITY])
+            for index in range(3):
+                await self.connections._deliver(None, json.dumps({"type": "event", "n": index}), TOPIC_ACTIVITY)
+            await asyncio.sleep(0.1)
+            await self.connections._deliver(None, json.dumps({"type": "event", "n": 3}), TOPIC_ACTIVITY)
+            await asyncio.sleep(0.1)
+
+        asyncio.run(scenario())
+        self.assertEqual(
+            socket.sent,
+            [
+                {"type": "events", "topic": "activity", "events": [{"type": "event", "n": n} for n in range(3)]},
+                {"type": "event", "n": 3},
+            ],
+        )
+        self.assertEqual(self.connections.get_stats()["batched_events"], 3)
+
+    @unittest.skipIf(msgpack is None, "需要安装 msgpack")
+    def test_broadcast_encodes_msgpack_once_for_all_recipients(self):
+        sockets = [FakeWebSocket() for _ in range(3)]
+        text_socket = FakeWebSocket()
+
+        async def scenario():
+            for user_id, socket in enumerate(sockets):
+                await self.connections.connect(socket, user_id, encoding="msgpack")
+            await self.connections.connect(text_socket, 9)
+            await self.connections.broadcast_local(json.dumps({"type": "alert", "level": "high"}))
+            await asyncio.sleep(0.01)
+
+        with mock.patch.object(core_websocket.msgpack, "packb", wraps=msgpack.packb) as packb:
+            asyncio.run(scenario())
+        self.assertEqual(packb.call_count, 1)
+        for socket in sockets:
+            self.assertEqual(socket.subprotocol, "msgpack")
+            self.assertEqual(socket.sent, [{"type": "alert", "level": "high"}])
+        self.assertIsNone(text_socket.subprotocol)
+        self.assertEqual(text_socket.sent, [{"type": "alert", "level": "high"}])
+
+
+class ReplayTestCase(unittest.TestCase):
+    def test_ring_buffer_covers_only_its_window(self):
+        buffer = ReplayBuffer(size_per_user=3, max_users=2)
+        for seq in (10, 12, 11, 15):
+            buffer.append(1, seq, str(seq))
+        # 容量 3：10 被挤出，窗口为 11..15
+        self.assertEqual(buffer.since(1, 11), ["12", "15"])
+        self.assertEqual(buffer.since(1, 15), [])
+        self.assertIsNone(buffer.since(1, 10))
+
+        buffer.append(2, 1, "a")
+        buffer.append(3, 1, "b")
+        self.assertIsNone(buffer.since(1, 15))
+        self.assertEqual(len(buffer), 2)
+
+    def test_replay_index_added_to_existing_table(self):
+        engine = create_engine("sqlite://")
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(bind=engine, tables=[User.__table__, Notification.__table__])
+        with engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_notifications_user_id_id"))
+
+        ensure_indexes(engine, "ix_notifications_user_id_id")
+        indexes = {index["name"]: index["column_names"] for index in inspect(engine).get_indexes("notifications")}
+        self.assertEqual(indexes["ix_notifications_user_id_id"], ["user_id", "id"])
+
+    def test_reconnect_replays_from_memory_then_database(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        engine = create_engine(f"sqlite:///{tmpdir.name}/replay.db")
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(bind=engine, tables=[User.__table__, Notification.__table__])
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        with SessionLocal() as db:
+            db.add(User(id=1, username="picker", email="p@example.com", hashed_password="x"))
+            for index in range(1, 7):
+                db.add(Notification(
+                    id=index,
+                    user_id=1,
+                    title=f"t{index}",
+                    message="m",
+                    notification_type="system",
+                    expires_at=datetime.utcnow() + timedelta(days=1),
+                ))
+            db.commit()
+
+        connections = ConnectionManager(LocalBus())
+        connections.heartbeat_seconds = 0
+        connections.session_factory = SessionLocal
+        connections.replay_buffer = ReplayBuffer(size_per_user=2, max_users=10)
+        socket_a, socket_b = FakeWebSocket(), FakeWebSocket()
+
+        async def scenario():
+            # 只有最近 2 条（5、6）推送经过本进程
+            for index in (5, 6):
+                await connections._deliver(1, encode_notification(index, f"t{index}", "m", "system"))
+            memory = await connections.replay(await connections.connect(socket_a, 1), since=5)
+            database = await connections.replay(await connections.connect(socket_b, 1), since=2)
+            await asyncio.sleep(0.01)
+            return memory, database
+
+        memory, database = asyncio.run(scenario())
+        self.assertEqual((memory["source"], memory["count"], memory["last_seq"]), ("memory", 1, 6))
+        self.assertEqual([m.get("seq") for m in socket_a.sent], [6, None])
+        self.assertEqual((database["source"], database["count"], database["truncated"]), ("database", 4, False))
+        self.assertEqual([m["seq"] for m in socket_b.sent if m["type"] == "notification"], [3, 4, 5, 6])
+        self.assertEqual(socket_b.sent[-1]["type"], "replay")
+
+
+class DatabaseBusTestCase(unittest.TestCase):
+    """两个 ConnectionManager 共享同一发件箱，模拟两个 worker"""
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{self.tmpdir.name}/bus.db")
+        Base.metadata.create_all(bind=self.engine, tables=[WebSocketOutbox.__table__])
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+    def tearDown(self) -> None:
+        self.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def test_each_worker_delivers_only_to_its_own_sockets(self):
+        workers = [
+            ConnectionManager(DatabaseBus(self.SessionLocal, poll_seconds=0.01)) for _ in range(2)
+        ]
+        sockets = {user_id: FakeWebSocket() for user_id in (1, 2)}
+
+        async def scenario():
+            await workers[0].connect(sockets[1], 1)
+            await workers[1].connect(sockets[2], 2)
+            # 从 worker 0 发给连接在 worker 1 上的用户
+            await workers[0].send_notification(2, 10, "title", "to user 2", "system")
+            await workers[1].send_notification(1, 11, "title", "to user 1", "system")
+            await workers[1].broadcast(json.dumps({"type": "broadcast"}))
+            await asyncio.sleep(0.3)
+            for worker in workers:
+                await worker.stop()
+
+        asyncio.run(scenario())
+        self.assertEqual(
+            [m["type"] if m["type"] != "notification" else m["data"]["id"] for m in sockets[1].sent],
+            [11, "broadcast"],
+        )
+        self.assertEqual(
+            [m["type"] if m["type"] != "notification" else m["data"]["id"] for m in sockets[2].sent],
+            [10, "broadcast"],
+        )
+
+    def test_late_commit_inside_gap_is_not_lost(self):
+        bus = DatabaseBus(self.SessionLocal, gap_grace_seconds=5)
+        self.assertEqual(
+            bus.accept([(1, None, "a", None), (3, None, "c", "activity")], now=0),
+            [(None, "a", None), (None, "c", "activity")],
+        )
+        self.assertEqual(bus.floor, 1)
+        # ID 2 的事务晚提交：仍在等待期内，补查到后投递一次
+        self.assertEqual(bus.accept([(2, 7, "b", None), (3, None, "c", "activity")], now=1), [(7, "b", None)])
+        self.assertEqual(bus.floor, 3)
+
+        self.assertEqual(bus.accept([(5, None, "e", None)], now=2), [(None, "e", None)])
+        self.assertEqual(bus.floor, 3)
+        # 空洞超过等待期视为回滚
+        bus.accept([], now=8)
+        self.assertEqual(bus.floor, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()